@@ -4,6 +4,8 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.services.security_service import security_service
+from app.services.rate_limiter import rate_limiter
 
 router = APIRouter()
 
@@ -21,5 +23,7 @@ async def get_basic_status():
         "app_name": settings.app_name,
         "version": settings.app_version,
         "description": settings.description,
-        "status": "running"
+        "status": "running",
+        "auth_snapshot": security_service.get_snapshot_stats(),
+        "rate_limiter": rate_limiter.get_stats()
     } 
\ No newline at end of file
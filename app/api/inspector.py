@@ -1,7 +1,12 @@
+import math
 from fastapi import APIRouter, Request, HTTPException, Body
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
+from app.middleware.auth import check_rate_limit, get_current_user
+from app.models.mcp_config import PermissionType
 from app.services.inspector_service import inspector_service
+from app.services.security_service import security_service
+from app.services.server_manager import ServerUnavailableError
 
 router = APIRouter()
 
@@ -12,31 +17,53 @@ class CallToolRequest(BaseModel):
     tool: str
     arguments: Dict[str, Any] = {}
 
+def _check_server_access(request: Request, server_name: str):
+    """
+    Access checks for reaching a server through the inspector.
+
+    The inspector talks to servers in-process, so the /mcp endpoint checks are not
+    applied on the way; the key that authenticated this API request must have MCP
+    access (read) and is subject to the server's rate limits, checked once here.
+    """
+    user = get_current_user(request)
+    key_config = security_service.verify_api_key(user["api_key"]) if user else None
+    if key_config is not None and not security_service.has_permission(key_config, PermissionType.READ):
+        raise HTTPException(status_code=403, detail="Permission denied")
+    return check_rate_limit(server_name, key_config)
+
+def _unavailable(e: ServerUnavailableError) -> HTTPException:
+    headers = {"Retry-After": str(max(1, math.ceil(e.retry_after)))} if e.status_code == 503 else None
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+
 @router.post("/sessions")
 async def create_session(req: CreateSessionRequest, request: Request):
-    # Determine base URL for internal connection
-    # Prefer localhost to avoid external network issues
-    port = request.app.state.port if hasattr(request.app.state, 'port') else 8000
-    base_url = f"http://127.0.0.1:{port}"
-    
-    # Get API key from current request to proxy authentication
-    api_key = request.headers.get("Mcpcat-Key")
-    
+    limited = _check_server_access(request, req.server_name)
+    if limited is not None:
+        return limited
+
     try:
         session_id = await inspector_service.create_session(
-            req.server_name, 
-            base_url,
-            api_key=api_key
+            req.server_name,
+            request.app.state.server_manager
         )
         return {"session_id": session_id}
+    except ServerUnavailableError as e:
+        raise _unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sessions/{session_id}/tools")
-async def get_tools(session_id: str):
+async def get_tools(session_id: str, request: Request):
     try:
+        limited = _check_server_access(request, inspector_service.get_session_server(session_id))
+        if limited is not None:
+            return limited
         tools = await inspector_service.get_tools(session_id)
         return {"tools": tools}
+    except HTTPException:
+        raise
+    except ServerUnavailableError as e:
+        raise _unavailable(e)
     except Exception as e:
         detail = str(e)
         if "会话不存在" in detail:
@@ -44,10 +71,17 @@ async def get_tools(session_id: str):
         raise HTTPException(status_code=500, detail=detail)
 
 @router.post("/sessions/{session_id}/call")
-async def call_tool(session_id: str, req: CallToolRequest):
+async def call_tool(session_id: str, req: CallToolRequest, request: Request):
     try:
+        limited = _check_server_access(request, inspector_service.get_session_server(session_id))
+        if limited is not None:
+            return limited
         result = await inspector_service.call_tool(session_id, req.tool, req.arguments)
         return result
+    except HTTPException:
+        raise
+    except ServerUnavailableError as e:
+        raise _unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
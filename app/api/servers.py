@@ -97,13 +97,21 @@ async def check_server_health(server_name: str, request: Request):
     server_status = _validate_server_exists(manager, server_name)
     
     server_info = server_status[server_name]
-    is_healthy = server_info['status'] == 'running'
+    # 健康信息来自后台探测的缓存结果，请求本身不会访问后端
+    health = server_info.get('health') or {}
+    is_healthy = server_info['status'] == 'running' and health.get('state') != 'unhealthy'
     
     return {
         "server_name": server_name,
         "healthy": is_healthy,
         "status": server_info['status'],
-        "error": server_info.get('error'),
+        "health": health.get('state', 'unknown'),
+        "latency_ms": health.get('latency_ms'),
+        "p50_ms": health.get('p50_ms'),
+        "p95_ms": health.get('p95_ms'),
+        "consecutive_failures": health.get('consecutive_failures', 0),
+        "last_probe_at": health.get('last_probe_at'),
+        "error": server_info.get('error') or health.get('last_error'),
         "endpoints": {
             "mcp": server_info['mcp_endpoint'],
             "sse": server_info['sse_endpoint']
@@ -161,6 +169,7 @@ async def add_server(server_request: AddServerRequest, request: Request):
                 "message": f"服务器 '{server_request.name}' 添加并挂载成功",
                 "server_name": server_request.name,
                 "status": current_status,
+                "ready_seconds": server_status.get('ready_seconds'),
                 "type": server_request.config.get('type'),
                 "command": server_request.config.get('command'),
                 "args": server_request.config.get('args'),
@@ -216,6 +225,7 @@ async def update_server(server_name: str, server_request: AddServerRequest, requ
                 "message": f"服务器 '{server_name}' 配置更新并重启成功",
                 "server_name": server_name,
                 "status": current_status,
+                "ready_seconds": server_status.get('ready_seconds'),
                 "type": server_request.config.get('type'),
                 "endpoints": {
                     "mcp": f"/mcp/{server_name}",
@@ -251,6 +261,7 @@ async def restart_server(server_name: str, request: Request):
                 "message": f"服务器 '{server_name}' 重启成功",
                 "server_name": server_name,
                 "status": current_status,
+                "ready_seconds": server_status.get('ready_seconds'),
                 "endpoints": {
                     "mcp": f"/mcp/{server_name}",
                     "sse": f"/sse/{server_name}"
@@ -285,6 +296,7 @@ async def start_server(server_name: str, request: Request):
                 "message": f"服务器 '{server_name}' 启动成功",
                 "server_name": server_name,
                 "status": current_status,
+                "ready_seconds": server_status.get('ready_seconds'),
                 "endpoints": {
                     "mcp": f"/mcp/{server_name}",
                     "sse": f"/sse/{server_name}"
@@ -329,6 +341,23 @@ async def stop_server(server_name: str, request: Request):
         raise HTTPException(status_code=500, detail=f"停止服务器时发生错误: {str(e)}")
 
 
+@router.post("/servers/{server_name}/cache/flush")
+async def flush_server_cache(server_name: str, request: Request):
+    """清空服务器的工具结果缓存"""
+    manager = _get_server_manager(request)
+    _validate_server_exists(manager, server_name)
+    
+    flushed = manager.flush_result_cache(server_name)
+    if flushed is None:
+        raise HTTPException(status_code=400, detail=f"服务器 '{server_name}' 未配置结果缓存")
+    
+    return {
+        "message": f"服务器 '{server_name}' 的结果缓存已清空",
+        "server_name": server_name,
+        "flushed": flushed
+    }
+
+
 @router.delete("/servers/{server_name}")
 async def delete_server(server_name: str, request: Request):
     """删除服务器"""
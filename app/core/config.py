@@ -19,6 +19,36 @@ class Settings(BaseSettings):
     
     # MCP配置文件路径
     mcpcat_config_path: str = ".mcpcat/config.json"
+    # 配置文件外部修改检测的轮询间隔（秒）
+    mcpcat_config_watch_interval: float = 2.0
+
+    # 限流器最多保留的令牌桶数量（超出后回收最久未使用的桶）
+    mcpcat_rate_limit_max_buckets: int = 100000
+
+    # 同时启动的MCP服务器生命周期数量上限（冷启动较慢的 npx/uvx 后端并发启动）
+    mcpcat_startup_concurrency: int = 8
+    # 检查空闲服务器（idle_timeout）的间隔（秒）
+    mcpcat_idle_check_interval: float = 5.0
+    # 启动、重启、添加服务器时等待后端就绪的最长时间（秒）
+    mcpcat_startup_timeout: float = 60.0
+    # 代理请求到达启动中的服务器时排队等待就绪的最长时间（秒），超时返回503
+    mcpcat_request_ready_timeout: float = 30.0
+    # 蓝绿重启时旧实例排空进行中请求的宽限期（秒），超时后强制关闭旧实例
+    mcpcat_restart_drain_timeout: float = 30.0
+
+    # 后端主动健康探测：间隔、随机抖动（秒）、单次探测超时（秒）
+    mcpcat_health_check_interval: float = 30.0
+    mcpcat_health_check_jitter: float = 5.0
+    mcpcat_health_check_timeout: float = 10.0
+    # 连续探测失败多少次后标记为 degraded / unhealthy
+    mcpcat_health_degraded_after: int = 1
+    mcpcat_health_unhealthy_after: int = 3
+
+    # OpenAPI规范缓存：缓存目录（默认为配置文件所在目录下的 openapi_cache）、
+    # 有效期内不重新验证的时间（秒）、下载规范的超时时间（秒）
+    mcpcat_openapi_cache_dir: Optional[str] = None
+    mcpcat_openapi_spec_cache_ttl: float = 300.0
+    mcpcat_openapi_spec_timeout: float = 30.0
 
     # 日志配置
     log_level: str = "INFO"
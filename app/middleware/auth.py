@@ -1,29 +1,101 @@
 """认证中间件"""
 
+import math
 import re
-from typing import List, Pattern
-from fastapi import Request, Response
+from typing import List, NamedTuple, Optional, Pattern
+from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.services.security_service import security_service
-from app.services.config_service import ConfigService
-from app.models.mcp_config import PermissionType
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.services.security_service import hash_api_key, security_service
+from app.services.rate_limiter import rate_limiter
+from app.models.mcp_config import APIKeyConfig, PermissionType
 from app.exceptions.auth import AuthenticationError, PermissionDeniedError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# 默认需要write权限的HTTP方法，其余方法需要read权限
+WRITE_METHODS = frozenset({'POST', 'PUT', 'DELETE'})
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """API Key认证中间件"""
+class RouteDecision(NamedTuple):
+    """路由认证决策结果"""
+    # 是否为公开路径（无需认证）
+    is_public: bool
+    # MCP/SSE端点对应的服务器名称，其他路径为None
+    server_name: Optional[str]
+    # 所需权限
+    required_permission: PermissionType
+
+
+# 与服务器无关的决策结果是固定的，预先构建以避免每个请求创建对象
+# 以 "HTTP方法是否默认需要write权限" 为键
+_PUBLIC_DECISIONS = {
+    False: RouteDecision(True, None, PermissionType.READ),
+    True: RouteDecision(True, None, PermissionType.WRITE),
+}
+_DEFAULT_DECISIONS = {
+    False: RouteDecision(False, None, PermissionType.READ),
+    True: RouteDecision(False, None, PermissionType.WRITE),
+}
+_READ_ACTION_DECISION = RouteDecision(False, None, PermissionType.READ)
+_WRITE_ACTION_DECISION = RouteDecision(False, None, PermissionType.WRITE)
+
+
+def check_rate_limit(server_name: str, key_config: Optional[APIKeyConfig]):
+    """
+    按 服务器 / API Key / (API Key, 服务器) 三个维度检查令牌桶限流
     
-    def __init__(self, app, public_paths: List[str] = None):
-        super().__init__(app)
+    Args:
+        server_name: 服务器名称
+        key_config: 已认证的API Key配置，公开服务器为None
         
-        # 配置服务实例
-        self.config_service = ConfigService()
+    Returns:
+        Optional[JSONResponse]: 超出限流时返回429响应，否则返回None
+    """
+    server_limit, key_server_limit = security_service.get_snapshot().server_rate_limits.get(
+        server_name, (None, None)
+    )
+    
+    limits = []
+    if server_limit is not None:
+        limits.append((('server', server_name), server_limit))
+    if key_config is not None:
+        # 令牌桶在限流器中长期保留，以Key的摘要作为桶键，不在内存中保留原始Key
+        key_hash = hash_api_key(key_config.key)
+        if key_config.rate_limit is not None:
+            limits.append((('key', key_hash), key_config.rate_limit))
+        if key_server_limit is not None:
+            limits.append((('key_server', key_hash, server_name), key_server_limit))
+    
+    if not limits:
+        return None
+    
+    retry_after = rate_limiter.acquire(limits)
+    if retry_after <= 0:
+        return None
+    
+    key_name = key_config.name if key_config is not None else 'anonymous'
+    logger.warning(f"请求被限流: {key_name} -> {server_name}，{retry_after:.2f}秒后重试")
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Rate limit exceeded", "server": server_name},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class AuthMiddleware:
+    """
+    API Key认证中间件（纯ASGI实现）
+    
+    仅根据scope和请求头做出认证决策，通过后将receive/send原样交给下游应用，
+    不包装响应体，因此长连接的SSE流和Streamable HTTP响应不会产生额外开销。
+    """
+    
+    def __init__(self, app: ASGIApp, public_paths: List[str] = None):
+        self.app = app
         
         # 公开路径（无需认证）
         self.public_paths = public_paths or [
@@ -36,39 +108,74 @@ class AuthMiddleware(BaseHTTPMiddleware):
             r"^/api/auth/first-run-keys$",   # 首次运行Key获取
         ]
         
-        # 编译正则表达式
-        self.public_patterns: List[Pattern] = [
-            re.compile(pattern) for pattern in self.public_paths
-        ]
+        # 启动时将公开路径和权限规则编译为一个带命名分组的正则，
+        # 一次匹配即可得到 (是否公开, 服务器名称, 所需权限)
+        self.route_pattern: Pattern = self._compile_route_pattern(self.public_paths)
+    
+    @staticmethod
+    def _compile_route_pattern(public_paths: List[str]) -> Pattern:
+        """
+        编译路由决策正则
         
-        # 权限映射：路径模式 -> 所需权限
-        # 注意：更具体的模式应该放在前面，因为会按顺序匹配
-        self.permission_map = {
-            # 管理API - write权限 (具体的操作端点)
-            r"^/api/servers/[^/]+/start$": PermissionType.WRITE,
-            r"^/api/servers/[^/]+/stop$": PermissionType.WRITE,
-            r"^/api/servers/[^/]+/restart$": PermissionType.WRITE,
-            
-            # 管理API - read权限 (查看端点)
-            r"^/api/servers/[^/]+/health$": PermissionType.READ,
-            r"^/api/servers/[^/]+/config$": PermissionType.READ,
+        每个分支用一个命名分组标识，匹配后通过 lastgroup 直接得到命中的分支。
+        分支按优先级排列（正则交替从左到右尝试），与原有的匹配顺序一致：
+        公开路径 > MCP/SSE端点 > 管理API操作端点。
+        
+        Args:
+            public_paths: 公开路径正则列表
             
-            # MCP协议端点 - read权限
-            r"^/mcp/[^/]+/.*": PermissionType.READ,
+        Returns:
+            Pattern: 编译后的正则
+        """
+        public_alternation = '|'.join(f'(?:{pattern})' for pattern in public_paths)
+        return re.compile(
+            # 公开路径
+            rf"(?P<public>{public_alternation})"
+            # MCP协议端点：/mcp/{server}/... 需要read权限，/mcp/{server} 按HTTP方法判断
+            r"|/mcp/(?P<mcp>[^/]+)/"
+            r"|/mcp/(?P<mcp_bare>[^/]+)"
+            # SSE端点 - read权限
+            r"|/sse/(?P<sse>[^/]+)"
+            # 管理API操作端点：start/stop/restart 需要write，health/config 需要read
+            r"|/api/servers/[^/]+/(?:(?P<write_action>start|stop|restart)"
+            r"|(?P<read_action>health|config))$"
+        )
+    
+    def resolve_route(self, path: str, method: str) -> RouteDecision:
+        """
+        一次匹配得出路径的认证决策
+        
+        Args:
+            path: 请求路径
+            method: HTTP方法
             
-            # SSE端点 - read权限  
-            r"^/sse/[^/]+.*": PermissionType.READ,
-        }
+        Returns:
+            RouteDecision: (是否公开, 服务器名称, 所需权限)
+        """
+        # 默认情况下，POST/PUT/DELETE需要write权限，其余需要read权限
+        # （/api/servers 的增删改查端点也遵循该规则）
+        is_write_method = method.upper() in WRITE_METHODS
         
-        # 编译权限映射的正则表达式
-        self.permission_patterns = {
-            re.compile(pattern): permission 
-            for pattern, permission in self.permission_map.items()
-        }
+        match = self.route_pattern.match(path)
+        if match is None:
+            return _DEFAULT_DECISIONS[is_write_method]
+        
+        branch = match.lastgroup
+        if branch == 'public':
+            return _PUBLIC_DECISIONS[is_write_method]
+        if branch == 'write_action':
+            return _WRITE_ACTION_DECISION
+        if branch == 'read_action':
+            return _READ_ACTION_DECISION
+        
+        # MCP/SSE端点
+        if branch == 'mcp_bare' and is_write_method:
+            return RouteDecision(False, match.group(branch), PermissionType.WRITE)
+        return RouteDecision(False, match.group(branch), PermissionType.READ)
     
     def is_public_path(self, path: str) -> bool:
         """检查路径是否为公开路径"""
-        return any(pattern.match(path) for pattern in self.public_patterns)
+        return self.resolve_route(path, 'GET').is_public
     
     def is_mcp_server_public(self, path: str) -> bool:
         """
@@ -80,19 +187,10 @@ class AuthMiddleware(BaseHTTPMiddleware):
         Returns:
             bool: 如果服务器配置为不需要认证则返回True
         """
-        # 匹配MCP端点: /mcp/server_name/...
-        mcp_match = re.match(r"^/mcp/([^/]+)", path)
-        if mcp_match:
-            server_name = mcp_match.group(1)
-            return self._check_server_auth_config(server_name)
-        
-        # 匹配SSE端点: /sse/server_name/...
-        sse_match = re.match(r"^/sse/([^/]+)", path)
-        if sse_match:
-            server_name = sse_match.group(1)
-            return self._check_server_auth_config(server_name)
-        
-        return False
+        server_name = self.resolve_route(path, 'GET').server_name
+        if server_name is None:
+            return False
+        return self._check_server_auth_config(server_name)
     
     def _check_server_auth_config(self, server_name: str) -> bool:
         """
@@ -105,13 +203,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
             bool: 如果服务器配置为不需要认证则返回True
         """
         try:
-            config = self.config_service.load_config()
-            mcp_servers = config.get('mcpServers', {})
-            server_config = mcp_servers.get(server_name, {})
-            
-            # 默认需要认证，除非明确配置为不需要
-            require_auth = server_config.get('require_auth', True)
-            return not require_auth
+            # 从认证快照读取，默认需要认证，除非明确配置为不需要
+            return not security_service.server_requires_auth(server_name)
             
         except Exception as e:
             logger.error(f"检查服务器认证配置时出错: {e}")
@@ -129,103 +222,106 @@ class AuthMiddleware(BaseHTTPMiddleware):
         Returns:
             PermissionType: 所需权限，默认为READ
         """
-        # 检查特定的权限映射
-        for pattern, permission in self.permission_patterns.items():
-            if pattern.match(path):
-                return permission
-        
-        # 对于API管理端点，根据HTTP方法和路径判断权限
-        if path.startswith('/api/servers'):
-            method_upper = method.upper()
-            
-            # GET /api/servers - 列出服务器 (read权限)
-            if path == '/api/servers' and method_upper == 'GET':
-                return PermissionType.READ
-            
-            # POST /api/servers - 添加服务器 (write权限)
-            if path == '/api/servers' and method_upper == 'POST':
-                return PermissionType.WRITE
-            
-            # GET /api/servers/{name} - 获取服务器详情 (read权限)
-            if path.startswith('/api/servers/') and method_upper == 'GET':
-                return PermissionType.READ
-            
-            # PUT /api/servers/{name} - 更新服务器 (write权限)
-            # DELETE /api/servers/{name} - 删除服务器 (write权限)
-            if path.startswith('/api/servers/') and method_upper in ['PUT', 'DELETE']:
-                return PermissionType.WRITE
-        
-        # 默认情况下，POST/PUT/DELETE需要write权限，GET需要read权限
-        if method.upper() in ['POST', 'PUT', 'DELETE']:
-            return PermissionType.WRITE
-        else:
-            return PermissionType.READ
+        return self.resolve_route(path, method).required_permission
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """中间件主要逻辑"""
-        path = request.url.path
-        method = request.method
+        if scope['type'] != 'http':
+            # 仅处理HTTP请求，其余（lifespan、websocket）直接透传
+            await self.app(scope, receive, send)
+            return
         
-        # 检查是否为公开路径
-        if self.is_public_path(path):
-            return await call_next(request)
+        path = scope['path']
+        method = scope['method']
+        route = self.resolve_route(path, method)
         
-        # 检查是否为配置为公开的MCP服务器端点
-        if self.is_mcp_server_public(path):
-            logger.debug(f"MCP服务器端点无需认证: {method} {path}")
-            return await call_next(request)
+        # 检查是否为公开路径
+        if route.is_public:
+            await self.app(scope, receive, send)
+            return
         
         try:
-            # 获取动态认证头名称
-            auth_header_name = security_service.get_auth_header_name()
-            
-            # 获取API Key
-            api_key = request.headers.get(auth_header_name)
-            if not api_key:
-                logger.warning(f"未提供API Key: {method} {path}")
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "API Key required"},
-                    headers={"WWW-Authenticate": auth_header_name}
-                )
-            
-            # 验证API Key
-            key_config = security_service.verify_api_key(api_key)
-            if not key_config:
-                logger.warning(f"无效的API Key: {method} {path}")
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Invalid API Key"},
-                    headers={"WWW-Authenticate": auth_header_name}
-                )
-            
-            # 检查权限
-            required_permission = self.get_required_permission(path, method)
-            if not security_service.has_permission(key_config, required_permission):
-                logger.warning(f"权限不足: {key_config.name} 尝试访问 {method} {path}")
-                return JSONResponse(
-                    status_code=403,
-                    content={"detail": "Permission denied"}
-                )
+            key_config = None
+            response = None
             
-            # 将用户信息添加到请求状态中
-            request.state.user = {
-                "name": key_config.name,
-                "permission": key_config.permission.value,
-                "api_key": api_key
-            }
-            
-            # 记录成功的认证
-            logger.debug(f"认证成功: {key_config.name} ({key_config.permission.value}) -> {method} {path}")
-            
-            return await call_next(request)
+            # 检查是否为配置为公开的MCP服务器端点
+            if route.server_name is not None and self._check_server_auth_config(route.server_name):
+                logger.debug(f"MCP服务器端点无需认证: {method} {path}")
+            else:
+                response, key_config = self._authenticate(scope, path, method, route.required_permission)
             
+            # MCP/SSE端点在转发到后端之前进行限流
+            if response is None and route.server_name is not None:
+                response = check_rate_limit(route.server_name, key_config)
         except Exception as e:
             logger.error(f"认证中间件出错: {e}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={"detail": "Authentication error"}
             )
+        
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        
+        await self.app(scope, receive, send)
+    
+    def _authenticate(self, scope: Scope, path: str, method: str,
+                      required_permission: PermissionType):
+        """
+        校验请求的API Key和权限
+        
+        Args:
+            scope: ASGI scope
+            path: 请求路径
+            method: HTTP方法
+            required_permission: 所需权限
+            
+        Returns:
+            Tuple[Optional[JSONResponse], Optional[APIKeyConfig]]:
+                认证失败时返回 (错误响应, None)，成功时返回 (None, API Key配置)
+        """
+        # 获取动态认证头名称
+        auth_header_name = security_service.get_auth_header_name()
+        
+        # 获取API Key
+        api_key = Headers(scope=scope).get(auth_header_name)
+        if not api_key:
+            logger.warning(f"未提供API Key: {method} {path}")
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "API Key required"},
+                headers={"WWW-Authenticate": auth_header_name}
+            ), None
+        
+        # 验证API Key
+        key_config = security_service.verify_api_key(api_key)
+        if not key_config:
+            logger.warning(f"无效的API Key: {method} {path}")
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Invalid API Key"},
+                headers={"WWW-Authenticate": auth_header_name}
+            ), None
+        
+        # 检查权限
+        if not security_service.has_permission(key_config, required_permission):
+            logger.warning(f"权限不足: {key_config.name} 尝试访问 {method} {path}")
+            return JSONResponse(
+                status_code=403,
+                content={"detail": "Permission denied"}
+            ), None
+        
+        # 将用户信息添加到请求状态中（request.state 读取的就是 scope["state"]）
+        scope.setdefault('state', {})['user'] = {
+            "name": key_config.name,
+            "permission": key_config.permission.value,
+            "api_key": api_key
+        }
+        
+        # 记录成功的认证
+        logger.debug(f"认证成功: {key_config.name} ({key_config.permission.value}) -> {method} {path}")
+        return None, key_config
 
 
 def get_current_user(request: Request) -> dict:
@@ -14,13 +14,81 @@ class MCPTransportType(str, Enum):
     OPENAPI = "openapi"
 
 
+class RateLimitConfig(BaseModel):
+    """令牌桶限流配置"""
+    rate: float = Field(..., gt=0, description="每秒补充的令牌数（持续请求速率）")
+    burst: int = Field(default=10, ge=1, description="桶容量（允许的突发请求数）")
+
+
+class RestartPolicyConfig(BaseModel):
+    """后端故障自动重启策略"""
+    enabled: bool = Field(default=True, description="是否自动重启故障后端")
+    initial_backoff: float = Field(default=1.0, gt=0, description="首次重启前的等待时间（秒）")
+    max_backoff: float = Field(default=60.0, gt=0, description="重启等待时间上限（秒）")
+    max_restarts: int = Field(default=5, ge=1, description="时间窗口内最多自动重启次数")
+    window: float = Field(default=300.0, gt=0, description="重启次数统计窗口（秒）")
+
+
+class HttpPoolConfig(BaseModel):
+    """上游HTTP连接池配置（sse / streamable-http / openapi）"""
+    max_connections: int = Field(default=100, ge=1, description="最大连接数")
+    max_keepalive_connections: int = Field(default=20, ge=0, description="最多保持的空闲连接数")
+    keepalive_expiry: float = Field(default=5.0, ge=0, description="空闲连接保持时间（秒）")
+    http2: bool = Field(default=False, description="是否启用HTTP/2（需要安装 h2）")
+    connect_timeout: Optional[float] = Field(default=None, gt=0, description="连接超时（秒），None表示使用默认值")
+    read_timeout: Optional[float] = Field(default=None, gt=0, description="读取超时（秒），None表示使用默认值")
+
+
+class HttpCacheConfig(BaseModel):
+    """上游HTTP响应缓存配置（openapi，遵循上游的 Cache-Control / ETag / Last-Modified）"""
+    max_entries: int = Field(default=1000, ge=1, description="内存中最多缓存的响应数")
+    max_bytes: int = Field(default=50 * 1024 * 1024, ge=1, description="内存中缓存响应体的总字节数上限")
+    max_entry_bytes: int = Field(default=1024 * 1024, ge=1, description="单个响应体的字节数上限，更大的响应不缓存")
+    key_headers: List[str] = Field(default_factory=lambda: ['authorization', 'accept'], description="计入缓存键的请求头")
+    disk: bool = Field(default=False, description="是否启用磁盘层（位于OpenAPI缓存目录下）")
+    disk_max_bytes: int = Field(default=500 * 1024 * 1024, ge=1, description="磁盘层总字节数上限")
+
+
+class ToolCacheConfig(BaseModel):
+    """工具结果缓存配置（仅适用于幂等的只读工具）"""
+    tools: List[str] = Field(..., description="允许缓存结果的工具名称")
+    ttl: float = Field(default=60.0, gt=0, description="结果缓存时间（秒）")
+    max_entries: int = Field(default=1000, ge=1, description="最多缓存的结果数")
+    max_bytes: int = Field(default=10 * 1024 * 1024, ge=1, description="缓存结果的总字节数上限")
+    
+    @validator('tools')
+    def validate_tools(cls, v):
+        if not v:
+            raise ValueError('至少需要指定一个缓存结果的工具')
+        return v
+
+
 class MCPBaseConfig(BaseModel):
     """MCP服务器基础配置"""
     type: MCPTransportType
     name: Optional[str] = None
     enabled: bool = True
-    timeout: int = Field(default=30, ge=1, le=300)
+    timeout: int = Field(default=30, ge=1, le=300, description="代理请求和工具调用的超时时间（秒）")
+    tool_timeouts: Dict[str, float] = Field(default_factory=dict, description="按工具名覆盖的调用超时时间（秒）")
     require_auth: bool = Field(default=True, description="是否需要API Key认证")
+    rate_limit: Optional[RateLimitConfig] = Field(default=None, description="服务器整体限流")
+    key_rate_limit: Optional[RateLimitConfig] = Field(default=None, description="每个API Key访问该服务器的限流")
+    lazy: bool = Field(default=False, description="是否在首个请求到达时才启动后端")
+    idle_timeout: Optional[float] = Field(default=None, gt=0, description="无请求多少秒后关闭后端，None表示不自动关闭")
+    restart_policy: Optional[RestartPolicyConfig] = Field(default=None, description="自动重启策略，未配置时使用默认策略")
+    max_concurrency: Optional[int] = Field(default=None, ge=1, description="同时转发到该服务器的最大请求数，None表示不限制")
+    max_queue: int = Field(default=100, ge=0, description="超出并发上限时最多排队的请求数，队列已满时立即返回503")
+    queue_timeout: float = Field(default=30.0, gt=0, description="请求最长排队时间（秒），超时返回503")
+    cache: Optional[ToolCacheConfig] = Field(default=None, description="工具结果缓存，未配置时不缓存")
+    coalesce_tools: List[str] = Field(default_factory=list, description="合并相同并发调用的工具名称（仅适用于幂等的只读工具）")
+    listing_cache_ttl: float = Field(default=60.0, ge=0, description="上游工具/资源/提示词列表的缓存时间（秒），0表示不缓存")
+    
+    @validator('tool_timeouts')
+    def validate_tool_timeouts(cls, v):
+        for tool_name, tool_timeout in v.items():
+            if not 0 < tool_timeout <= 3600:
+                raise ValueError(f'工具 {tool_name} 的超时时间必须在 (0, 3600] 秒之间')
+        return v
     
     class Config:
         extra = "allow"  # 允许额外字段，保持兼容性
@@ -32,6 +100,7 @@ class StdioConfig(MCPBaseConfig):
     command: str
     args: List[str] = []
     env: Dict[str, str] = {}
+    replicas: int = Field(default=1, ge=1, le=32, description="子进程副本数量，请求在副本间负载均衡")
 
 
 class SSEConfig(MCPBaseConfig):
@@ -39,6 +108,8 @@ class SSEConfig(MCPBaseConfig):
     type: Literal[MCPTransportType.SSE]
     url: str
     headers: Dict[str, str] = {}
+    http: Optional[HttpPoolConfig] = Field(default=None, description="上游HTTP连接池配置")
+    session_pool: int = Field(default=0, ge=0, le=32, description="保持连接并复用的上游会话数量，0表示每个客户端会话使用独立的上游会话")
 
 
 class StreamableHTTPConfig(MCPBaseConfig):
@@ -46,6 +117,8 @@ class StreamableHTTPConfig(MCPBaseConfig):
     type: Literal[MCPTransportType.STREAMABLE_HTTP]
     url: str
     headers: Dict[str, str] = {}
+    http: Optional[HttpPoolConfig] = Field(default=None, description="上游HTTP连接池配置")
+    session_pool: int = Field(default=0, ge=0, le=32, description="保持连接并复用的上游会话数量，0表示每个客户端会话使用独立的上游会话")
 
 
 class RouteConfig(BaseModel):
@@ -60,6 +133,8 @@ class OpenAPIConfig(MCPBaseConfig):
     spec_url: str
     api_base_url: str
     route_configs: List[RouteConfig]
+    http: Optional[HttpPoolConfig] = Field(default=None, description="上游HTTP连接池配置")
+    http_cache: Optional[HttpCacheConfig] = Field(default=None, description="上游HTTP响应缓存，未配置时不缓存")
 
 
 # 联合类型，对应所有可能的配置
@@ -132,6 +207,7 @@ class APIKeyConfig(BaseModel):
     enabled: bool = Field(default=True, description="是否启用")
     created_at: Optional[datetime] = Field(default=None, description="创建时间")
     expires_at: Optional[datetime] = Field(default=None, description="过期时间")
+    rate_limit: Optional[RateLimitConfig] = Field(default=None, description="该Key访问所有MCP服务器的总限流")
     
     @validator('key')
     def validate_key(cls, v):
@@ -0,0 +1,189 @@
+"""并发隔离舱 - 按服务器限制并发请求数，超出部分在有界队列中排队"""
+
+import asyncio
+from collections import deque
+from typing import Any, Dict, Optional
+
+from fastmcp.server.dependencies import get_http_request
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from mcp import McpError
+from mcp.types import ErrorData
+
+# 由调度器写入转发请求的 scope，表示该请求的并发槽位由服务器中间件在执行时获取
+BULKHEAD_SCOPE_KEY = 'mcpcat.bulkhead'
+
+# 与HTTP请求被隔离舱拒绝时返回的503状态一致
+SERVER_BUSY = 503
+
+
+class BulkheadRejected(Exception):
+    """请求被隔离舱拒绝（队列已满或排队超时）"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        """
+        初始化异常
+
+        Args:
+            message: 拒绝原因
+            retry_after: 建议客户端的重试等待时间（秒）
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    """
+    单个服务器的并发隔离舱
+
+    同时执行的请求数不超过 max_concurrency，超出的请求按到达顺序（FIFO）排队，
+    排队超过 queue_timeout 秒后放弃；队列长度达到 max_queue 时新请求立即被拒绝。
+    请求结束时槽位直接移交给队首的请求，后到的请求不会插队。
+    max_concurrency 为 None 时不限制并发，只统计进行中的请求数。
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_queue: int = 100,
+                 queue_timeout: float = 30.0):
+        """
+        初始化隔离舱
+
+        Args:
+            max_concurrency: 最大并发请求数，None表示不限制
+            max_queue: 最大排队请求数
+            queue_timeout: 最长排队时间（秒）
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.peak_queued = 0
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        """当前排队的请求数"""
+        return len(self._waiters)
+
+    def _has_capacity(self) -> bool:
+        return self.max_concurrency is None or self.active < self.max_concurrency
+
+    async def acquire(self) -> None:
+        """
+        获取一个执行槽位，必要时排队等待
+
+        Raises:
+            BulkheadRejected: 队列已满或排队超时
+        """
+        if self._has_capacity() and not self._waiters:
+            self.active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise BulkheadRejected(
+                f"并发已达上限（{self.max_concurrency}），排队请求已满（{self.max_queue}）"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_queued = max(self.peak_queued, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise BulkheadRejected(f"排队等待超过 {self.queue_timeout:g} 秒")
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """
+        放弃排队，槽位已经移交给该请求时转交给下一个请求
+
+        Args:
+            waiter: 排队请求的等待对象
+        """
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+            return
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        """释放执行槽位，队列中有请求时直接移交给队首请求"""
+        self.active -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """在有空闲槽位时按FIFO顺序唤醒排队的请求"""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    def configure(self, max_concurrency: Optional[int], max_queue: int, queue_timeout: float) -> None:
+        """
+        更新限制（配置变更时），进行中和排队的请求保持不变
+
+        Args:
+            max_concurrency: 最大并发请求数，None表示不限制
+            max_queue: 最大排队请求数
+            queue_timeout: 最长排队时间（秒）
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._wake_waiters()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出隔离舱配置与统计
+
+        Returns:
+            Dict[str, Any]: 并发限制、进行中/排队请求数和拒绝次数
+        """
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'queue_timeout': self.queue_timeout,
+            'active': self.active,
+            'queued': self.queued,
+            'peak_queued': self.peak_queued,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out
+        }
+
+
+class BulkheadMiddleware(Middleware):
+    """
+    在服务器内执行请求时占用并发槽位
+
+    SSE传输的消息POST在消息入队后立即返回202，请求随后在会话任务中执行，
+    因此调度器不在转发时获取槽位，而是把隔离舱放入请求的 scope，由本中间件在请求执行期间持有槽位。
+    其他请求（Streamable HTTP 由调度器在转发时获取，进程内调用由 use_server 获取）不受影响。
+    """
+
+    @staticmethod
+    def _scope_bulkhead() -> Optional[Bulkhead]:
+        try:
+            return get_http_request().scope.get(BULKHEAD_SCOPE_KEY)
+        except RuntimeError:
+            return None
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        bulkhead = self._scope_bulkhead()
+        if bulkhead is None:
+            return await call_next(context)
+        try:
+            await bulkhead.acquire()
+        except BulkheadRejected as e:
+            raise McpError(ErrorData(code=SERVER_BUSY, message=f"服务器繁忙: {e}"))
+        try:
+            return await call_next(context)
+        finally:
+            bulkhead.release()
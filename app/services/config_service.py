@@ -2,9 +2,10 @@
 
 import os
 import json
+import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 
 from app.core.config import settings
 from app.models.mcp_config import MCPConfig, create_config_from_dict, MCPCatConfig
@@ -12,26 +13,157 @@ from app.models.mcp_config import MCPConfig, create_config_from_dict, MCPCatConf
 logger = logging.getLogger(__name__)
 
 
+class ConfigFileError(Exception):
+    """配置文件存在但无法读取或解析"""
+
+
 class ConfigService:
     """配置服务 - 负责加载和验证MCP服务器配置"""
     
+    # 配置变更监听器：配置写入或检测到外部修改时以完整配置字典调用
+    _change_listeners: List[Callable[[Dict], None]] = []
+    # 最近一次已知的配置文件修改时间，用于识别外部修改
+    _known_mtime: Optional[int] = None
+    
     @staticmethod
-    def load_raw_config() -> Dict:
+    def add_change_listener(listener: Callable[[Dict], None]) -> None:
         """
-        加载原始配置文件
+        注册配置变更监听器
         
+        Args:
+            listener: 回调函数，参数为变更后的完整配置字典
+        """
+        if listener not in ConfigService._change_listeners:
+            ConfigService._change_listeners.append(listener)
+    
+    @staticmethod
+    def _notify_change(config_dict: Dict) -> None:
+        """通知所有监听器配置已变更，单个监听器出错不影响其他监听器"""
+        for listener in list(ConfigService._change_listeners):
+            try:
+                listener(config_dict)
+            except Exception as e:
+                logger.error(f"配置变更监听器执行失败: {e}")
+    
+    @staticmethod
+    def check_for_external_change() -> bool:
+        """
+        检查配置文件是否被外部修改，如有修改则重新加载并通知监听器
+
+        文件无法读取或解析时（例如编辑器写入到一半、文件被截断）不通知监听器，
+        监听器保留之前的配置；也不记录本次修改时间，下次轮询时重试。
+
         Returns:
-            Dict: 配置字典
+            bool: 是否检测到外部修改
+        """
+        mtime = ConfigService.get_config_mtime()
+        if mtime is None or mtime == ConfigService._known_mtime:
+            return False
+
+        try:
+            config_dict = ConfigService.read_config_file()
+        except ConfigFileError as e:
+            logger.warning(f"配置文件已修改但无法解析，保留当前配置，下次检查时重试: {e}")
+            return False
+
+        ConfigService._known_mtime = mtime
+        logger.info("检测到配置文件被外部修改，重新加载配置")
+        ConfigService._notify_change(config_dict)
+        return True
+    
+    @staticmethod
+    async def watch_config_file(interval: float) -> None:
+        """
+        后台轮询配置文件的修改时间，检测外部修改
+        
+        Args:
+            interval: 轮询间隔（秒）
+        """
+        ConfigService._known_mtime = ConfigService.get_config_mtime()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                ConfigService.check_for_external_change()
+            except Exception as e:
+                logger.error(f"检查配置文件变更时出错: {e}")
+    
+    @staticmethod
+    def get_config_file() -> Path:
+        """
+        获取配置文件的绝对路径
+        
+        Returns:
+            Path: 配置文件路径
         """
         # 从config.py获取配置文件路径
         config_path = settings.mcpcat_config_path
-        print(f"配置文件路径: {config_path}")
         
         # 如果是相对路径，则相对于项目根目录
         if not os.path.isabs(config_path):
-            config_file = Path(__file__).parent.parent.parent / config_path
-        else:
-            config_file = Path(config_path)
+            return Path(__file__).parent.parent.parent / config_path
+        return Path(config_path)
+    
+    @staticmethod
+    def get_config_mtime() -> Optional[int]:
+        """
+        获取配置文件的修改时间，用于判断文件是否被外部修改
+        
+        Returns:
+            Optional[int]: 修改时间（纳秒），文件不存在时返回None
+        """
+        try:
+            return ConfigService.get_config_file().stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    @staticmethod
+    def read_config_file() -> Dict:
+        """
+        读取并解析配置文件，不回退到默认配置
+        
+        Returns:
+            Dict: 配置字典
+            
+        Raises:
+            ConfigFileError: 文件无法读取、不是合法的JSON或顶层不是JSON对象
+        """
+        config_file = ConfigService.get_config_file()
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config_dict = json.load(f)
+            if not isinstance(config_dict, dict):
+                raise ValueError("配置文件顶层不是JSON对象")
+        except (OSError, ValueError) as e:
+            raise ConfigFileError(f"无法解析配置文件 {config_file}: {e}") from e
+        return config_dict
+    
+    @staticmethod
+    def load_config_strict() -> Dict:
+        """
+        加载配置，文件不存在时创建默认配置，文件存在但无法解析时抛出异常
+        
+        与 load_config 不同，不会把损坏的配置文件当作空配置（例如没有任何API Key）继续运行。
+        
+        Returns:
+            Dict: 配置字典
+            
+        Raises:
+            ConfigFileError: 配置文件存在但无法解析
+        """
+        if not ConfigService.get_config_file().exists():
+            return ConfigService.load_raw_config()
+        return ConfigService.read_config_file()
+    
+    @staticmethod
+    def load_raw_config() -> Dict:
+        """
+        加载原始配置文件
+        
+        Returns:
+            Dict: 配置字典
+        """
+        config_file = ConfigService.get_config_file()
+        print(f"配置文件路径: {settings.mcpcat_config_path}")
         
         if config_file.exists():
             try:
@@ -124,14 +256,7 @@ class ConfigService:
             bool: 是否保存成功
         """
         try:
-            # 从config.py获取配置文件路径
-            config_path = settings.mcpcat_config_path
-            
-            # 如果是相对路径，则相对于项目根目录
-            if not os.path.isabs(config_path):
-                config_file = Path(__file__).parent.parent.parent / config_path
-            else:
-                config_file = Path(config_path)
+            config_file = ConfigService.get_config_file()
             
             # 确保目录存在
             config_file.parent.mkdir(parents=True, exist_ok=True)
@@ -141,11 +266,15 @@ class ConfigService:
                 json.dump(config_dict, f, indent=2, ensure_ascii=False)
             
             logger.info(f"✓ 配置已保存到: {config_file}")
-            return True
             
         except Exception as e:
             logger.error(f"✗ 保存配置失败: {e}")
             return False
+        
+        # 记录自身写入的修改时间，避免被当作外部修改重复加载
+        ConfigService._known_mtime = ConfigService.get_config_mtime()
+        ConfigService._notify_change(config_dict)
+        return True
     
     @staticmethod
     def add_server_to_config(server_name: str, server_config: dict) -> bool:
@@ -0,0 +1,200 @@
+"""后端健康状态 - 主动探测结果、延迟统计与熔断器"""
+
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class BackendHealth:
+    """
+    单个后端的健康状态
+
+    记录最近若干次探测的延迟，在每次探测后计算 p50/p95 并缓存，
+    读取健康信息时不需要重新计算；连续失败达到阈值后标记为 degraded / unhealthy。
+    """
+
+    def __init__(self, window: int = 50, degraded_after: int = 1, unhealthy_after: int = 3):
+        """
+        初始化健康状态
+
+        Args:
+            window: 计算延迟分位数使用的最近探测次数
+            degraded_after: 连续失败多少次后标记为 degraded
+            unhealthy_after: 连续失败多少次后标记为 unhealthy
+        """
+        self.degraded_after = degraded_after
+        self.unhealthy_after = unhealthy_after
+        self._latencies: deque = deque(maxlen=window)
+
+        self.state = 'unknown'
+        self.consecutive_failures = 0
+        self.probes = 0
+        self.failures = 0
+        self.last_latency: Optional[float] = None
+        self.p50: Optional[float] = None
+        self.p95: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_probe_at: Optional[float] = None
+
+    def record_success(self, latency: float) -> None:
+        """
+        记录一次成功的探测
+
+        Args:
+            latency: 探测耗时（秒）
+        """
+        self.probes += 1
+        self.last_probe_at = time.time()
+        self.last_latency = latency
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.state = 'healthy'
+
+        self._latencies.append(latency)
+        ordered = sorted(self._latencies)
+        self.p50 = ordered[(len(ordered) - 1) // 2]
+        self.p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record_failure(self, error: str) -> None:
+        """
+        记录一次失败的探测
+
+        Args:
+            error: 失败原因
+        """
+        self.probes += 1
+        self.failures += 1
+        self.last_probe_at = time.time()
+        self.consecutive_failures += 1
+        self.last_error = error
+
+        if self.consecutive_failures >= self.unhealthy_after:
+            self.state = 'unhealthy'
+        elif self.consecutive_failures >= self.degraded_after:
+            self.state = 'degraded'
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出健康信息
+
+        Returns:
+            Dict[str, Any]: 健康状态、延迟（毫秒）和探测统计
+        """
+        def to_ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 2) if seconds is not None else None
+
+        return {
+            'state': self.state,
+            'latency_ms': to_ms(self.last_latency),
+            'p50_ms': to_ms(self.p50),
+            'p95_ms': to_ms(self.p95),
+            'consecutive_failures': self.consecutive_failures,
+            'probes': self.probes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_probe_at': self.last_probe_at
+        }
+
+
+class CircuitBreaker:
+    """
+    后端熔断器
+
+    后端故障时打开（open），代理直接返回503和Retry-After而不再转发请求；
+    自动重启进行中为半开（half_open），重启成功后关闭（closed）。
+    同时记录时间窗口内的重启次数，用于限制重启频率。
+    """
+
+    def __init__(self):
+        self.state = 'closed'
+        self.reason: Optional[str] = None
+        self.opened_at: Optional[float] = None
+        # 下一次重启尝试的时间点（monotonic）
+        self.retry_at: Optional[float] = None
+        self.restarts = 0
+        self._restart_times: deque = deque()
+
+    def open(self, reason: str, retry_at: float) -> None:
+        """
+        打开熔断器
+
+        Args:
+            reason: 故障原因
+            retry_at: 下一次重启尝试的时间点（monotonic）
+        """
+        if self.state == 'closed':
+            self.opened_at = time.time()
+        self.state = 'open'
+        self.reason = reason
+        self.retry_at = retry_at
+
+    def half_open(self) -> None:
+        """进入半开状态（重启进行中）"""
+        self.state = 'half_open'
+
+    def close(self) -> None:
+        """关闭熔断器（后端恢复）"""
+        self.state = 'closed'
+        self.reason = None
+        self.opened_at = None
+        self.retry_at = None
+
+    def retry_after(self) -> float:
+        """
+        获取客户端建议的重试等待时间
+
+        Returns:
+            float: 秒数，重启进行中时为1秒
+        """
+        if self.state == 'open' and self.retry_at is not None:
+            return max(1.0, self.retry_at - time.monotonic())
+        return 1.0
+
+    def recent_restarts(self, window: float) -> int:
+        """
+        统计时间窗口内的重启次数
+
+        Args:
+            window: 时间窗口（秒）
+
+        Returns:
+            int: 窗口内的重启次数
+        """
+        cutoff = time.monotonic() - window
+        while self._restart_times and self._restart_times[0] < cutoff:
+            self._restart_times.popleft()
+        return len(self._restart_times)
+
+    def next_restart_allowed_at(self, window: float) -> float:
+        """
+        计算窗口内重启次数用尽时，下一次允许重启的时间点
+
+        Args:
+            window: 时间窗口（秒）
+
+        Returns:
+            float: 时间点（monotonic）
+        """
+        if not self._restart_times:
+            return time.monotonic()
+        return self._restart_times[0] + window
+
+    def record_restart(self) -> None:
+        """记录一次重启尝试"""
+        self.restarts += 1
+        self._restart_times.append(time.monotonic())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出熔断器状态
+
+        Returns:
+            Dict[str, Any]: 熔断状态、故障原因、重启次数和建议重试时间
+        """
+        return {
+            'state': self.state,
+            'reason': self.reason,
+            'opened_at': self.opened_at,
+            'restarts': self.restarts,
+            'retry_after': round(self.retry_after(), 1) if self.state != 'closed' else None
+        }
@@ -0,0 +1,199 @@
+"""上游HTTP连接池 - 同一服务器的所有上游会话共享可配置的连接池"""
+
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.services.http_response_cache import CachingTransport, HttpResponseCache
+
+logger = logging.getLogger(__name__)
+
+# 未配置超时时与MCP SDK的默认值一致：连接30秒，读取5分钟（SSE流需要较长的读取超时）
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+
+
+class UpstreamHttpPool:
+    """
+    单个服务器的上游HTTP连接池
+
+    SSE / Streamable HTTP 的每个上游会话、OpenAPI 的每次API调用都会创建或使用各自的
+    httpx 客户端（携带各自的请求头），但底层连接都来自这个连接池，从而在会话之间复用连接。
+    连接池由服务器的生命周期管理：首次使用时创建，生命周期结束时关闭，
+    服务器再次启动时重新创建。
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 5.0, http2: bool = False,
+                 connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None):
+        """
+        初始化连接池配置
+
+        Args:
+            max_connections: 最大连接数
+            max_keepalive_connections: 最多保持的空闲连接数
+            keepalive_expiry: 空闲连接保持时间（秒）
+            http2: 是否启用HTTP/2（需要安装 h2）
+            connect_timeout: 连接超时（秒），None表示使用默认值
+            read_timeout: 读取超时（秒），None表示使用默认值
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        if http2 and importlib.util.find_spec('h2') is None:
+            logger.warning("未安装 h2，HTTP/2 不可用，上游连接使用 HTTP/1.1（pip install 'httpx[http2]'）")
+            http2 = False
+        self.http2 = http2
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self.requests = 0
+        self.pool_timeouts = 0
+        self.opened = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'UpstreamHttpPool':
+        """
+        根据服务器配置中的 http 字段创建连接池
+
+        Args:
+            config: http 配置，未配置时使用默认值
+
+        Returns:
+            UpstreamHttpPool: 连接池
+        """
+        return cls(**(config or {}))
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        """获取底层连接池，已关闭或尚未创建时创建新的连接池"""
+        if self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+            self.opened += 1
+        return self._transport
+
+    async def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        通过连接池发送请求
+
+        Args:
+            request: HTTP请求
+
+        Returns:
+            httpx.Response: HTTP响应
+        """
+        self.requests += 1
+        try:
+            return await self._get_transport().handle_async_request(request)
+        except httpx.PoolTimeout:
+            # 等待空闲连接超时，说明 max_connections 偏小
+            self.pool_timeouts += 1
+            raise
+
+    def _timeout(self, timeout: Optional[httpx.Timeout]) -> httpx.Timeout:
+        """在调用方的超时基础上应用配置的连接/读取超时"""
+        base = timeout if timeout is not None else DEFAULT_TIMEOUT
+        return httpx.Timeout(
+            connect=self.connect_timeout or base.connect,
+            read=self.read_timeout or base.read,
+            write=base.write,
+            pool=base.pool
+        )
+
+    def create_client(self, timeout: Optional[httpx.Timeout] = None,
+                      response_cache: Optional[HttpResponseCache] = None, **kwargs) -> httpx.AsyncClient:
+        """
+        创建使用该连接池的 httpx 客户端，关闭客户端不会关闭连接池
+
+        Args:
+            timeout: 调用方要求的超时，连接/读取超时被配置值覆盖
+            response_cache: 响应缓存，提供时请求先经过缓存
+            **kwargs: 其他 httpx.AsyncClient 参数（base_url、headers、auth 等）
+
+        Returns:
+            httpx.AsyncClient: HTTP客户端
+        """
+        kwargs.setdefault('follow_redirects', True)
+        transport: httpx.AsyncBaseTransport = _PooledTransport(self)
+        if response_cache is not None:
+            transport = CachingTransport(transport, response_cache)
+        return httpx.AsyncClient(transport=transport, timeout=self._timeout(timeout), **kwargs)
+
+    def client_factory(self, headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[httpx.Timeout] = None,
+                       auth: Optional[httpx.Auth] = None, **kwargs) -> httpx.AsyncClient:
+        """
+        MCP传输使用的 httpx_client_factory，每个上游会话一个客户端，共享连接池
+
+        Args:
+            headers: 会话请求头
+            timeout: MCP SDK 要求的超时
+            auth: 认证
+
+        Returns:
+            httpx.AsyncClient: HTTP客户端
+        """
+        return self.create_client(timeout=timeout, headers=headers, auth=auth, **kwargs)
+
+    async def aclose(self) -> None:
+        """关闭连接池中的所有连接"""
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            await transport.aclose()
+
+    @asynccontextmanager
+    async def lifespan(self, server):
+        """
+        连接池的生命周期：服务器生命周期结束时关闭所有上游连接
+
+        Args:
+            server: FastMCP服务器实例
+        """
+        try:
+            yield {}
+        finally:
+            await self.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池使用统计
+
+        Returns:
+            Dict[str, Any]: 连接池限制、当前连接数（活跃/空闲/HTTP2）和请求统计
+        """
+        connections = list(self._transport._pool.connections) if self._transport is not None else []
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry,
+            'http2': self.http2,
+            'connections': len(connections),
+            'active_connections': len(connections) - idle,
+            'idle_connections': idle,
+            'http2_connections': sum(
+                1 for connection in connections
+                if getattr(connection, '_connection', None) is not None
+                and type(connection._connection).__name__ == 'AsyncHTTP2Connection'
+            ),
+            'requests': self.requests,
+            'pool_timeouts': self.pool_timeouts,
+            'opened': self.opened
+        }
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """把请求转发到共享连接池的传输，客户端关闭时不关闭连接池（连接池由生命周期关闭）"""
+
+    def __init__(self, pool: UpstreamHttpPool):
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool.handle_request(request)
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,469 @@
+"""上游HTTP响应缓存 - OpenAPI服务器调用上游API时遵循 Cache-Control / ETag / Last-Modified 的响应缓存"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 可以缓存的请求方法和响应状态码
+CACHEABLE_METHODS = frozenset({'GET', 'HEAD'})
+CACHEABLE_STATUS = frozenset({200, 203})
+# 成功后使同一URL的缓存失效的方法
+UNSAFE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+# 缓存的响应体已经解码，重新构造响应时去掉描述原始传输编码的头
+_STRIPPED_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    解析 Cache-Control 头
+
+    Args:
+        value: 头的值
+
+    Returns:
+        Dict[str, Optional[str]]: 指令名（小写）-> 参数，没有参数的指令为None
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: httpx.Headers, now: float) -> float:
+    """
+    计算响应的新鲜度有效期
+
+    Args:
+        headers: 响应头
+        now: 当前时间（wall clock）
+
+    Returns:
+        float: 有效期（秒），已扣除响应的 Age；no-cache 或没有新鲜度信息时为0
+    """
+    directives = parse_cache_control(headers.get('cache-control'))
+    if 'no-cache' in directives:
+        return 0.0
+    lifetime = _seconds(directives.get('s-maxage'))
+    if lifetime is None:
+        lifetime = _seconds(directives.get('max-age'))
+    if lifetime is None:
+        expires = _http_date(headers.get('expires'))
+        if expires is None:
+            return 0.0
+        lifetime = expires - (_http_date(headers.get('date')) or now)
+    return max(0.0, lifetime - (_seconds(headers.get('age')) or 0))
+
+
+class CachedResponse:
+    """缓存的上游响应（已解码的响应体）及其新鲜度和验证信息"""
+
+    __slots__ = ('status', 'headers', 'body', 'expires_at', 'vary')
+
+    def __init__(self, status: int, headers: List[Tuple[str, str]], body: bytes,
+                 expires_at: float, vary: Dict[str, Optional[str]]):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        # 过期时间点（wall clock，磁盘层在进程重启后仍可判断新鲜度）
+        self.expires_at = expires_at
+        # Vary 中列出的请求头及存储时请求中的值
+        self.vary = vary
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def matches(self, request: httpx.Request) -> bool:
+        """请求的 Vary 头与存储时一致"""
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status, headers=self.headers, content=self.body, request=request)
+
+    def dumps(self) -> bytes:
+        meta = {
+            'status': self.status,
+            'headers': self.headers,
+            'expires_at': self.expires_at,
+            'vary': self.vary
+        }
+        return json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n' + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'CachedResponse':
+        meta, _, body = data.partition(b'\n')
+        meta = json.loads(meta)
+        return cls(meta['status'], [tuple(item) for item in meta['headers']], body,
+                   meta['expires_at'], meta['vary'])
+
+
+class HttpResponseCache:
+    """
+    单个OpenAPI服务器的上游HTTP响应缓存
+
+    作为共享缓存遵循上游API的缓存指令：
+    - 只缓存 GET/HEAD 的 200/203 响应；no-store、private、Vary: * 的响应不缓存
+    - 新鲜度来自 s-maxage / max-age / Expires；没有新鲜度信息但有 ETag / Last-Modified 的响应
+      缓存后每次使用前重新验证（no-cache 同样处理），304 时使用缓存的响应体
+    - 同一URL上成功的 POST/PUT/PATCH/DELETE 使其缓存失效
+    缓存键为方法、URL和配置的请求头（如 Authorization），内存层按 LRU 淘汰并受条目数和
+    总字节数限制；可选的磁盘层保存所有写入的响应，内存未命中时从磁盘读取。
+    磁盘层的文件及大小记录在内存索引中（创建时扫描一次目录），文件读写和删除在工作线程中进行，
+    不阻塞事件循环。
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 50 * 1024 * 1024,
+                 max_entry_bytes: int = 1024 * 1024, key_headers: Iterable[str] = ('authorization', 'accept'),
+                 disk_dir: Optional[str] = None, disk_max_bytes: int = 500 * 1024 * 1024):
+        """
+        初始化响应缓存
+
+        Args:
+            max_entries: 内存中最多缓存的响应数
+            max_bytes: 内存中缓存响应体的总字节数上限
+            max_entry_bytes: 单个响应体的字节数上限，更大的响应不缓存
+            key_headers: 计入缓存键的请求头
+            disk_dir: 磁盘层目录，None表示不使用磁盘层
+            disk_max_bytes: 磁盘层总字节数上限，超出时删除最早写入的响应
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.key_headers = tuple(sorted(header.lower() for header in key_headers))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        # 磁盘层的文件名 -> 字节数，按写入时间排列（最早写入的在前）
+        self._disk_index: "OrderedDict[str, int]" = self._scan_disk()
+        self.disk_bytes = sum(self._disk_index.values())
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.bytes_saved = 0
+
+    def make_key(self, request: httpx.Request) -> str:
+        """
+        生成缓存键
+
+        Args:
+            request: 上游请求
+
+        Returns:
+            str: 方法、URL和配置的请求头组成的缓存键
+        """
+        parts = [request.method, str(request.url)]
+        parts.extend(f"{name}:{request.headers.get(name, '')}" for name in self.key_headers)
+        return '\n'.join(parts)
+
+    @staticmethod
+    def _disk_name(key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+    def _scan_disk(self) -> "OrderedDict[str, int]":
+        """读取磁盘层已有的响应文件及大小，按修改时间排列"""
+        index: "OrderedDict[str, int]" = OrderedDict()
+        if self.disk_dir is None or not self.disk_dir.is_dir():
+            return index
+        files = []
+        for path in self.disk_dir.iterdir():
+            if path.is_file() and not path.name.endswith('.tmp'):
+                stat = path.stat()
+                files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            index[name] = size
+        return index
+
+    async def lookup(self, key: str, request: httpx.Request) -> Optional[CachedResponse]:
+        """
+        查找缓存的响应（不论是否新鲜）
+
+        Args:
+            key: 缓存键
+            request: 上游请求，用于匹配 Vary
+
+        Returns:
+            Optional[CachedResponse]: 缓存的响应，未命中时返回None
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.disk_dir is not None and self._disk_name(key) in self._disk_index:
+            try:
+                data = await asyncio.to_thread((self.disk_dir / self._disk_name(key)).read_bytes)
+                entry = CachedResponse.loads(data)
+            except FileNotFoundError:
+                # 文件已被外部删除
+                self.disk_bytes -= self._disk_index.pop(self._disk_name(key), 0)
+                entry = None
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"读取磁盘缓存的响应失败: {e}")
+                entry = None
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        if entry is not None and not entry.matches(request):
+            return None
+        return entry
+
+    def storable(self, response: httpx.Response) -> bool:
+        """
+        在读取响应体之前判断响应是否可能被缓存
+
+        Args:
+            response: 上游响应
+
+        Returns:
+            bool: 状态码可缓存、缓存指令允许存储且响应体未超出单个响应的上限
+        """
+        if response.status_code not in CACHEABLE_STATUS:
+            return False
+        directives = parse_cache_control(response.headers.get('cache-control'))
+        if 'no-store' in directives or 'private' in directives:
+            return False
+        length = _seconds(response.headers.get('content-length'))
+        return length is None or length <= self.max_entry_bytes
+
+    async def store(self, key: str, request: httpx.Request, response: httpx.Response, body: bytes) -> None:
+        """
+        按响应的缓存指令存储响应
+
+        Args:
+            key: 缓存键
+            request: 上游请求
+            response: 上游响应（响应体已读取）
+            body: 解码后的响应体
+        """
+        vary_header = response.headers.get('vary', '')
+        if not self.storable(response) or vary_header.strip() == '*' or len(body) > self.max_entry_bytes:
+            return
+
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now)
+        has_validators = 'etag' in response.headers or 'last-modified' in response.headers
+        if not lifetime and not has_validators:
+            return
+
+        vary = {
+            name.strip().lower(): request.headers.get(name.strip())
+            for name in vary_header.split(',') if name.strip()
+        }
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in _STRIPPED_HEADERS]
+        entry = CachedResponse(response.status_code, headers, body, now + lifetime, vary)
+        self.stores += 1
+        self._remember(key, entry)
+        await self._write_disk(key, entry)
+
+    async def refresh(self, key: str, entry: CachedResponse, response: httpx.Response) -> None:
+        """
+        304 响应后更新缓存响应的头和新鲜度
+
+        Args:
+            key: 缓存键
+            entry: 缓存的响应
+            response: 上游的 304 响应
+        """
+        updated = {name.lower(): value for name, value in response.headers.multi_items()
+                   if name.lower() not in _STRIPPED_HEADERS}
+        entry.headers = [(name, value) for name, value in entry.headers if name.lower() not in updated] + \
+            [(name, value) for name, value in response.headers.multi_items() if name.lower() in updated]
+        now = time.time()
+        entry.expires_at = now + freshness_lifetime(httpx.Headers(entry.headers), now)
+        await self._write_disk(key, entry)
+
+    async def invalidate(self, request: httpx.Request) -> None:
+        """
+        修改请求成功后使同一URL的缓存失效
+
+        内存层中该URL的所有缓存项都会失效（无论请求头）；磁盘层按文件名无法找出URL，
+        只删除与该请求相同请求头的 GET/HEAD 缓存项。
+
+        Args:
+            request: 成功的修改请求
+        """
+        target = str(request.url)
+        keys = {key for key in self._entries if key.split('\n', 2)[1] == target}
+        for method in CACHEABLE_METHODS:
+            keys.add(self.make_key(httpx.Request(method, request.url, headers=request.headers)))
+        for key in keys:
+            if await self._forget(key):
+                self.invalidations += 1
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        if key in self._entries:
+            self._forget(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            evicted = self._entries.popitem(last=False)[1]
+            self.bytes -= evicted.size
+
+    async def _forget(self, key: str) -> bool:
+        """删除内存层和磁盘层的缓存项，返回是否存在"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+        found = entry is not None
+        name = self._disk_name(key)
+        if self.disk_dir is not None and name in self._disk_index:
+            self.disk_bytes -= self._disk_index.pop(name)
+            await asyncio.to_thread(self._unlink_files, [name])
+            found = True
+        return found
+
+    async def _write_disk(self, key: str, entry: CachedResponse) -> None:
+        """写入磁盘层，超出上限时删除最早写入的响应，写入失败只记录警告"""
+        if self.disk_dir is None:
+            return
+        name = self._disk_name(key)
+        data = entry.dumps()
+        try:
+            await asyncio.to_thread(self._write_file, name, data)
+        except OSError as e:
+            logger.warning(f"写入磁盘缓存失败: {e}")
+            return
+        self.disk_bytes += len(data) - self._disk_index.pop(name, 0)
+        self._disk_index[name] = len(data)
+        evicted = []
+        while self.disk_bytes > self.disk_max_bytes and self._disk_index:
+            evicted_name, size = self._disk_index.popitem(last=False)
+            self.disk_bytes -= size
+            evicted.append(evicted_name)
+        if evicted:
+            await asyncio.to_thread(self._unlink_files, evicted)
+
+    def _write_file(self, name: str, data: bytes) -> None:
+        """在工作线程中写入响应文件（先写临时文件再替换）"""
+        path = self.disk_dir / name
+        tmp_path = path.with_name(f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _unlink_files(self, names: List[str]) -> None:
+        """在工作线程中删除响应文件"""
+        for name in names:
+            try:
+                (self.disk_dir / name).unlink()
+            except OSError:
+                pass
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出缓存统计
+
+        Returns:
+            Dict[str, Any]: 条目数、占用字节数、命中/重新验证/未命中次数、命中率和节省的字节数
+        """
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'disk_bytes': self.disk_bytes if self.disk_dir is not None else None,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'stores': self.stores,
+            'invalidations': self.invalidations,
+            'hit_ratio': round((self.hits + self.revalidated) / lookups, 4) if lookups else None,
+            'bytes_saved': self.bytes_saved
+        }
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """在上游传输之前查询响应缓存的传输"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cache: HttpResponseCache):
+        self._transport = transport
+        self._cache = cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cache = self._cache
+        if request.method not in CACHEABLE_METHODS:
+            response = await self._transport.handle_async_request(request)
+            if request.method in UNSAFE_METHODS and response.status_code < 400:
+                await cache.invalidate(request)
+            return response
+
+        request_directives = parse_cache_control(request.headers.get('cache-control'))
+        if 'no-store' in request_directives:
+            return await self._transport.handle_async_request(request)
+
+        key = cache.make_key(request)
+        entry = await cache.lookup(key, request)
+        if entry is not None and 'no-cache' not in request_directives and time.time() < entry.expires_at:
+            cache.hits += 1
+            cache.bytes_saved += entry.size
+            return entry.to_response(request)
+
+        if entry is not None:
+            etag = entry.header('etag')
+            last_modified = entry.header('last-modified')
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if last_modified:
+                request.headers['If-Modified-Since'] = last_modified
+
+        response = await self._transport.handle_async_request(request)
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            cache.revalidated += 1
+            cache.bytes_saved += entry.size
+            await cache.refresh(key, entry, response)
+            return entry.to_response(request)
+
+        cache.misses += 1
+        if not cache.storable(response):
+            return response
+
+        # 读取并解码响应体后以解码后的内容重新构造响应
+        body = await response.aread()
+        await cache.store(key, request, response, body)
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in _STRIPPED_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body,
+                              request=request, extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
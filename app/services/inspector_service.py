@@ -1,97 +1,176 @@
 import asyncio
 import logging
 import uuid
+from contextlib import AsyncExitStack
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-import httpx
-from fastmcp import Client
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
 
 logger = logging.getLogger(__name__)
 
-class McpcatAuth(httpx.Auth):
-    def __init__(self, api_key: str):
-        self.api_key = api_key
+class InspectorSession:
+    """
+    Inspector session holding one connected, initialized MCP client for its lifetime.
 
-    def auth_flow(self, request):
-        request.headers["Mcpcat-Key"] = self.api_key
-        yield request
+    The client talks to the server's FastMCP instance in-process (in-memory transport),
+    so inspector traffic never goes back through the HTTP listener. The client is
+    entered once on connect and exited on close; when the server is restarted and its
+    instance replaced, the next request reconnects to the new instance.
+    """
 
-class InspectorSession:
-    def __init__(self, server_name: str, client: Client):
+    def __init__(self, server_name: str, server_manager):
         self.id = str(uuid.uuid4())
         self.server_name = server_name
-        self.client = client
+        self.server_manager = server_manager
+        self.client: Optional[Client] = None
         self.created_at = datetime.now()
         self.last_used = datetime.now()
+        self.reconnects = 0
+        self._mcp: Optional[FastMCP] = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._stack is not None and self.client is not None and self.client.is_connected()
+
+    async def connect(self, mcp: FastMCP):
+        """Open a client session to the given instance unless one is already open."""
+        async with self._lock:
+            if self.connected and self._mcp is mcp:
+                return
+            if self._mcp is not None and self._mcp is not mcp:
+                logger.info(f"Inspector session {self.id}: {self.server_name} was replaced, reconnecting")
+            await self._open(mcp)
+
+    async def reconnect(self, mcp: FastMCP):
+        """Drop the current client session and open a fresh one."""
+        async with self._lock:
+            await self._open(mcp)
+            self.reconnects += 1
+        logger.info(f"Inspector session {self.id} reconnected to {self.server_name}")
+
+    async def close(self):
+        async with self._lock:
+            await self._close_stack()
+
+    async def _open(self, mcp: FastMCP):
+        await self._close_stack()
+        client = Client(mcp)
+        stack = AsyncExitStack()
+        await stack.enter_async_context(client)
+        self.client, self._mcp, self._stack = client, mcp, stack
+
+    async def _close_stack(self):
+        stack, self._stack = self._stack, None
+        if stack is not None:
+            try:
+                await stack.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing inspector session {self.id}: {e}")
 
 class InspectorService:
     def __init__(self):
         self.sessions: Dict[str, InspectorSession] = {}
         self._cleanup_task = None
 
-    async def create_session(self, server_name: str, base_url: str, api_key: Optional[str] = None) -> str:
-        # Construct internal MCP URL
-        # Note: we use 127.0.0.1 to avoid external networking issues
-        mcp_url = f"{base_url}/mcp/{server_name}"
-        
-        auth = McpcatAuth(api_key) if api_key else None
-            
-        client = Client(mcp_url, auth=auth)
-        session = InspectorSession(server_name, client)
-        
-        # Test connection
-        try:
-            async with client:
-                await client.list_tools()
-        except Exception as e:
-            logger.error(f"Failed to connect to MCP server {server_name}: {e}")
-            raise Exception(f"无法连接到服务器: {str(e)}")
-            
+    async def create_session(self, server_name: str, server_manager) -> str:
+        session = InspectorSession(server_name, server_manager)
+
+        # Connect once and keep the session open; listing tools verifies the connection
+        async with server_manager.use_server(server_name) as mcp:
+            try:
+                await session.connect(mcp)
+                await session.client.list_tools()
+            except Exception as e:
+                await session.close()
+                logger.error(f"Failed to connect to MCP server {server_name}: {e}")
+                raise Exception(f"无法连接到服务器: {str(e)}")
+
         self.sessions[session.id] = session
         return session.id
 
     async def get_tools(self, session_id: str) -> List[Dict[str, Any]]:
         session = self._get_session(session_id)
-        async with session.client:
-            tools = await session.client.list_tools()
-            result = []
-            for tool in tools:
-                schema = self._extract_tool_schema(tool)
-                result.append({
-                    "name": getattr(tool, "name", ""),
-                    "description": getattr(tool, "description", None) or getattr(tool, "title", ""),
-                    "input_schema": schema,
-                })
-            return result
+        # Listing is idempotent, so a failed attempt is retried once on a fresh connection
+        tools = await self._run(session, lambda client: client.list_tools(), retry=True)
+        result = []
+        for tool in tools:
+            schema = self._extract_tool_schema(tool)
+            result.append({
+                "name": getattr(tool, "name", ""),
+                "description": getattr(tool, "description", None) or getattr(tool, "title", ""),
+                "input_schema": schema,
+            })
+        return result
 
     async def call_tool(self, session_id: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         session = self._get_session(session_id)
-        async with session.client:
-            result = await session.client.call_tool(tool_name, arguments)
-            
-            # result is a CallToolResult
-            # It has .data (structured) and .content (unstructured blocks)
-            content_blocks = []
-            for block in result.content:
-                block_any: Any = block
-                text = getattr(block_any, "text", None)
-                data = getattr(block_any, "data", None)
-                if text is not None:
-                    content_blocks.append({"type": "text", "text": text})
-                elif data is not None:
-                    content_blocks.append({"type": "data", "data": data})
-                else:
-                    content_blocks.append({"type": "unknown", "raw": str(block)})
-                    
-            return {
-                "data": result.data,
-                "content": content_blocks,
-                "is_error": result.is_error if hasattr(result, "is_error") else False
-            }
+        # Tool calls may not be idempotent: reconnect after a failure but don't resend the call
+        result = await self._run(session, lambda client: client.call_tool(tool_name, arguments), retry=False)
+        
+        # result is a CallToolResult
+        # It has .data (structured) and .content (unstructured blocks)
+        content_blocks = []
+        for block in result.content:
+            block_any: Any = block
+            text = getattr(block_any, "text", None)
+            data = getattr(block_any, "data", None)
+            if text is not None:
+                content_blocks.append({"type": "text", "text": text})
+            elif data is not None:
+                content_blocks.append({"type": "data", "data": data})
+            else:
+                content_blocks.append({"type": "unknown", "raw": str(block)})
+                
+        return {
+            "data": result.data,
+            "content": content_blocks,
+            "is_error": result.is_error if hasattr(result, "is_error") else False
+        }
+
+    async def _run(self, session: InspectorSession, call, retry: bool):
+        """
+        Run a request on the session's open client.
+
+        The server's availability gates (readiness, breaker, bulkhead) are applied per
+        request. A dropped connection, or one to a replaced instance, is reopened before
+        sending. If the request fails for any reason other than a tool error, the
+        connection is reopened so the next action works; idempotent requests
+        (retry=True) are then sent once more.
+        """
+        async with session.server_manager.use_server(session.server_name) as mcp:
+            await session.connect(mcp)
+            try:
+                return await call(session.client)
+            except ToolError:
+                raise
+            except Exception as e:
+                logger.warning(f"Inspector session {session.id} request failed, reconnecting: {e}")
+                try:
+                    await session.reconnect(mcp)
+                except Exception as reconnect_error:
+                    logger.error(f"Inspector session {session.id} failed to reconnect: {reconnect_error}")
+                    raise e
+                if not retry:
+                    raise
+                return await call(session.client)
+
+    def get_session_server(self, session_id: str) -> str:
+        """Name of the server a session is connected to."""
+        return self._get_session(session_id).server_name
 
     async def close_session(self, session_id: str):
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            await session.close()
+
+    async def close_all_sessions(self):
+        """Close every session's client (on application shutdown)."""
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
 
     def _get_session(self, session_id: str) -> InspectorSession:
         if session_id not in self.sessions:
@@ -150,7 +229,7 @@ class InspectorService:
             
             for sid in to_delete:
                 logger.info(f"Cleaning up inactive inspector session: {sid}")
-                del self.sessions[sid]
+                await self.close_session(sid)
 
 # Singleton
 inspector_service = InspectorService()
@@ -0,0 +1,249 @@
+"""上游列表缓存 - 缓存代理服务器的工具/资源/提示词列表，减少对后端的重复请求"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import mcp.types
+from fastmcp.client.messages import MessageHandler
+from fastmcp.server.proxy import (
+    FastMCPProxy,
+    ProxyPrompt,
+    ProxyPromptManager,
+    ProxyResource,
+    ProxyResourceManager,
+    ProxyTemplate,
+    ProxyTool,
+    ProxyToolManager,
+)
+from fastmcp.tools.tool_transform import apply_transformations_to_tools
+from mcp import McpError
+from mcp.types import METHOD_NOT_FOUND
+
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# 缓存的列表类型 -> (客户端方法, MCP方法名)
+LISTING_METHODS = {
+    'tools': ('list_tools', 'tools/list'),
+    'resources': ('list_resources', 'resources/list'),
+    'resource_templates': ('list_resource_templates', 'resources/templates/list'),
+    'prompts': ('list_prompts', 'prompts/list')
+}
+
+
+class ListingCache:
+    """
+    单个服务器的上游列表缓存
+
+    每个客户端会话都会请求 tools/list 等列表，工具调用时代理也需要先获取工具列表，
+    缓存后这些请求不再访问后端。缓存在以下情况失效：
+    上游发送 notifications/*/list_changed、后端生命周期重新启动、超过 TTL。
+    未命中时相同的并发列表请求总是合并为一次上游请求（即使不缓存）。
+    """
+
+    def __init__(self, ttl: float = 60.0, single_flight: Optional[SingleFlight] = None):
+        """
+        初始化列表缓存
+
+        Args:
+            ttl: 缓存有效期（秒），0表示不缓存
+            single_flight: 请求合并器，与该服务器的工具调用合并共享统计
+        """
+        self.ttl = ttl
+        self.single_flight = single_flight or SingleFlight()
+        # 列表类型 -> (过期时间点(monotonic), 列表)
+        self._entries: Dict[str, tuple] = {}
+        # 每次失效时递增，防止失效前发出的请求把旧列表写回缓存
+        self._generations: Dict[str, int] = {kind: 0 for kind in LISTING_METHODS}
+        self.hits: Dict[str, int] = {kind: 0 for kind in LISTING_METHODS}
+        self.misses: Dict[str, int] = {kind: 0 for kind in LISTING_METHODS}
+        self.invalidations = 0
+
+    async def fetch(self, kind: str, client) -> List[Any]:
+        """
+        获取列表，缓存未命中时通过客户端向上游请求
+
+        Args:
+            kind: 列表类型（tools / resources / resource_templates / prompts）
+            client: 代理客户端，仅在未命中时连接
+
+        Returns:
+            List[Any]: 上游返回的MCP列表项，上游不支持该方法时为空列表
+        """
+        entry = self._entries.get(kind)
+        if entry is not None and time.monotonic() < entry[0]:
+            self.hits[kind] += 1
+            return entry[1]
+
+        self.misses[kind] += 1
+        client_method, method = LISTING_METHODS[kind]
+        return await self.single_flight.do(method, '', lambda: self._load(kind, client, client_method))
+
+    async def _load(self, kind: str, client, client_method: str) -> List[Any]:
+        """
+        向上游请求列表并写入缓存
+
+        Args:
+            kind: 列表类型
+            client: 代理客户端
+            client_method: 客户端的列表方法名
+
+        Returns:
+            List[Any]: 上游返回的MCP列表项
+        """
+        generation = self._generations[kind]
+        try:
+            async with client:
+                items = await getattr(client, client_method)()
+        except McpError as e:
+            if e.error.code != METHOD_NOT_FOUND:
+                raise
+            items = []
+
+        if self.ttl > 0 and generation == self._generations[kind]:
+            self._entries[kind] = (time.monotonic() + self.ttl, items)
+        return items
+
+    def invalidate(self, *kinds: str) -> None:
+        """
+        使缓存失效
+
+        Args:
+            kinds: 需要失效的列表类型，不指定时全部失效
+        """
+        for kind in kinds or LISTING_METHODS:
+            self._entries.pop(kind, None)
+            self._generations[kind] += 1
+        self.invalidations += 1
+
+    def message_handler(self) -> 'ListChangedHandler':
+        """
+        创建监听上游 list_changed 通知的消息处理器，收到后使对应的缓存失效
+
+        在创建代理客户端时作为 message_handler 传入，通过 new() 复制出的客户端共享同一个处理器。
+
+        Returns:
+            ListChangedHandler: 消息处理器
+        """
+        return ListChangedHandler(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出缓存统计
+
+        Returns:
+            Dict[str, Any]: TTL、各列表类型的命中/未命中次数和失效次数
+        """
+        return {
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations
+        }
+
+
+class ListChangedHandler(MessageHandler):
+    """处理上游的 list_changed 通知，使列表缓存失效"""
+
+    def __init__(self, cache: ListingCache):
+        super().__init__()
+        self.cache = cache
+
+    async def on_tool_list_changed(self, message: mcp.types.ToolListChangedNotification) -> None:
+        logger.info("上游工具列表已变更，清除缓存")
+        self.cache.invalidate('tools')
+
+    async def on_resource_list_changed(self, message: mcp.types.ResourceListChangedNotification) -> None:
+        logger.info("上游资源列表已变更，清除缓存")
+        self.cache.invalidate('resources', 'resource_templates')
+
+    async def on_prompt_list_changed(self, message: mcp.types.PromptListChangedNotification) -> None:
+        logger.info("上游提示词列表已变更，清除缓存")
+        self.cache.invalidate('prompts')
+
+
+class CachedProxyToolManager(ProxyToolManager):
+    """从列表缓存获取上游工具的工具管理器"""
+
+    def __init__(self, client_factory, listing_cache: ListingCache, **kwargs):
+        super().__init__(client_factory=client_factory, **kwargs)
+        self.listing_cache = listing_cache
+
+    async def get_tools(self):
+        all_tools = await super(ProxyToolManager, self).get_tools()
+        # 缓存命中时客户端不会连接，工具执行时再由 ProxyTool 进入客户端上下文
+        client = await self._get_client()
+        for tool in await self.listing_cache.fetch('tools', client):
+            if tool.name not in all_tools:
+                all_tools[tool.name] = ProxyTool.from_mcp_tool(client, tool)
+        return apply_transformations_to_tools(tools=all_tools, transformations=self.transformations)
+
+
+class CachedProxyResourceManager(ProxyResourceManager):
+    """从列表缓存获取上游资源和资源模板的资源管理器"""
+
+    def __init__(self, client_factory, listing_cache: ListingCache, **kwargs):
+        super().__init__(client_factory=client_factory, **kwargs)
+        self.listing_cache = listing_cache
+
+    async def get_resources(self):
+        all_resources = await super(ProxyResourceManager, self).get_resources()
+        client = await self._get_client()
+        for resource in await self.listing_cache.fetch('resources', client):
+            if str(resource.uri) not in all_resources:
+                all_resources[str(resource.uri)] = ProxyResource.from_mcp_resource(client, resource)
+        return all_resources
+
+    async def get_resource_templates(self):
+        all_templates = await super(ProxyResourceManager, self).get_resource_templates()
+        client = await self._get_client()
+        for template in await self.listing_cache.fetch('resource_templates', client):
+            if template.uriTemplate not in all_templates:
+                all_templates[template.uriTemplate] = ProxyTemplate.from_mcp_template(client, template)
+        return all_templates
+
+
+class CachedProxyPromptManager(ProxyPromptManager):
+    """从列表缓存获取上游提示词的提示词管理器"""
+
+    def __init__(self, client_factory, listing_cache: ListingCache, **kwargs):
+        super().__init__(client_factory=client_factory, **kwargs)
+        self.listing_cache = listing_cache
+
+    async def get_prompts(self):
+        all_prompts = await super(ProxyPromptManager, self).get_prompts()
+        client = await self._get_client()
+        for prompt in await self.listing_cache.fetch('prompts', client):
+            if prompt.name not in all_prompts:
+                all_prompts[prompt.name] = ProxyPrompt.from_mcp_prompt(client, prompt)
+        return all_prompts
+
+
+class CachedFastMCPProxy(FastMCPProxy):
+    """使用上游列表缓存的代理服务器"""
+
+    def __init__(self, *, client_factory, listing_cache: Optional[ListingCache] = None, **kwargs):
+        """
+        初始化代理服务器
+
+        Args:
+            client_factory: 返回代理客户端的工厂函数
+            listing_cache: 列表缓存，未提供时使用默认TTL
+        """
+        super().__init__(client_factory=client_factory, **kwargs)
+        self.listing_cache = listing_cache or ListingCache()
+        self._tool_manager = CachedProxyToolManager(
+            client_factory=self.client_factory,
+            listing_cache=self.listing_cache,
+            transformations=self._tool_manager.transformations
+        )
+        self._resource_manager = CachedProxyResourceManager(
+            client_factory=self.client_factory,
+            listing_cache=self.listing_cache
+        )
+        self._prompt_manager = CachedProxyPromptManager(
+            client_factory=self.client_factory,
+            listing_cache=self.listing_cache
+        )
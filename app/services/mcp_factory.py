@@ -1,12 +1,28 @@
 """MCP服务器工厂 - 封装服务器创建逻辑"""
 
+import asyncio
+import hashlib
 import logging
 import httpx
 from typing import Optional, Dict, Any
 from fastmcp import FastMCP
+from fastmcp.client.transports import ClientTransport, SSETransport, StreamableHttpTransport
 from fastmcp.server.openapi import RouteMap, MCPType
 
-from app.models.mcp_config import MCPConfig, StdioConfig, SSEConfig, StreamableHTTPConfig, OpenAPIConfig
+from app.models.mcp_config import (
+    MCPConfig, StdioConfig, SSEConfig, StreamableHTTPConfig, OpenAPIConfig, HttpCacheConfig
+)
+from app.services.bulkhead import BulkheadMiddleware
+from app.services.http_pool import UpstreamHttpPool
+from app.services.http_response_cache import HttpResponseCache
+from app.services.listing_cache import CachedFastMCPProxy, ListingCache
+from app.services.openapi_artifact_cache import OpenAPIArtifactCache
+from app.services.openapi_spec_cache import OpenAPISpecCache, openapi_cache_dir
+from app.services.replica_pool import StdioReplicaPool
+from app.services.result_cache import ResultCacheMiddleware, ToolResultCache
+from app.services.session_pool import PooledProxyClient, UpstreamSessionPool
+from app.services.single_flight import CoalescingMiddleware, SingleFlight
+from app.services.upstream_timeouts import TimeoutProxyClient, ToolTimeoutMiddleware, UpstreamTimeouts
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +59,10 @@ class MCPServerFactory:
                 return None
             
             if mcp:
+                MCPServerFactory._apply_coalescing(mcp, config_data)
+                MCPServerFactory._apply_result_cache(mcp, config_data)
+                # 最外层：SSE请求在执行期间占用并发槽位，与Streamable HTTP请求一样覆盖缓存命中
+                mcp.middleware.insert(0, BulkheadMiddleware())
                 logger.info(f"✓ MCP服务器 {name} 创建成功")
             else:
                 logger.error(f"✗ MCP服务器 {name} 创建失败")
@@ -53,6 +73,24 @@ class MCPServerFactory:
             logger.error(f"创建MCP服务器 {name} 时发生异常: {e}")
             return None
     
+    @staticmethod
+    async def create_server_async(name: str, config_data: Dict[str, Any]) -> Optional[FastMCP]:
+        """
+        在事件循环中创建MCP服务器，不阻塞其他请求
+        
+        OpenAPI服务器需要下载和解析规范，在工作线程中创建；其他类型的创建不涉及I/O，直接创建。
+        
+        Args:
+            name: 服务器名称
+            config_data: 配置数据字典
+            
+        Returns:
+            Optional[FastMCP]: 创建的MCP服务器实例，失败时返回None
+        """
+        if config_data.get('type') == 'openapi':
+            return await asyncio.to_thread(MCPServerFactory.create_server, name, config_data)
+        return MCPServerFactory.create_server(name, config_data)
+    
     @staticmethod
     def _create_stdio_server(config_data: Dict[str, Any]) -> FastMCP:
         """
@@ -75,7 +113,126 @@ class MCPServerFactory:
                 }
             }
         }
-        return FastMCP.as_proxy(mcp_config, name="Config-Based Proxy")
+        # 子进程由副本池管理：默认一个副本，配置 replicas 时在同一名称背后运行多个子进程
+        timeouts = MCPServerFactory._create_timeouts(config_data)
+        listings = ListingCache(ttl=config_data.get('listing_cache_ttl', 60.0))
+        pool = StdioReplicaPool(
+            mcp_config, replicas=config_data.get('replicas', 1), timeouts=timeouts, listings=listings
+        )
+        mcp = CachedFastMCPProxy(
+            client_factory=pool.client_factory,
+            listing_cache=listings,
+            name="Config-Based Proxy",
+            lifespan=pool.lifespan
+        )
+        # 供服务器管理器读取副本负载统计和超时统计
+        mcp.replica_pool = pool
+        mcp.upstream_timeouts = timeouts
+        return mcp
+    
+    @staticmethod
+    def _apply_coalescing(mcp: FastMCP, config_data: Dict[str, Any]) -> None:
+        """
+        按配置合并相同的并发工具调用
+        
+        代理服务器的列表请求总是合并（由列表缓存完成），工具调用的合并与其共享同一个合并器和统计。
+        
+        Args:
+            mcp: MCP服务器实例
+            config_data: 配置数据
+        """
+        listing_cache = getattr(mcp, 'listing_cache', None)
+        tools = config_data.get('coalesce_tools')
+        if listing_cache is None and not tools:
+            return
+        single_flight = listing_cache.single_flight if listing_cache is not None else SingleFlight()
+        if tools:
+            mcp.middleware.insert(0, CoalescingMiddleware(single_flight, tools))
+        # 供服务器管理器读取合并统计
+        mcp.single_flight = single_flight
+    
+    @staticmethod
+    def _apply_result_cache(mcp: FastMCP, config_data: Dict[str, Any]) -> None:
+        """
+        按配置为服务器启用工具结果缓存
+        
+        缓存中间件位于并发隔离舱之内的最外层，命中时不经过请求合并、超时控制等其他中间件，也不访问上游。
+        
+        Args:
+            mcp: MCP服务器实例
+            config_data: 配置数据
+        """
+        cache_config = config_data.get('cache')
+        if not cache_config:
+            return
+        cache = ToolResultCache(
+            tools=cache_config['tools'],
+            ttl=cache_config.get('ttl', 60.0),
+            max_entries=cache_config.get('max_entries', 1000),
+            max_bytes=cache_config.get('max_bytes', 10 * 1024 * 1024)
+        )
+        mcp.middleware.insert(0, ResultCacheMiddleware(cache))
+        # 供服务器管理器读取缓存统计和清空缓存
+        mcp.result_cache = cache
+    
+    @staticmethod
+    def _create_timeouts(config_data: Dict[str, Any]) -> UpstreamTimeouts:
+        """
+        根据配置创建上游超时设置
+        
+        Args:
+            config_data: 配置数据
+            
+        Returns:
+            UpstreamTimeouts: 默认超时为 timeout，工具调用可由 tool_timeouts 按工具覆盖
+        """
+        return UpstreamTimeouts(
+            default=config_data.get('timeout', 30),
+            tools=config_data.get('tool_timeouts')
+        )
+    
+    @staticmethod
+    def _create_remote_proxy(transport: ClientTransport, http_pool: UpstreamHttpPool,
+                             config_data: Dict[str, Any]) -> FastMCP:
+        """
+        创建转发到远程MCP服务器的代理，工具/资源/提示词列表由所有会话共享的列表缓存提供
+        
+        默认每个客户端会话使用独立的上游会话（与 FastMCP.as_proxy 一致）；
+        配置 session_pool 时请求复用会话池中保持连接的上游会话。
+        
+        Args:
+            transport: 远程服务器的传输，其HTTP客户端来自 http_pool
+            http_pool: 上游HTTP连接池，由服务器的生命周期关闭
+            config_data: 配置数据
+            
+        Returns:
+            FastMCP: MCP服务器实例
+        """
+        timeouts = MCPServerFactory._create_timeouts(config_data)
+        listings = ListingCache(ttl=config_data.get('listing_cache_ttl', 60.0))
+        pool_size = config_data.get('session_pool', 0)
+        if pool_size:
+            client = PooledProxyClient(transport, timeouts=timeouts, message_handler=listings.message_handler())
+            session_pool = UpstreamSessionPool(client, size=pool_size, http_pool=http_pool)
+            mcp = CachedFastMCPProxy(
+                client_factory=session_pool.client_factory,
+                listing_cache=listings,
+                name="Config-Based Proxy",
+                lifespan=session_pool.lifespan
+            )
+            # 供服务器管理器探测、重连会话和读取会话统计
+            mcp.session_pool = session_pool
+        else:
+            client = TimeoutProxyClient(transport, timeouts=timeouts, message_handler=listings.message_handler())
+            mcp = CachedFastMCPProxy(
+                client_factory=client.new,
+                listing_cache=listings,
+                name="Config-Based Proxy",
+                lifespan=http_pool.lifespan
+            )
+        mcp.upstream_timeouts = timeouts
+        mcp.http_pool = http_pool
+        return mcp
     
     @staticmethod
     def _create_sse_server(config_data: Dict[str, Any]) -> FastMCP:
@@ -90,16 +247,9 @@ class MCPServerFactory:
         """
         headers = config_data.get('headers', {})
         url = config_data.get('url', "")
-        mcp_config = {
-            "mcpServers": {
-                "default": {
-                    "url": url,
-                    "transport": "sse",
-                    "headers": headers
-                }
-            }
-        }
-        return FastMCP.as_proxy(mcp_config, name="Config-Based Proxy")
+        http_pool = UpstreamHttpPool.from_config(config_data.get('http'))
+        transport = SSETransport(url, headers=headers, httpx_client_factory=http_pool.client_factory)
+        return MCPServerFactory._create_remote_proxy(transport, http_pool, config_data)
     
     @staticmethod
     def _create_streamable_http_server(config_data: Dict[str, Any]) -> FastMCP:
@@ -114,16 +264,38 @@ class MCPServerFactory:
         """
         headers = config_data.get('headers', {})
         url = config_data.get('url', "")
-        mcp_config = {
-            "mcpServers": {
-                "default": {
-                    "url": url,
-                    "transport": "streamable-http",
-                    "headers": headers
-                }
-            }
-        }
-        return FastMCP.as_proxy(mcp_config, name="Config-Based Proxy")
+        http_pool = UpstreamHttpPool.from_config(config_data.get('http'))
+        transport = StreamableHttpTransport(url, headers=headers, httpx_client_factory=http_pool.client_factory)
+        return MCPServerFactory._create_remote_proxy(transport, http_pool, config_data)
+    
+    @staticmethod
+    def _create_response_cache(config_data: Dict[str, Any]) -> Optional[HttpResponseCache]:
+        """
+        按配置创建上游HTTP响应缓存
+        
+        Args:
+            config_data: 配置数据
+            
+        Returns:
+            Optional[HttpResponseCache]: 响应缓存，未配置 http_cache 时返回None
+        """
+        if config_data.get('http_cache') is None:
+            return None
+        # 按校验后的字段创建，配置中的未知字段已被模型忽略
+        cache_config = HttpCacheConfig(**config_data['http_cache'])
+        disk_dir = None
+        if cache_config.disk:
+            # 磁盘层按上游API地址分目录，不同服务器的缓存互不影响
+            base_url_hash = hashlib.sha256(config_data['api_base_url'].encode('utf-8')).hexdigest()[:16]
+            disk_dir = str(openapi_cache_dir() / "http_responses" / base_url_hash)
+        return HttpResponseCache(
+            max_entries=cache_config.max_entries,
+            max_bytes=cache_config.max_bytes,
+            max_entry_bytes=cache_config.max_entry_bytes,
+            key_headers=cache_config.key_headers,
+            disk_dir=disk_dir,
+            disk_max_bytes=cache_config.disk_max_bytes
+        )
     
     @staticmethod
     def _create_openapi_server(config_data: Dict[str, Any]) -> FastMCP:
@@ -136,8 +308,18 @@ class MCPServerFactory:
         Returns:
             FastMCP: MCP服务器实例
         """
-        client = httpx.AsyncClient(base_url=config_data['api_base_url'])
-        openapi_spec = httpx.get(config_data["spec_url"]).json()
+        # 工具调用的超时由中间件按工具控制，HTTP客户端的超时取最长的配置值，
+        # 连接来自服务器的上游连接池（连接/读取超时可由 http 配置覆盖）
+        timeouts = MCPServerFactory._create_timeouts(config_data)
+        http_pool = UpstreamHttpPool.from_config(config_data.get('http'))
+        response_cache = MCPServerFactory._create_response_cache(config_data)
+        client = http_pool.create_client(
+            base_url=config_data['api_base_url'],
+            timeout=httpx.Timeout(timeouts.longest),
+            response_cache=response_cache
+        )
+        # 规范优先使用本地缓存（有效期内或规范主机不可达时），否则带超时下载并重新验证
+        openapi_spec = OpenAPISpecCache.from_settings().load(config_data["spec_url"])
         route_map_list = []
         route_configs = config_data["route_configs"]
         
@@ -151,9 +333,19 @@ class MCPServerFactory:
         # 添加默认的排除规则 - 与原逻辑一致
         route_map_list.append(RouteMap(mcp_type=MCPType.EXCLUDE))
         
-        return FastMCP.from_openapi(
-            openapi_spec=openapi_spec,
+        # 规范和路由配置未变化时从预编译产物创建工具，跳过规范解析和路由映射
+        mcp = OpenAPIArtifactCache.from_settings().build(
+            openapi_spec,
+            route_configs,
             client=client,
+            route_maps=route_map_list,
             name="openapi2mcpserver server",
-            route_maps=route_map_list
-        ) 
\ No newline at end of file
+            lifespan=http_pool.lifespan
+        )
+        mcp.add_middleware(ToolTimeoutMiddleware(timeouts))
+        # 供服务器管理器探测上游API的可达性和读取超时统计
+        mcp.http_client = client
+        mcp.http_pool = http_pool
+        mcp.http_cache = response_cache
+        mcp.upstream_timeouts = timeouts
+        return mcp
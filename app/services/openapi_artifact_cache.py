@@ -0,0 +1,267 @@
+"""OpenAPI工具产物缓存 - 缓存规范解析和路由映射的结果，规范未变化时跳过解析"""
+
+import asyncio
+import gc
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastmcp import FastMCP
+from fastmcp.server.openapi import FastMCPOpenAPI, OpenAPITool, RouteMap
+from fastmcp.utilities.openapi import HTTPRoute
+from fastmcp.utilities.openapi.director import RequestDirector
+from jsonschema_path import SchemaPath
+
+from app.services.openapi_spec_cache import openapi_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# 产物格式版本，产物内容或加载方式变化时递增，使旧产物失效
+ARTIFACT_FORMAT = 1
+
+
+def _fastmcp_version() -> str:
+    """fastmcp的版本，解析和工具生成逻辑随版本变化，作为产物键的一部分"""
+    try:
+        return version('fastmcp')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def _owns_process() -> bool:
+    """当前是否为同步启动阶段：在主线程中调用且没有运行中的事件循环"""
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False
+
+
+@contextmanager
+def _gc_paused():
+    """
+    同步启动阶段暂停循环垃圾回收
+
+    构建大规范的服务器会在短时间内创建数十万个存活对象，期间反复触发的分代回收
+    占据了大部分耗时。gc.disable() 作用于整个进程，因此只在同步启动阶段暂停
+    （此时没有事件循环和其他服务器在运行），构建完成后恢复原来的状态；
+    运行期间在工作线程中构建（add/restart）时不暂停，以构建变慢为代价，
+    避免事件循环和并发启动的其他服务器在构建期间失去循环垃圾回收。
+    """
+    if not _owns_process():
+        yield
+        return
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class PrecompiledFastMCPOpenAPI(FastMCPOpenAPI):
+    """
+    从预编译产物创建的OpenAPI服务器
+
+    与 FastMCPOpenAPI 生成的工具相同（名称、描述、参数和输出模式、路由信息），
+    但不再解析规范、匹配路由映射和构建工具模式；规范只用于运行时构造请求。
+    """
+
+    def __init__(self, openapi_spec: Dict[str, Any], client: httpx.AsyncClient,
+                 artifact: Dict[str, Any], name: Optional[str] = None,
+                 timeout: Optional[float] = None, **settings: Any):
+        """
+        初始化OpenAPI服务器
+
+        Args:
+            openapi_spec: OpenAPI规范（供运行时构造请求）
+            client: 调用上游API的HTTP客户端
+            artifact: 预编译产物
+            name: 服务器名称
+            timeout: 上游API请求超时（秒）
+            **settings: 其他FastMCP参数
+        """
+        FastMCP.__init__(self, name=name or "OpenAPI FastMCP", **settings)
+        self._client = client
+        self._timeout = timeout
+        self._mcp_component_fn = None
+        self._used_names = {kind: Counter() for kind in ('tool', 'resource', 'resource_template', 'prompt')}
+        self._spec = SchemaPath.from_dict(openapi_spec)
+        self._director = RequestDirector(self._spec)
+
+        for entry in artifact['tools']:
+            route = HTTPRoute.model_validate(entry['route'])
+            tool = OpenAPITool(
+                client=client,
+                route=route,
+                director=self._director,
+                name=entry['name'],
+                description=entry['description'],
+                # 与 FastMCPOpenAPI 一致，工具参数即路由的扁平参数模式
+                parameters=route.flat_param_schema,
+                output_schema=entry['output_schema'],
+                tags=set(entry['tags']),
+                timeout=timeout
+            )
+            self._tool_manager._tools[tool.name] = tool
+
+
+class OpenAPIArtifactCache:
+    """
+    OpenAPI工具产物的本地磁盘缓存
+
+    产物是规范解析和路由映射后生成的工具列表（gzip压缩的JSON），
+    键由规范内容的哈希、route_configs 的内容和 fastmcp 版本组成，任一变化都会重新编译。
+    只缓存全部映射为工具的服务器（mcpcat 的 route_configs 只生成工具），其他情况直接构建。
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        初始化产物缓存
+
+        Args:
+            cache_dir: 产物目录
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @classmethod
+    def from_settings(cls) -> 'OpenAPIArtifactCache':
+        """
+        根据应用设置创建产物缓存，产物位于OpenAPI缓存目录下的 artifacts
+
+        Returns:
+            OpenAPIArtifactCache: 产物缓存
+        """
+        return cls(str(openapi_cache_dir() / "artifacts"))
+
+    @staticmethod
+    def artifact_key(openapi_spec: Dict[str, Any], route_configs: List[Dict[str, Any]]) -> str:
+        """
+        计算产物键
+
+        Args:
+            openapi_spec: OpenAPI规范
+            route_configs: 路由配置
+
+        Returns:
+            str: 规范哈希、路由配置和 fastmcp 版本的组合哈希
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{ARTIFACT_FORMAT}:{_fastmcp_version()}\n".encode('utf-8'))
+        digest.update(json.dumps(route_configs, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b"\n")
+        digest.update(json.dumps(openapi_spec, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json.gz"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取产物
+
+        Args:
+            key: 产物键
+
+        Returns:
+            Optional[Dict[str, Any]]: 产物，不存在或损坏时返回None
+        """
+        try:
+            artifact = json.loads(gzip.decompress(self._path(key).read_bytes()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"OpenAPI产物 {key} 损坏，重新编译: {e}")
+            return None
+        return artifact if artifact.get('format') == ARTIFACT_FORMAT else None
+
+    def store(self, key: str, artifact: Dict[str, Any]) -> None:
+        """
+        写入产物，写入失败只记录警告
+
+        Args:
+            key: 产物键
+            artifact: 产物
+        """
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(artifact, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            tmp_path.write_bytes(gzip.compress(data, compresslevel=5))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入OpenAPI产物缓存失败: {e}")
+
+    @staticmethod
+    def compile(mcp: FastMCPOpenAPI) -> Optional[Dict[str, Any]]:
+        """
+        从完整构建的OpenAPI服务器提取产物
+
+        Args:
+            mcp: FastMCP.from_openapi 创建的服务器
+
+        Returns:
+            Optional[Dict[str, Any]]: 产物，服务器包含工具以外的组件时返回None（不缓存）
+        """
+        if mcp._resource_manager._resources or mcp._resource_manager._templates:
+            return None
+        tools = []
+        for tool in mcp._tool_manager._tools.values():
+            if not isinstance(tool, OpenAPITool) or tool.parameters != tool._route.flat_param_schema:
+                return None
+            tools.append({
+                'name': tool.name,
+                'description': tool.description,
+                'output_schema': tool.output_schema,
+                'tags': sorted(tool.tags),
+                'route': tool._route.model_dump(mode='json', by_alias=True, exclude_defaults=True)
+            })
+        return {'format': ARTIFACT_FORMAT, 'tools': tools}
+
+    def build(self, openapi_spec: Dict[str, Any], route_configs: List[Dict[str, Any]],
+              client: httpx.AsyncClient, route_maps: List[RouteMap], **kwargs: Any) -> FastMCPOpenAPI:
+        """
+        创建OpenAPI服务器，有产物时从产物创建，否则完整构建并写入产物
+        （同步启动阶段构建期间暂停循环垃圾回收）
+
+        Args:
+            openapi_spec: OpenAPI规范
+            route_configs: 路由配置（产物键的一部分）
+            client: 调用上游API的HTTP客户端
+            route_maps: 由 route_configs 生成的路由映射
+            **kwargs: 其他FastMCP参数（name、lifespan 等）
+
+        Returns:
+            FastMCPOpenAPI: OpenAPI服务器
+        """
+        with _gc_paused():
+            key = self.artifact_key(openapi_spec, route_configs)
+            artifact = self.load(key)
+            if artifact is not None:
+                try:
+                    mcp = PrecompiledFastMCPOpenAPI(openapi_spec, client, artifact, **kwargs)
+                    logger.info(f"使用OpenAPI预编译产物 {key}（{len(artifact['tools'])} 个工具）")
+                    mcp.openapi_artifact = 'hit'
+                    return mcp
+                except Exception as e:
+                    logger.warning(f"加载OpenAPI产物 {key} 失败，重新编译: {e}")
+
+            mcp = FastMCP.from_openapi(openapi_spec=openapi_spec, client=client, route_maps=route_maps, **kwargs)
+            artifact = self.compile(mcp)
+            if artifact is not None:
+                self.store(key, artifact)
+            mcp.openapi_artifact = 'miss'
+            return mcp
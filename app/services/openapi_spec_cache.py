@@ -0,0 +1,157 @@
+"""OpenAPI规范缓存 - 按URL缓存到本地目录，使用 ETag / Last-Modified 重新验证"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def openapi_cache_dir() -> Path:
+    """
+    OpenAPI缓存所在目录，未配置时使用配置文件所在目录下的 openapi_cache
+
+    Returns:
+        Path: 缓存目录
+    """
+    return Path(settings.mcpcat_openapi_cache_dir or Path(settings.mcpcat_config_path).parent / "openapi_cache")
+
+
+class OpenAPISpecCache:
+    """
+    OpenAPI规范的本地磁盘缓存
+
+    每个规范URL对应缓存目录中的两个文件：规范原文（<key>.json）和验证信息（<key>.meta.json）。
+    获取规范时：
+    1. 缓存未超过有效期时直接使用，不访问规范所在的主机
+    2. 否则携带 If-None-Match / If-Modified-Since 重新验证，304 时继续使用缓存
+    3. 规范主机不可达或返回错误时使用已有的缓存（无论是否过期），没有缓存时抛出异常
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 300.0, timeout: float = 30.0):
+        """
+        初始化规范缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 缓存有效期（秒），有效期内不重新验证，0表示每次都重新验证
+            timeout: 下载规范的超时时间（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls) -> 'OpenAPISpecCache':
+        """
+        根据应用设置创建规范缓存
+
+        Returns:
+            OpenAPISpecCache: 规范缓存
+        """
+        return cls(
+            str(openapi_cache_dir()),
+            ttl=settings.mcpcat_openapi_spec_cache_ttl,
+            timeout=settings.mcpcat_openapi_spec_timeout
+        )
+
+    def _paths(self, url: str) -> tuple:
+        """规范URL对应的规范原文和验证信息文件路径"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.meta.json"
+
+    def _read_cached(self, url: str) -> tuple:
+        """
+        读取缓存的规范原文和验证信息
+
+        Returns:
+            tuple: (规范原文, 验证信息)，没有缓存或缓存损坏时为 (None, None)
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            if meta.get('url') != url:
+                return None, None
+            return body_path.read_bytes(), meta
+        except (OSError, ValueError):
+            return None, None
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """先写入临时文件再替换，读取方不会看到写了一半的文件"""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _store(self, url: str, body: Optional[bytes], meta: Dict[str, Any]) -> None:
+        """
+        写入缓存，写入失败只记录警告（缓存不可写不影响服务器创建）
+
+        Args:
+            url: 规范URL
+            body: 规范原文，None表示只更新验证信息
+            meta: 验证信息
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if body is not None:
+                self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"写入OpenAPI规范缓存失败: {e}")
+
+    def load(self, url: str) -> Dict[str, Any]:
+        """
+        获取OpenAPI规范（同步，会阻塞调用线程，事件循环中应在工作线程中调用）
+
+        Args:
+            url: 规范URL
+
+        Returns:
+            Dict[str, Any]: 解析后的规范
+
+        Raises:
+            httpx.HTTPError: 下载失败且没有缓存
+            ValueError: 下载的规范不是有效的JSON且没有缓存
+        """
+        cached_body, meta = self._read_cached(url)
+        if cached_body is not None and time.time() - meta.get('fetched_at', 0) < self.ttl:
+            return json.loads(cached_body)
+
+        headers = {}
+        if cached_body is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = httpx.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
+            if response.status_code == 304 and cached_body is not None:
+                meta['fetched_at'] = time.time()
+                self._store(url, None, meta)
+                return json.loads(cached_body)
+            response.raise_for_status()
+            spec = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            if cached_body is None:
+                raise
+            logger.warning(f"获取OpenAPI规范 {url} 失败，使用本地缓存: {e}")
+            return json.loads(cached_body)
+
+        self._store(url, response.content, {
+            'url': url,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'fetched_at': time.time()
+        })
+        return spec
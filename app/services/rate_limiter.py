@@ -0,0 +1,129 @@
+"""限流服务 - 基于令牌桶的内存限流"""
+
+import time
+import logging
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.models.mcp_config import RateLimitConfig
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """令牌桶状态，按需惰性补充令牌"""
+
+    __slots__ = ('tokens', 'updated', 'full_at')
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        # 令牌补满的时间点，之后该桶与新建的桶等价，可以被回收
+        self.full_at = now
+
+
+class RateLimiter:
+    """
+    令牌桶限流器
+
+    所有桶保存在按最近访问排序的有序字典中：检查和补充令牌都是O(1)，
+    已补满的空闲桶从队头回收，并以 max_buckets 作为硬上限，保证内存有界。
+    """
+
+    def __init__(self, max_buckets: int = 100000):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._allowed = 0
+        self._rejected = 0
+
+    def acquire(self, limits: Sequence[Tuple[Hashable, RateLimitConfig]]) -> float:
+        """
+        尝试从一组令牌桶中各取一个令牌
+
+        只有所有桶都有令牌时才会扣减，避免一个桶拒绝时其他桶白白消耗令牌。
+
+        Args:
+            limits: (桶标识, 限流配置) 列表
+
+        Returns:
+            float: 0表示放行；大于0表示被拒绝，值为建议的重试等待秒数
+        """
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        buckets = []
+        retry_after = 0.0
+        for bucket_key, limit in limits:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = TokenBucket(float(limit.burst), now)
+                self._buckets[bucket_key] = bucket
+            else:
+                # 惰性补充：按距上次访问的时间补充令牌
+                bucket.tokens = min(
+                    float(limit.burst),
+                    bucket.tokens + (now - bucket.updated) * limit.rate
+                )
+                bucket.updated = now
+                self._buckets.move_to_end(bucket_key)
+
+            if bucket.tokens < 1:
+                retry_after = max(retry_after, (1 - bucket.tokens) / limit.rate)
+            buckets.append((bucket, limit))
+
+        # 新建的桶可能使数量超出上限，回收最久未访问的桶（本次访问的桶都在队尾）
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+
+        if retry_after > 0:
+            for bucket, limit in buckets:
+                bucket.full_at = now + (limit.burst - bucket.tokens) / limit.rate
+            self._rejected += 1
+            return retry_after
+
+        for bucket, limit in buckets:
+            bucket.tokens -= 1
+            bucket.full_at = now + (limit.burst - bucket.tokens) / limit.rate
+        self._allowed += 1
+        return 0.0
+
+    def _evict_idle(self, now: float) -> None:
+        """从队头回收已补满的空闲桶"""
+        buckets = self._buckets
+        while buckets:
+            bucket_key, bucket = next(iter(buckets.items()))
+            if bucket.full_at <= now:
+                buckets.popitem(last=False)
+            else:
+                break
+
+    def reset(self, bucket_key: Optional[Hashable] = None) -> None:
+        """
+        重置令牌桶
+
+        Args:
+            bucket_key: 要重置的桶标识，None表示重置全部
+        """
+        if bucket_key is None:
+            self._buckets.clear()
+        else:
+            self._buckets.pop(bucket_key, None)
+
+    def get_stats(self) -> dict:
+        """
+        获取限流统计信息
+
+        Returns:
+            dict: 当前桶数量、放行和拒绝次数
+        """
+        return {
+            'buckets': len(self._buckets),
+            'max_buckets': self.max_buckets,
+            'allowed': self._allowed,
+            'rejected': self._rejected
+        }
+
+
+# 全局限流器实例
+rate_limiter = RateLimiter(max_buckets=settings.mcpcat_rate_limit_max_buckets)
@@ -0,0 +1,200 @@
+"""STDIO副本池 - 同一个服务器名称背后运行多个子进程并做负载均衡"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_context
+
+from app.services.listing_cache import ListingCache
+from app.services.upstream_timeouts import TimeoutProxyClient, UpstreamTimeouts
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    """单个子进程副本及其负载统计"""
+
+    __slots__ = ('index', 'client', 'in_flight', 'requests')
+
+    def __init__(self, index: int, client: 'ReplicaProxyClient'):
+        self.index = index
+        # 副本的基础客户端，在生命周期内保持连接，每次请求通过 new() 复制
+        self.client = client
+        self.in_flight = 0
+        # 发往该副本的工具调用、资源读取和提示词获取次数（不含列表请求）
+        self.requests = 0
+
+    def new_client(self) -> 'ReplicaProxyClient':
+        """创建绑定到该副本、计入负载统计的客户端"""
+        client = self.client.new()
+        client._replica = self
+        return client
+
+
+class ReplicaProxyClient(TimeoutProxyClient):
+    """
+    绑定到某个副本的代理客户端
+
+    进入和退出客户端上下文时更新副本的进行中请求数，供最少进行中请求负载均衡使用；
+    实际发往副本的工具调用、资源读取和提示词获取计入副本的累计请求数，
+    只用于列表请求（列表缓存）或未发出请求（结果缓存命中）的客户端不计入。
+    基础客户端不绑定副本，只有 Replica.new_client() 创建的请求客户端才计入统计。
+    """
+
+    _replica: Optional[Replica] = None
+
+    def _count_request(self) -> None:
+        if self._replica is not None:
+            self._replica.requests += 1
+
+    async def call_tool_mcp(self, *args, **kwargs):
+        self._count_request()
+        return await super().call_tool_mcp(*args, **kwargs)
+
+    async def read_resource_mcp(self, *args, **kwargs):
+        self._count_request()
+        return await super().read_resource_mcp(*args, **kwargs)
+
+    async def get_prompt_mcp(self, *args, **kwargs):
+        self._count_request()
+        return await super().get_prompt_mcp(*args, **kwargs)
+
+    async def __aenter__(self):
+        replica = self._replica
+        if replica is not None:
+            replica.in_flight += 1
+        try:
+            return await super().__aenter__()
+        except BaseException:
+            if replica is not None:
+                replica.in_flight -= 1
+            raise
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            return await super().__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            if self._replica is not None:
+                self._replica.in_flight -= 1
+
+
+class StdioReplicaPool:
+    """
+    STDIO后端副本池
+
+    每个副本是一个独立的子进程（独立的stdio传输）。没有会话的请求选择进行中请求最少的副本；
+    属于某个MCP会话的请求在首次请求时选定副本后固定到该副本，
+    保证依赖服务端状态的会话流量始终落在同一个子进程上。
+    """
+
+    def __init__(self, mcp_config: Dict[str, Any], replicas: int = 1,
+                 max_pinned_sessions: int = 10000, timeouts: Optional[UpstreamTimeouts] = None,
+                 listings: Optional[ListingCache] = None):
+        """
+        初始化副本池
+
+        Args:
+            mcp_config: 单个stdio服务器的MCP配置（mcpServers格式）
+            replicas: 副本数量
+            max_pinned_sessions: 最多记录的会话固定关系数量，超出后丢弃最久未使用的
+            timeouts: 上游超时配置与统计，所有副本共享
+            listings: 上游列表缓存，任一副本收到 list_changed 通知时失效
+        """
+        self.replicas: List[Replica] = []
+        for index in range(max(1, replicas)):
+            # 每个客户端拥有独立的传输，即独立的子进程
+            client = ReplicaProxyClient(
+                mcp_config, timeouts=timeouts,
+                message_handler=listings.message_handler() if listings is not None else None
+            )
+            self.replicas.append(Replica(index, client))
+
+        self.max_pinned_sessions = max_pinned_sessions
+        self._pinned: "OrderedDict[str, Replica]" = OrderedDict()
+
+    def client_factory(self) -> ReplicaProxyClient:
+        """
+        为当前请求选择副本并返回新的客户端
+
+        Returns:
+            ReplicaProxyClient: 绑定到所选副本的客户端
+        """
+        if len(self.replicas) == 1:
+            return self.replicas[0].new_client()
+
+        session_id = self._current_session_id()
+        if session_id is None:
+            return self._least_outstanding().new_client()
+
+        replica = self._pinned.get(session_id)
+        if replica is None:
+            replica = self._least_outstanding()
+            self._pinned[session_id] = replica
+            if len(self._pinned) > self.max_pinned_sessions:
+                self._pinned.popitem(last=False)
+        else:
+            self._pinned.move_to_end(session_id)
+        return replica.new_client()
+
+    def _least_outstanding(self) -> Replica:
+        """选择进行中请求最少的副本，相同时选择累计请求较少的副本"""
+        return min(self.replicas, key=lambda replica: (replica.in_flight, replica.requests))
+
+    @staticmethod
+    def _current_session_id() -> Optional[str]:
+        """获取当前请求所属的MCP会话ID，不在会话上下文中时返回None"""
+        try:
+            return get_context().session_id
+        except RuntimeError:
+            return None
+
+    @asynccontextmanager
+    async def lifespan(self, server: FastMCP):
+        """
+        副本池的生命周期：子进程的存续与服务器生命周期绑定
+
+        进入时并发启动所有副本子进程并完成MCP初始化握手，生命周期启动完成即表示后端就绪。
+        基础客户端在整个生命周期内保持连接，请求客户端共享其会话，
+        不会因为进行中的请求降为0而反复关闭和重建会话。
+        退出时关闭所有传输并结束子进程，停止或空闲关闭服务器后不会残留子进程。
+
+        Args:
+            server: FastMCP代理服务器实例
+        """
+        try:
+            async with AsyncExitStack() as stack:
+                await asyncio.gather(*(
+                    stack.enter_async_context(replica.client) for replica in self.replicas
+                ))
+                yield {}
+        finally:
+            self._pinned.clear()
+            for replica in self.replicas:
+                try:
+                    await replica.client.transport.close()
+                except Exception as e:
+                    logger.warning(f"关闭副本 {replica.index} 的传输时出错: {e}")
+
+    async def ping(self) -> None:
+        """并发探测所有副本，复用生命周期内保持连接的基础客户端，任一副本失败时抛出异常"""
+        await asyncio.gather(*(replica.client.ping() for replica in self.replicas))
+
+    def get_stats(self) -> List[Dict[str, int]]:
+        """
+        获取每个副本的负载统计
+
+        Returns:
+            List[Dict[str, int]]: 副本序号、进行中请求数和累计的工具调用/资源读取/提示词获取次数
+        """
+        return [
+            {
+                'replica': replica.index,
+                'in_flight': replica.in_flight,
+                'requests': replica.requests
+            }
+            for replica in self.replicas
+        ]
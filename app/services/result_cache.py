@@ -0,0 +1,184 @@
+"""工具结果缓存 - 按配置缓存幂等工具的调用结果"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+logger = logging.getLogger(__name__)
+
+
+class ToolResultCache:
+    """
+    单个服务器的工具结果缓存
+
+    仅缓存配置中列出的工具，缓存键为工具名加规范化后的参数（键排序的JSON）。
+    缓存项按最近使用顺序淘汰（LRU），同时受条目数和总字节数限制，超过 TTL 后过期。
+    """
+
+    def __init__(self, tools: Iterable[str], ttl: float = 60.0,
+                 max_entries: int = 1000, max_bytes: int = 10 * 1024 * 1024):
+        """
+        初始化结果缓存
+
+        Args:
+            tools: 允许缓存结果的工具名称
+            ttl: 缓存有效期（秒）
+            max_entries: 最多缓存的结果数
+            max_bytes: 缓存结果的总字节数上限
+        """
+        self.tools = frozenset(tools)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        # 缓存键 -> (过期时间点(monotonic), 结果, 字节数, 工具名)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {
+            tool: {'hits': 0, 'misses': 0, 'entries': 0, 'bytes': 0} for tool in self.tools
+        }
+
+    @staticmethod
+    def make_key(tool: str, arguments: Optional[Dict[str, Any]]) -> str:
+        """
+        生成缓存键，参数顺序不同但内容相同的调用得到相同的键
+
+        Args:
+            tool: 工具名称
+            arguments: 调用参数
+
+        Returns:
+            str: 缓存键
+        """
+        canonical = json.dumps(arguments or {}, sort_keys=True, separators=(',', ':'),
+                               ensure_ascii=False, default=str)
+        return f"{tool}\n{canonical}"
+
+    @staticmethod
+    def _result_size(result: ToolResult) -> int:
+        """估算结果占用的字节数（序列化后的长度）"""
+        size = sum(len(block.model_dump_json()) for block in result.content)
+        if result.structured_content is not None:
+            size += len(json.dumps(result.structured_content, default=str))
+        return size
+
+    def get(self, tool: str, key: str) -> Optional[ToolResult]:
+        """
+        查找缓存的结果
+
+        Args:
+            tool: 工具名称
+            key: 缓存键
+
+        Returns:
+            Optional[ToolResult]: 未命中或已过期时返回None
+        """
+        stats = self._stats[tool]
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._entries.move_to_end(key)
+            stats['hits'] += 1
+            return entry[1]
+        if entry is not None:
+            self._remove(key)
+        stats['misses'] += 1
+        return None
+
+    def put(self, tool: str, key: str, result: ToolResult) -> None:
+        """
+        缓存结果，超出条目数或字节数限制时淘汰最久未使用的结果
+
+        Args:
+            tool: 工具名称
+            key: 缓存键
+            result: 工具调用结果
+        """
+        size = self._result_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl, result, size, tool)
+        self.bytes += size
+        self._stats[tool]['entries'] += 1
+        self._stats[tool]['bytes'] += size
+
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, _, size, tool = self._entries.pop(key)
+        self.bytes -= size
+        self._stats[tool]['entries'] -= 1
+        self._stats[tool]['bytes'] -= size
+
+    def flush(self) -> int:
+        """
+        清空缓存
+
+        Returns:
+            int: 清除的结果数
+        """
+        count = len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+        for stats in self._stats.values():
+            stats['entries'] = 0
+            stats['bytes'] = 0
+        return count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出缓存配置与统计
+
+        Returns:
+            Dict[str, Any]: 缓存限制、占用和按工具的命中率
+        """
+        tools = {}
+        for tool, stats in self._stats.items():
+            lookups = stats['hits'] + stats['misses']
+            tools[tool] = dict(stats, hit_ratio=round(stats['hits'] / lookups, 3) if lookups else None)
+        return {
+            'ttl': self.ttl,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'tools': tools
+        }
+
+
+class ResultCacheMiddleware(Middleware):
+    """
+    工具结果缓存中间件
+
+    命中时直接返回缓存的结果，不访问上游；只缓存成功的结果（失败的调用会抛出异常）。
+    """
+
+    def __init__(self, cache: ToolResultCache):
+        """
+        初始化中间件
+
+        Args:
+            cache: 结果缓存
+        """
+        self.cache = cache
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        name = context.message.name
+        if name not in self.cache.tools:
+            return await call_next(context)
+
+        key = self.cache.make_key(name, context.message.arguments)
+        result = self.cache.get(name, key)
+        if result is not None:
+            return result
+
+        result = await call_next(context)
+        self.cache.put(name, key, result)
+        return result
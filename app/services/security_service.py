@@ -1,10 +1,13 @@
 """安全服务 - 管理API Key和权限验证"""
 
+import hashlib
 import secrets
 import string
-from typing import Optional, List, Dict
-from datetime import datetime
-from app.models.mcp_config import APIKeyConfig, PermissionType, SecurityConfig
+import time
+from types import MappingProxyType
+from typing import Optional, List, Dict, Mapping, NamedTuple, Tuple
+from datetime import datetime, timezone
+from app.models.mcp_config import APIKeyConfig, PermissionType, SecurityConfig, RateLimitConfig
 from app.services.config_service import ConfigService
 from app.core.config import settings
 import logging
@@ -12,6 +15,39 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def hash_api_key(api_key: str) -> str:
+    """
+    计算API Key的摘要，用作内存索引的键
+
+    Args:
+        api_key: 原始API Key
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+
+class AuthSnapshot(NamedTuple):
+    """
+    认证配置快照 - 构建后不可修改
+    
+    请求处理只读取快照，配置变更时整体替换为新快照，因此热路径上不再访问文件。
+    """
+    # 认证头名称
+    auth_header_name: str
+    # Key摘要 -> (API Key配置, 过期时间戳)
+    key_index: Mapping[str, Tuple[APIKeyConfig, Optional[float]]]
+    # 服务器名称 -> 是否需要认证
+    server_require_auth: Mapping[str, bool]
+    # 服务器名称 -> (服务器整体限流, 每个Key访问该服务器的限流)
+    server_rate_limits: Mapping[str, Tuple[Optional[RateLimitConfig], Optional[RateLimitConfig]]]
+    # 快照版本号（每次重建递增）
+    version: int
+    # 构建时间
+    built_at: datetime
+
+
 class SecurityService:
     """安全服务类"""
 
@@ -19,6 +55,44 @@ class SecurityService:
         self._config_service = ConfigService()
         # 临时存储首次生成的 Key（仅展示一次）
         self._first_run_keys: Optional[dict] = None
+        # 当前认证配置快照，首次使用时构建，配置变更时整体替换
+        self._snapshot: Optional[AuthSnapshot] = None
+        self._snapshot_rebuilds = 0
+        self._config_service.add_change_listener(self._rebuild_snapshot)
+    
+    def get_snapshot(self) -> AuthSnapshot:
+        """
+        获取当前认证配置快照
+        
+        首次构建与配置文件监听使用同一读取方式：配置文件无法解析时抛出异常，
+        而不是以默认配置（没有任何API Key）构建快照。
+        
+        Returns:
+            AuthSnapshot: 认证配置快照
+            
+        Raises:
+            ConfigFileError: 首次构建时配置文件无法解析
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._rebuild_snapshot(self._config_service.load_config_strict())
+            snapshot = self._snapshot
+        return snapshot
+    
+    def get_snapshot_stats(self) -> dict:
+        """
+        获取快照统计信息，用于确认配置读取已离开请求热路径
+        
+        Returns:
+            dict: 快照重建次数、当前版本和构建时间
+        """
+        snapshot = self._snapshot
+        return {
+            'rebuilds': self._snapshot_rebuilds,
+            'version': snapshot.version if snapshot else None,
+            'built_at': snapshot.built_at.isoformat() if snapshot else None,
+            'api_keys': len(snapshot.key_index) if snapshot else 0
+        }
     
     def get_auth_header_name(self) -> str:
         """
@@ -28,13 +102,23 @@ class SecurityService:
             str: 认证头名称
         """
         try:
-            config = self._config_service.load_config()
-            security_config = config.get('security', {})
-            return security_config.get('auth_header_name', 'Mcpcat-Key')
+            return self.get_snapshot().auth_header_name
         except Exception as e:
             logger.error(f"获取认证头名称时出错: {e}")
             return 'Mcpcat-Key'  # 默认值
     
+    def server_requires_auth(self, server_name: str) -> bool:
+        """
+        检查指定MCP服务器是否需要认证
+        
+        Args:
+            server_name: 服务器名称
+            
+        Returns:
+            bool: 是否需要认证，未知服务器默认需要
+        """
+        return self.get_snapshot().server_require_auth.get(server_name, True)
+    
     def _process_datetime_fields(self, key_data: dict) -> dict:
         """
         处理datetime字段的序列化和反序列化
@@ -78,6 +162,96 @@ class SecurityService:
         alphabet = string.ascii_letters + string.digits
         return ''.join(secrets.choice(alphabet) for _ in range(length))
     
+    def _build_key_index(self, config: Dict) -> Dict[str, Tuple[APIKeyConfig, Optional[float]]]:
+        """
+        根据配置构建API Key索引
+        
+        只索引已启用的Key，过期时间预先转换为时间戳，
+        使验证时无需再解析配置和构建模型。
+        
+        Args:
+            config: 完整配置字典
+            
+        Returns:
+            Dict: Key摘要 -> (API Key配置, 过期时间戳)
+        """
+        index: Dict[str, Tuple[APIKeyConfig, Optional[float]]] = {}
+        api_keys = config.get('security', {}).get('api_keys', [])
+        
+        for key_data in api_keys:
+            try:
+                key_config = APIKeyConfig(**self._process_datetime_fields(key_data))
+            except Exception as e:
+                logger.warning(f"跳过无效的API Key配置 {key_data.get('name')}: {e}")
+                continue
+            
+            if not key_config.enabled:
+                continue
+            
+            expires_ts = None
+            if key_config.expires_at:
+                expires_at = key_config.expires_at
+                # 未带时区的过期时间按UTC处理，避免随主机时区偏移
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                expires_ts = expires_at.timestamp()
+            # 与原有的顺序匹配保持一致：重复的Key以第一个为准
+            index.setdefault(hash_api_key(key_config.key), (key_config, expires_ts))
+        
+        return index
+    
+    @staticmethod
+    def _parse_rate_limit(server_name: str, data: Optional[dict]) -> Optional[RateLimitConfig]:
+        """
+        解析服务器的限流配置，配置无效时忽略并记录警告
+        
+        Args:
+            server_name: 服务器名称
+            data: 限流配置字典
+            
+        Returns:
+            Optional[RateLimitConfig]: 限流配置，未配置或无效时返回None
+        """
+        if not data:
+            return None
+        try:
+            return RateLimitConfig(**data)
+        except Exception as e:
+            logger.warning(f"忽略服务器 {server_name} 的无效限流配置: {e}")
+            return None
+    
+    def _rebuild_snapshot(self, config: Dict) -> None:
+        """
+        根据配置重建认证快照并原子替换
+        
+        Args:
+            config: 完整配置字典
+        """
+        security_config = config.get('security', {})
+        server_require_auth = {}
+        server_rate_limits = {}
+        for name, server_config in config.get('mcpServers', {}).items():
+            if not isinstance(server_config, dict):
+                continue
+            server_require_auth[name] = bool(server_config.get('require_auth', True))
+            limits = (
+                self._parse_rate_limit(name, server_config.get('rate_limit')),
+                self._parse_rate_limit(name, server_config.get('key_rate_limit'))
+            )
+            if limits != (None, None):
+                server_rate_limits[name] = limits
+        
+        self._snapshot_rebuilds += 1
+        self._snapshot = AuthSnapshot(
+            auth_header_name=security_config.get('auth_header_name', 'Mcpcat-Key'),
+            key_index=MappingProxyType(self._build_key_index(config)),
+            server_require_auth=MappingProxyType(server_require_auth),
+            server_rate_limits=MappingProxyType(server_rate_limits),
+            version=self._snapshot_rebuilds,
+            built_at=datetime.now()
+        )
+        logger.debug(f"认证快照已重建 (版本 {self._snapshot_rebuilds})")
+    
     def verify_api_key(self, api_key: str) -> Optional[APIKeyConfig]:
         """
         验证API Key
@@ -92,24 +266,17 @@ class SecurityService:
             return None
             
         try:
-            config = self._config_service.load_config()
-            security_config = config.get('security', {})
-            api_keys = security_config.get('api_keys', [])
+            entry = self.get_snapshot().key_index.get(hash_api_key(api_key.strip()))
+            if entry is None:
+                return None
             
-            for key_data in api_keys:
-                processed_data = self._process_datetime_fields(key_data)
-                key_config = APIKeyConfig(**processed_data)
-                
-                # 检查Key是否匹配且启用
-                if key_config.key == api_key.strip() and key_config.enabled:
-                    # 检查是否过期
-                    if key_config.expires_at and datetime.now() > key_config.expires_at:
-                        logger.warning(f"API Key已过期: {key_config.name}")
-                        return None
-                    
-                    return key_config
+            key_config, expires_ts = entry
+            # 检查是否过期
+            if expires_ts is not None and time.time() > expires_ts:
+                logger.warning(f"API Key已过期: {key_config.name}")
+                return None
             
-            return None
+            return key_config
             
         except Exception as e:
             logger.error(f"验证API Key时出错: {e}")
@@ -210,7 +377,7 @@ class SecurityService:
         
         config['security']['api_keys'].append(key_dict)
         
-        # 保存配置
+        # 保存配置（写入后会通过变更监听器重建认证快照）
         self._config_service.save_config(config)
         
         logger.info(f"添加新API Key: {name} ({permission.value})")
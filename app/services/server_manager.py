@@ -2,37 +2,120 @@
 
 import logging
 import asyncio
+import math
+import os
+import random
+import re
+import time
 from typing import Dict, List, Any, Optional, Callable, Set
 from contextlib import AsyncExitStack, asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, RedirectResponse
+from starlette.datastructures import URL
+from starlette.routing import Mount
+from urllib.parse import parse_qs
 
+from app.core.config import settings
 from app.services.config_service import ConfigService
+from app.models.mcp_config import RestartPolicyConfig
+from app.services.bulkhead import BULKHEAD_SCOPE_KEY, Bulkhead, BulkheadRejected
+from app.services.health_monitor import BackendHealth, CircuitBreaker
 from app.services.mcp_factory import MCPServerFactory
 
 logger = logging.getLogger(__name__)
 
+# SSE传输在首个 endpoint 事件中下发会话ID：data: .../messages/?session_id=<hex>
+_SSE_SESSION_ID_PATTERN = re.compile(rb'session_id=([0-9a-fA-F]+)')
+
+
+def _route_path(scope) -> str:
+    """
+    获取挂载点之后的请求路径（scope['path'] 去掉 root_path 前缀）
+    
+    Args:
+        scope: ASGI scope
+        
+    Returns:
+        str: 相对于挂载点的路径
+    """
+    path = scope['path']
+    root_path = scope.get('root_path', '')
+    if root_path and path.startswith(root_path) and path[len(root_path):len(root_path) + 1] in ('', '/'):
+        return path[len(root_path):]
+    return path
+
+
+def _descendant_rss_bytes() -> Optional[int]:
+    """
+    统计当前进程所有子孙进程（stdio后端子进程）的RSS总和
+    
+    Returns:
+        Optional[int]: RSS字节数，不支持 /proc 的平台返回None
+    """
+    root_pid = str(os.getpid())
+    if not os.path.exists(f'/proc/{root_pid}/task'):
+        return None
+    
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            for task_dir in os.scandir(f'/proc/{pid}/task'):
+                with open(os.path.join(task_dir.path, 'children')) as f:
+                    pending.extend(f.read().split())
+            if pid != root_pid:
+                with open(f'/proc/{pid}/statm') as f:
+                    total += int(f.read().split()[1]) * page_size
+        except OSError:
+            # 进程在遍历期间已退出
+            continue
+    return total
+
+
+class ServerUnavailableError(Exception):
+    """服务器当前无法处理进程内请求（不存在、未运行、故障恢复中或繁忙）"""
+
+    def __init__(self, message: str, status_code: int = 503, retry_after: float = 1.0):
+        """
+        初始化异常
+
+        Args:
+            message: 不可用原因
+            status_code: 对应的HTTP状态码
+            retry_after: 建议的重试等待时间（秒）
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
 
 class MCPProxyApp:
     """
-    MCP服务器代理应用 - 允许动态切换底层MCP应用实例
+    MCP服务器代理应用 - 按路径分发到对应服务器的MCP应用实例
     
-    这个代理应用被FastAPI挂载，内部可以动态转发请求到不同的MCP应用实例，
+    每种传输类型只挂载一个代理应用（/mcp 和 /sse），请求路径中的服务器名称
+    通过字典查找到当前的服务器信息，因此路由开销不随服务器数量增长，
+    移除服务器也不会在路由表中留下残留。代理内部转发到最新的应用实例，
     从而实现配置热重载而无需重启整个应用。
     """
     
-    def __init__(self, server_name: str, server_manager: 'MCPServerManager', transport_type: str = 'mcp'):
+    def __init__(self, server_manager: 'MCPServerManager', transport_type: str = 'mcp'):
         """
         初始化代理应用
         
         Args:
-            server_name: 服务器名称
             server_manager: 服务器管理器实例
             transport_type: 传输类型 ('mcp' 或 'sse')
         """
-        self.server_name = server_name
         self.server_manager = server_manager
         self.transport_type = transport_type
+        # 每个应用实例的进行中请求数和存活的会话（Streamable HTTP 下发、尚未结束的会话ID），
+        # 蓝绿重启时用于等待旧实例排空；SSE会话以其GET长连接的存续为准，已计入进行中请求数
+        self._app_in_flight: Dict[Any, int] = {}
+        self._app_sessions: Dict[Any, Set[str]] = {}
+        self._drain_waiters: Dict[Any, asyncio.Event] = {}
     
     async def __call__(self, scope, receive, send):
         """
@@ -43,61 +126,149 @@ class MCPProxyApp:
             receive: ASGI receive callable
             send: ASGI send callable
         """
+        # 挂载点之后的路径形如 /{server_name}/...
+        route_path = _route_path(scope)
+        server_name, separator, _ = route_path[1:].partition('/')
+        
+        if server_name and not separator:
+            # 与按服务器挂载时的行为保持一致：/mcp/{name} 重定向到 /mcp/{name}/
+            redirect_scope = dict(scope)
+            redirect_scope['path'] = scope['path'] + '/'
+            response = RedirectResponse(url=str(URL(scope=redirect_scope)))
+            await response(scope, receive, send)
+            return
+        
         try:
             # 获取当前的服务器信息
-            server_info = self.server_manager.server_info.get(self.server_name)
+            server_info = self.server_manager.server_info.get(server_name) if server_name else None
             
             if not server_info:
                 # 服务器不存在
                 await self._send_error_response(
-                    scope, receive, send,
+                    scope, receive, send, server_name,
                     status_code=404,
-                    message=f"MCP服务器 '{self.server_name}' 不存在"
+                    message=f"MCP服务器 '{server_name}' 不存在"
                 )
                 return
             
-            # 检查服务器状态
+            # 熔断器打开时快速失败，由自动重启负责恢复后端
+            breaker = server_info.get('breaker')
+            if breaker is not None and breaker.state != 'closed':
+                await self._send_error_response(
+                    scope, receive, send, server_name,
+                    status_code=503,
+                    message=f"MCP服务器 '{server_name}' 故障恢复中",
+                    headers={"Retry-After": str(math.ceil(breaker.retry_after()))}
+                )
+                return
+            
+            # 检查服务器状态，空闲、启动中或正在空闲关闭的服务器先排队等待其就绪（按需冷启动），
+            # 等待时间受 mcpcat_request_ready_timeout 限制
             server_status = server_info.get('status', 'unknown')
+            if server_status in ('idle', 'starting', 'stopping'):
+                await self.server_manager.ensure_server_started(
+                    server_name, timeout=settings.mcpcat_request_ready_timeout
+                )
+                server_status = server_info.get('status', 'unknown')
+            if server_status in ('starting', 'stopping'):
+                # 排队超时，后端仍在关闭或启动
+                await self._send_error_response(
+                    scope, receive, send, server_name,
+                    status_code=503,
+                    message=f"MCP服务器 '{server_name}' 启动中，请稍后重试",
+                    headers={"Retry-After": "1"}
+                )
+                return
             if server_status != 'running':
                 # 服务器未运行
                 await self._send_error_response(
-                    scope, receive, send,
+                    scope, receive, send, server_name,
                     status_code=503,
-                    message=f"MCP服务器 '{self.server_name}' 当前不可用 (状态: {server_status})"
+                    message=f"MCP服务器 '{server_name}' 当前不可用 (状态: {server_status})"
                 )
                 return
             
             # 获取目标应用实例
-            if self.transport_type == 'mcp':
-                target_app = server_info.get('mcp_app')
-            elif self.transport_type == 'sse':
-                target_app = server_info.get('sse_app')
-            else:
+            if self.transport_type not in ('mcp', 'sse'):
                 await self._send_error_response(
-                    scope, receive, send,
+                    scope, receive, send, server_name,
                     status_code=500,
                     message=f"不支持的传输类型: {self.transport_type}"
                 )
                 return
+            app_key = f'{self.transport_type}_app'
+            target_app = server_info.get(app_key)
+            
+            # 蓝绿重启排空期间，属于旧实例会话的请求继续发往建立该会话的旧实例，
+            # 新会话和其他请求发往当前实例
+            session_id = self._get_session_id(scope)
+            if session_id is not None:
+                for old_instance in server_info.get('draining', ()):
+                    old_app = old_instance.get(app_key)
+                    if session_id in self._app_sessions.get(old_app, ()):
+                        target_app = old_app
+                        break
             
             if not target_app:
                 # 目标应用不可用
                 await self._send_error_response(
-                    scope, receive, send,
+                    scope, receive, send, server_name,
                     status_code=503,
-                    message=f"MCP服务器 '{self.server_name}' 的 {self.transport_type} 应用不可用"
+                    message=f"MCP服务器 '{server_name}' 的 {self.transport_type} 应用不可用"
                 )
                 return
             
-            # 转发请求到目标应用
-            await target_app(scope, receive, send)
+            # 转发请求到目标应用，scope与挂载在 /{transport}/{server_name} 时一致
+            child_scope = dict(scope)
+            child_scope['root_path'] = scope.get('root_path', '') + '/' + server_name
+            
+            issued: List[str] = []
+            send = self._track_sessions(send, target_app, session_id, scope.get('method'), issued)
+            
+            # 记录进行中的请求数和最近访问时间，供空闲回收判断；
+            # 在隔离舱排队之前计入，排队中的请求同样使服务器保持运行
+            server_info['in_flight'] = server_info.get('in_flight', 0) + 1
+            try:
+                # 携带MCP消息的POST请求受并发隔离舱限制，超出上限时排队，队列已满或排队超时返回503；
+                # SSE/GET长连接只是消息通道，不占用并发槽位。
+                # SSE的消息POST入队后立即返回，请求在会话任务中执行，槽位由服务器的 BulkheadMiddleware 在执行时获取
+                bulkhead = server_info.get('bulkhead') if scope.get('method') == 'POST' else None
+                if bulkhead is not None and self.transport_type == 'sse':
+                    child_scope[BULKHEAD_SCOPE_KEY] = bulkhead
+                    bulkhead = None
+                if bulkhead is not None:
+                    try:
+                        await bulkhead.acquire()
+                    except BulkheadRejected as e:
+                        await self._send_error_response(
+                            scope, receive, send, server_name,
+                            status_code=503,
+                            message=f"MCP服务器 '{server_name}' 繁忙: {e}",
+                            headers={"Retry-After": str(math.ceil(e.retry_after))}
+                        )
+                        return
+                
+                self.acquire_app(target_app)
+                try:
+                    await target_app(child_scope, receive, send)
+                finally:
+                    self.release_app(target_app)
+                    if bulkhead is not None:
+                        bulkhead.release()
+                    if self.transport_type == 'sse':
+                        # SSE会话随建立它的GET长连接结束
+                        for issued_id in issued:
+                            self._end_session(target_app, issued_id)
+            finally:
+                server_info['in_flight'] -= 1
+                server_info['last_used'] = time.monotonic()
             
         except Exception as e:
             # 处理代理层的异常
-            logger.error(f"MCP代理应用 {self.server_name} 处理请求时出错: {e}")
+            logger.error(f"MCP代理应用 {server_name} 处理请求时出错: {e}")
             try:
                 await self._send_error_response(
-                    scope, receive, send,
+                    scope, receive, send, server_name,
                     status_code=500,
                     message=f"代理服务器内部错误: {str(e)}"
                 )
@@ -105,7 +276,159 @@ class MCPProxyApp:
                 # 如果连错误响应都发送失败，只能记录日志
                 logger.error(f"发送错误响应失败: {e}")
     
-    async def _send_error_response(self, scope, receive, send, status_code: int, message: str):
+    def acquire_app(self, app) -> None:
+        """
+        增加应用实例的进行中请求数（经过代理的请求和进程内调用都计入），蓝绿重启排空时据此等待
+        
+        Args:
+            app: 应用实例
+        """
+        self._app_in_flight[app] = self._app_in_flight.get(app, 0) + 1
+    
+    def release_app(self, app) -> None:
+        """
+        减少应用实例的进行中请求数，降为0时唤醒等待其排空的任务
+        
+        Args:
+            app: 应用实例
+        """
+        remaining = self._app_in_flight[app] - 1
+        if remaining:
+            self._app_in_flight[app] = remaining
+            return
+        del self._app_in_flight[app]
+        self._notify_if_drained(app)
+    
+    def _track_sessions(self, send, app, session_id: Optional[str], method: Optional[str],
+                        issued: List[str]):
+        """
+        包装 send，维护应用实例上存活的会话，蓝绿重启时据此路由旧会话和等待旧实例排空
+        
+        新会话（请求不带会话ID）在响应头的 mcp-session-id（Streamable HTTP）
+        或首个 endpoint 事件（SSE）下发会话ID时加入；
+        Streamable HTTP 会话在 DELETE 成功或应用返回404（会话已结束或不存在）时移除，
+        SSE会话在其GET长连接结束时由调用方移除。
+        
+        Args:
+            send: ASGI send callable
+            app: 处理请求的应用实例
+            session_id: 请求携带的会话ID
+            method: HTTP方法
+            issued: 收集本次请求下发的会话ID
+            
+        Returns:
+            包装后的 send callable
+        """
+        if session_id is not None:
+            if self.transport_type != 'mcp':
+                return send
+            
+            async def ending_send(message):
+                if message['type'] == 'http.response.start':
+                    status = message.get('status', 200)
+                    if status == 404 or (method == 'DELETE' and status < 300):
+                        self._end_session(app, session_id)
+                await send(message)
+            
+            return ending_send
+        
+        scan_body = self.transport_type == 'sse' and method == 'GET'
+        
+        async def issuing_send(message):
+            if message['type'] == 'http.response.start':
+                for key, value in message.get('headers', []):
+                    if key.lower() == b'mcp-session-id':
+                        issued.append(value.decode('latin-1'))
+                        self._app_sessions.setdefault(app, set()).add(issued[-1])
+            elif scan_body and not issued and message['type'] == 'http.response.body':
+                # 只在找到 endpoint 事件之前查找，之后的事件流原样转发
+                match = _SSE_SESSION_ID_PATTERN.search(message.get('body', b''))
+                if match:
+                    issued.append(match.group(1).decode('ascii'))
+                    self._app_sessions.setdefault(app, set()).add(issued[-1])
+            await send(message)
+        
+        return issuing_send
+    
+    def _end_session(self, app, session_id: str) -> None:
+        """
+        移除应用实例上已结束的会话，最后一个会话结束时唤醒等待其排空的任务
+        
+        Args:
+            app: 应用实例
+            session_id: 会话ID
+        """
+        sessions = self._app_sessions.get(app)
+        if sessions is None:
+            return
+        sessions.discard(session_id)
+        if not sessions:
+            del self._app_sessions[app]
+            self._notify_if_drained(app)
+    
+    def _notify_if_drained(self, app) -> None:
+        """应用实例上没有进行中的请求和存活的会话时，唤醒等待其排空的任务"""
+        if app in self._app_in_flight or app in self._app_sessions:
+            return
+        waiter = self._drain_waiters.pop(app, None)
+        if waiter is not None:
+            waiter.set()
+    
+    def forget_app(self, app) -> None:
+        """
+        丢弃已关闭的应用实例的会话记录
+        
+        Args:
+            app: 应用实例
+        """
+        self._app_sessions.pop(app, None)
+    
+    async def wait_drained(self, app, timeout: float) -> bool:
+        """
+        等待应用实例上的进行中请求全部结束，且其下发的会话全部关闭
+        
+        Args:
+            app: 应用实例
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            bool: 是否在超时前排空
+        """
+        if app is None or (app not in self._app_in_flight and app not in self._app_sessions):
+            return True
+        waiter = self._drain_waiters.setdefault(app, asyncio.Event())
+        try:
+            await asyncio.wait_for(waiter.wait(), max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    @staticmethod
+    def _get_session_id(scope) -> Optional[str]:
+        """
+        获取请求所属的MCP会话ID
+        
+        Streamable HTTP 通过 mcp-session-id 请求头，SSE 通过消息端点的 session_id 查询参数。
+        
+        Args:
+            scope: ASGI scope
+            
+        Returns:
+            Optional[str]: 会话ID，新会话的请求返回None
+        """
+        for key, value in scope.get('headers', []):
+            if key == b'mcp-session-id':
+                return value.decode('latin-1')
+        query = scope.get('query_string', b'')
+        if b'session_id=' in query:
+            values = parse_qs(query.decode('latin-1')).get('session_id')
+            if values:
+                return values[0]
+        return None
+    
+    async def _send_error_response(self, scope, receive, send, server_name: str,
+                                   status_code: int, message: str,
+                                   headers: Optional[Dict[str, str]] = None):
         """
         发送错误响应
         
@@ -113,14 +436,17 @@ class MCPProxyApp:
             scope: ASGI scope
             receive: ASGI receive callable  
             send: ASGI send callable
+            server_name: 服务器名称
             status_code: HTTP状态码
             message: 错误消息
+            headers: 额外的响应头（可选）
         """
         if scope['type'] == 'http':
             # HTTP请求，返回JSON错误响应
             response = JSONResponse(
-                content={"error": message, "server": self.server_name},
-                status_code=status_code
+                content={"error": message, "server": server_name},
+                status_code=status_code,
+                headers=headers
             )
             await response(scope, receive, send)
         else:
@@ -142,13 +468,25 @@ class MCPServerManager:
     def __init__(self):
         # 与原有代码保持一致的数据结构
         self.lifespan_tasks: Dict[str, Callable] = {}  # FastMCP应用生命周期管理
-        self.app_mount_list: List[Dict[str, Any]] = []  # 对应原有的 app_mount_list
         self.server_info: Dict[str, Dict[str, Any]] = {}  # 额外的服务器信息
         
+        # 每种传输类型一个代理应用，按路径中的服务器名称分发请求
+        self.mcp_proxy = MCPProxyApp(self, 'mcp')
+        self.sse_proxy = MCPProxyApp(self, 'sse')
+        self.app_mount_list: List[Dict[str, Any]] = [  # 对应原有的 app_mount_list
+            {"path": "/mcp", "app": self.mcp_proxy},
+            {"path": "/sse", "app": self.sse_proxy},
+        ]
+        
         # 新增：用于管理动态添加的服务器生命周期
         self.app_started = False  # 应用是否已启动
         self.main_app: Optional[FastAPI] = None  # 主应用实例
         self.dynamic_tasks: Set[asyncio.Task] = set()  # 动态服务器任务集合
+        # 限制同时启动的生命周期数量，在应用启动时创建（需要绑定到运行中的事件循环）
+        self.startup_semaphore: Optional[asyncio.Semaphore] = None
+        self.idle_reaper_task: Optional[asyncio.Task] = None  # 空闲服务器回收任务
+        self.health_probe_task: Optional[asyncio.Task] = None  # 后端健康探测任务
+        self.supervisor_tasks: Dict[str, asyncio.Task] = {}  # 故障后端的自动重启任务
     
     def _update_server_status(self, server_name: str, status: str, error: Optional[str] = None):
         """
@@ -182,48 +520,38 @@ class MCPServerManager:
         for key, value in mcp_server_list.items():
             self.add_mcp_server(key, value)
     
-    def add_mcp_server(self, key: str, value: Dict[str, Any]) -> bool:
+    def add_mcp_server(self, key: str, value: Dict[str, Any], mcp=None) -> bool:
         """
         添加MCP服务器 - 正确的FastMCP生命周期管理
         
         Args:
             key: 服务器名称
             value: 服务器配置
+            mcp: 已创建的服务器实例，未提供时使用工厂创建
             
         Returns:
             bool: 是否成功添加
         """
         try:
             # 使用工厂创建MCP服务器
-            mcp = MCPServerFactory.create_server(key, value)
+            if mcp is None:
+                mcp = MCPServerFactory.create_server(key, value)
             
             if mcp is None:
                 return False
             
-            # 创建应用并正确获取生命周期
-            mcp_app = mcp.http_app(path='/')
-            sse_app = mcp.http_app(path="/", transport="sse")
-            
-            # 创建代理应用 - 关键改进：使用代理而不是直接挂载
-            mcp_proxy = MCPProxyApp(key, self, 'mcp')
-            sse_proxy = MCPProxyApp(key, self, 'sse')
-            
-            # 添加到挂载列表 - 挂载代理应用而不是直接的MCP应用
-            self.app_mount_list.append({"path": f'/mcp/{key}', "app": mcp_proxy})
-            self.app_mount_list.append({"path": f'/sse/{key}', "app": sse_proxy})
-            
-            # 重要：正确管理FastMCP的生命周期
-            # FastMCP 应用的 lifespan 必须被父应用管理才能正确初始化
-            self.lifespan_tasks[key] = mcp_app.lifespan
-            
             # 存储服务器信息（新增，用于监控）
             self.server_info[key] = {
                 'config': value,
-                'mcp': mcp,
-                'mcp_app': mcp_app,
-                'sse_app': sse_app,
-                'status': 'loaded'
+                'status': 'loaded',
+                'breaker': CircuitBreaker(),
+                'bulkhead': Bulkhead()
             }
+            self._configure_bulkhead(key)
+            
+            # 创建应用并正确获取生命周期
+            # 路由由 /mcp 和 /sse 上的代理应用按服务器名称分发，无需为每个服务器挂载
+            self._build_server_apps(key, mcp)
             
             logger.info(f"✓ MCP服务器 {key} 配置成功")
             return True
@@ -234,21 +562,80 @@ class MCPServerManager:
                 self._update_server_status(key, 'failed', str(e))
             return False
     
+    def _configure_bulkhead(self, server_name: str) -> None:
+        """
+        按服务器配置设置并发隔离舱的限制
+        
+        Args:
+            server_name: 服务器名称
+        """
+        info = self.server_info[server_name]
+        config = info.get('config', {})
+        info['bulkhead'].configure(
+            max_concurrency=config.get('max_concurrency'),
+            max_queue=config.get('max_queue', 100),
+            queue_timeout=config.get('queue_timeout', 30.0)
+        )
+    
+    def _build_server_apps(self, server_name: str, mcp) -> None:
+        """
+        为MCP服务器实例创建 Streamable HTTP 和 SSE 应用
+        
+        应用内的会话管理器只能运行一次，服务器的生命周期每次重新启动前都需要新的应用实例。
+        
+        Args:
+            server_name: 服务器名称
+            mcp: FastMCP服务器实例
+        """
+        info = self.server_info[server_name]
+        # 被替换的应用实例已随其生命周期关闭，丢弃其会话记录
+        self.mcp_proxy.forget_app(info.get('mcp_app'))
+        self.sse_proxy.forget_app(info.get('sse_app'))
+        info.update(self._create_server_apps(mcp))
+        info['lifespan_used'] = False
+        
+        # 重要：正确管理FastMCP的生命周期
+        # FastMCP 应用的 lifespan 必须被父应用管理才能正确初始化
+        self.lifespan_tasks[server_name] = info['mcp_app'].lifespan
+    
+    @staticmethod
+    def _create_server_apps(mcp) -> Dict[str, Any]:
+        """
+        创建MCP服务器实例的 Streamable HTTP 和 SSE 应用（不修改服务器信息）
+        
+        Args:
+            mcp: FastMCP服务器实例
+            
+        Returns:
+            Dict[str, Any]: 包含 mcp、mcp_app、sse_app 的实例信息
+        """
+        return {
+            'mcp': mcp,
+            'mcp_app': mcp.http_app(path='/'),
+            'sse_app': mcp.http_app(path="/", transport="sse")
+        }
+    
     def mount_all_servers(self, app: FastAPI) -> None:
         """
-        将所有服务器挂载到FastAPI应用 - 与原有逻辑完全一致
+        将代理应用挂载到FastAPI应用，所有服务器共用 /mcp 和 /sse 两个挂载点
         
         Args:
             app: FastAPI应用实例
         """
-        # 遍历app_mount_list - 与原逻辑完全一致
+        mounted_apps = {
+            route.app for route in app.router.routes if isinstance(route, Mount)
+        }
         for app_mount in self.app_mount_list:
+            if app_mount['app'] in mounted_apps:
+                continue
             print(f"Mounting {app_mount['path']} with {app_mount['app']}")
             app.mount(app_mount['path'], app_mount['app'])
     
     def mount_server(self, app: FastAPI, server_name: str) -> bool:
         """
-        动态挂载单个服务器到运行中的FastAPI应用
+        使单个服务器在运行中的FastAPI应用上可访问
+        
+        服务器的路由由共享的代理应用按名称分发，这里只需确保代理应用已挂载。
         
         Args:
             app: FastAPI应用实例
@@ -262,30 +649,8 @@ class MCPServerManager:
             return False
         
         try:
-            # 为动态添加的服务器创建代理应用
-            mcp_proxy = MCPProxyApp(server_name, self, 'mcp')
-            sse_proxy = MCPProxyApp(server_name, self, 'sse')
-            
-            # 动态挂载代理应用
-            mcp_path = f'/mcp/{server_name}'
-            sse_path = f'/sse/{server_name}'
-            
-            try:
-                print(f"动态挂载 {mcp_path} 到应用")
-                app.mount(mcp_path, mcp_proxy)
-                logger.info(f"✓ 成功挂载 {mcp_path}")
-                
-                print(f"动态挂载 {sse_path} 到应用")
-                app.mount(sse_path, sse_proxy)
-                logger.info(f"✓ 成功挂载 {sse_path}")
-                
-                # 更新挂载列表
-                self.app_mount_list.append({"path": mcp_path, "app": mcp_proxy})
-                self.app_mount_list.append({"path": sse_path, "app": sse_proxy})
-                
-            except Exception as mount_error:
-                # 如果挂载失败（可能是路径冲突），记录但继续
-                logger.warning(f"挂载时出现警告: {mount_error}")
+            self.mount_all_servers(app)
+            logger.info(f"✓ 服务器 {server_name} 已可通过 /mcp/{server_name} 和 /sse/{server_name} 访问")
             
             # 更新服务器状态
             self._update_server_status(server_name, 'mounted')
@@ -296,42 +661,656 @@ class MCPServerManager:
             self._update_server_status(server_name, 'mount_failed', str(e))
             return False
     
-
-    
-    async def _run_dynamic_server_lifespan(self, server_name: str, app: FastAPI):
+    async def _run_dynamic_server_lifespan(self, server_name: str, app: FastAPI,
+                                           stop_event: Optional[asyncio.Event] = None,
+                                           ready: Optional[asyncio.Future] = None,
+                                           lifespan: Optional[Callable] = None):
         """
-        运行动态服务器的生命周期作为独立任务
+        运行服务器的生命周期作为独立任务
+        
+        生命周期的进入和退出必须在同一个任务中完成，因此每个服务器一个任务。
+        启动阶段受 startup_semaphore 限制并发数，启动完成后立即释放名额，
+        慢启动或失败的服务器不会阻塞其他服务器。
+        蓝绿重启时同一服务器会有新旧两个任务，只有当前生效的任务会更新服务器状态。
         
         Args:
             server_name: 服务器名称
             app: FastAPI应用实例
+            stop_event: 停止信号，设置后生命周期正常退出（FastMCP在取消退出时
+                不会重置生命周期状态，同一个MCP实例将无法再次启动）
+            ready: 本次启动的就绪信号，启动完成时设为True，未就绪即结束时设为False
+            lifespan: 要运行的生命周期，默认为服务器当前应用的生命周期
         """
+        if stop_event is None:
+            stop_event = asyncio.Event()
+        current_task = asyncio.current_task()
         try:
-            print(f"🚀 启动动态服务器 {server_name} 的生命周期")
-            
             # 获取生命周期任务
-            task_lifespan = self.lifespan_tasks[server_name]
+            task_lifespan = lifespan or self.lifespan_tasks[server_name]
             
-            # 运行生命周期
-            async with task_lifespan(app):
-                print(f"✓ 动态服务器 {server_name} 生命周期启动成功")
-                self._update_server_status(server_name, 'running')
+            # 运行生命周期，仅在启动阶段占用并发名额
+            queued_at = time.monotonic()
+            async with AsyncExitStack() as stack:
+                if self.startup_semaphore is not None:
+                    await self.startup_semaphore.acquire()
+                try:
+                    print(f"🚀 启动服务器 {server_name} 的生命周期")
+                    started_at = time.monotonic()
+                    await stack.enter_async_context(task_lifespan(app))
+                    startup_seconds = time.monotonic() - started_at
+                finally:
+                    if self.startup_semaphore is not None:
+                        self.startup_semaphore.release()
+                
+                print(f"✓ 服务器 {server_name} 生命周期启动成功，耗时 {startup_seconds:.2f}秒")
+                current_task._startup_seconds = round(startup_seconds, 3)
+                # 从发起启动到就绪的时间，包含等待并发名额的时间
+                current_task._ready_seconds = round(time.monotonic() - queued_at, 3)
+                if self._is_active_lifespan(server_name, current_task):
+                    self._apply_startup_metrics(server_name, current_task)
+                    self._update_server_status(server_name, 'running')
+                self._resolve_ready(ready, True)
                 
-                # 等待任务被取消
+                # 等待停止信号或任务被取消
                 try:
-                    await asyncio.Event().wait()  # 无限等待直到被取消
+                    await stop_event.wait()
+                    print(f"🔄 服务器 {server_name} 生命周期正在关闭")
                 except asyncio.CancelledError:
-                    print(f"🔄 动态服务器 {server_name} 生命周期正在关闭")
+                    print(f"🔄 服务器 {server_name} 生命周期正在关闭")
                     raise  # 重新抛出，让上下文管理器正常退出
+            
+            print(f"✓ 服务器 {server_name} 生命周期已关闭")
+            if self._is_active_lifespan(server_name, current_task):
+                self._update_server_status(server_name, 'stopped')
                     
         except asyncio.CancelledError:
-            print(f"✓ 动态服务器 {server_name} 生命周期已关闭")
-            self._update_server_status(server_name, 'stopped')
+            print(f"✓ 服务器 {server_name} 生命周期已关闭")
+            if self._is_active_lifespan(server_name, current_task):
+                self._update_server_status(server_name, 'stopped')
         except Exception as e:
-            print(f"✗ 动态服务器 {server_name} 生命周期出错: {e}")
-            logger.error(f"动态服务器 {server_name} 生命周期出错: {e}")
-            self._update_server_status(server_name, 'failed', str(e))
+            print(f"✗ 服务器 {server_name} 生命周期出错: {e}")
+            logger.error(f"服务器 {server_name} 生命周期出错: {e}")
+            if self._is_active_lifespan(server_name, current_task):
+                self._update_server_status(server_name, 'failed', str(e))
+                self._on_backend_failure(server_name, str(e))
+        finally:
+            # 未就绪就结束（失败或被取消）时通知等待者
+            self._resolve_ready(ready, False)
+    
+    def _is_active_lifespan(self, server_name: str, task: Optional[asyncio.Task]) -> bool:
+        """
+        判断生命周期任务是否为服务器当前生效的实例（而不是排空中的旧实例或尚未切换的新实例）
+        
+        Args:
+            server_name: 服务器名称
+            task: 生命周期任务
+            
+        Returns:
+            bool: 是否为当前生效的生命周期任务
+        """
+        info = self.server_info.get(server_name)
+        return info is not None and info.get('lifespan_task') is task
+    
+    def _apply_startup_metrics(self, server_name: str, task: asyncio.Task) -> None:
+        """
+        将生命周期任务的启动耗时记录到服务器信息，并重新开始统计健康状态
+        
+        Args:
+            server_name: 服务器名称
+            task: 已就绪的生命周期任务
+        """
+        info = self.server_info[server_name]
+        info['startup_seconds'] = task._startup_seconds
+        info['ready_seconds'] = task._ready_seconds
+        info['last_used'] = time.monotonic()
+        # 每次启动重新统计健康状态
+        info['health'] = BackendHealth(
+            degraded_after=settings.mcpcat_health_degraded_after,
+            unhealthy_after=settings.mcpcat_health_unhealthy_after
+        )
+    
+    @staticmethod
+    def _resolve_ready(future: Optional[asyncio.Future], ready: bool) -> None:
+        """
+        设置一次启动的就绪结果
+        
+        就绪信号由生命周期任务持有，旧任务退出时不会影响之后新启动的就绪信号。
+        
+        Args:
+            future: 生命周期任务的就绪信号
+            ready: 是否已就绪
+        """
+        if future is not None and not future.done():
+            future.set_result(ready)
+    
+    def _create_lifespan_task(self, server_name: str, app: FastAPI, lifespan: Callable) -> asyncio.Task:
+        """
+        创建运行指定生命周期的后台任务，任务带有服务器名称、停止信号和就绪信号
+        
+        Args:
+            server_name: 服务器名称
+            app: FastAPI应用实例
+            lifespan: 要运行的生命周期
+            
+        Returns:
+            asyncio.Task: 生命周期任务
+        """
+        stop_event = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(
+            self._run_dynamic_server_lifespan(server_name, app, stop_event, ready, lifespan)
+        )
+        # 为任务添加服务器名称标识、停止信号和就绪信号
+        task._server_name = server_name
+        task._stop_event = stop_event
+        task._ready = ready
+        self.dynamic_tasks.add(task)
+        
+        # 添加回调来清理完成的任务
+        task.add_done_callback(self.dynamic_tasks.discard)
+        return task
+    
+    def _spawn_lifespan_task(self, server_name: str, app: FastAPI) -> asyncio.Task:
+        """
+        创建运行服务器生命周期的后台任务，并将其设为服务器当前生效的生命周期
+        
+        Args:
+            server_name: 服务器名称
+            app: FastAPI应用实例
+            
+        Returns:
+            asyncio.Task: 生命周期任务
+        """
+        info = self.server_info[server_name]
+        if info.get('lifespan_used'):
+            # 之前运行过的应用实例无法再次启动，基于同一个MCP实例重新创建
+            self._build_server_apps(server_name, info['mcp'])
+        info['lifespan_used'] = True
+        
+        # 重新启动的后端可能提供不同的工具/资源/提示词
+        listing_cache = getattr(info['mcp'], 'listing_cache', None)
+        if listing_cache is not None:
+            listing_cache.invalidate()
+        
+        self._update_server_status(server_name, 'starting')
+        task = self._create_lifespan_task(server_name, app, self.lifespan_tasks[server_name])
+        info['lifespan_task'] = task
+        info['ready'] = task._ready
+        return task
+
+    async def wait_until_ready(self, server_name: str, timeout: Optional[float] = None) -> bool:
+        """
+        等待服务器当前这次启动就绪
+        
+        超时只结束等待，不会取消启动本身，启动完成后服务器仍会变为 running。
+        
+        Args:
+            server_name: 服务器名称
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            bool: 服务器是否已就绪，启动失败或超时返回False
+        """
+        info = self.server_info.get(server_name)
+        if info is None:
+            return False
+        
+        future = info.get('ready')
+        if future is None:
+            return info.get('status') == 'running'
+        return await self._wait_ready(future, timeout)
+    
+    @staticmethod
+    async def _wait_ready(future: asyncio.Future, timeout: Optional[float]) -> bool:
+        """
+        等待就绪信号，超时返回False（不取消启动本身）
+        
+        Args:
+            future: 生命周期任务的就绪信号
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            bool: 是否已就绪
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return False
+    
+    async def ensure_server_started(self, server_name: str, timeout: Optional[float] = None) -> bool:
+        """
+        确保服务器已启动，空闲的服务器在此触发冷启动，并等待其就绪；
+        正在空闲关闭的服务器先等待关闭完成，再冷启动
+        
+        Args:
+            server_name: 服务器名称
+            timeout: 最长等待时间（秒），None表示一直等待
+            
+        Returns:
+            bool: 服务器是否已就绪
+        """
+        info = self.server_info.get(server_name)
+        if info is None or not (self.app_started and self.main_app):
+            return False
+        
+        if info['status'] == 'stopping':
+            # 空闲回收正在关闭该服务器，等待关闭完成后再冷启动
+            deadline = None if timeout is None else time.monotonic() + timeout
+            stopped = info.get('stopped')
+            if stopped is not None:
+                try:
+                    await asyncio.wait_for(stopped.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return False
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+        
+        if info['status'] == 'idle':
+            print(f"❄️  空闲服务器 {server_name} 收到请求，开始冷启动")
+            self._spawn_lifespan_task(server_name, self.main_app)
+            ready_future = info['ready']
+            ready_future.add_done_callback(
+                lambda future: self._record_cold_start(server_name, future)
+            )
+            return await self.wait_until_ready(server_name, timeout)
+        
+        if info['status'] == 'starting':
+            # 其他请求或启动流程已经触发启动，等待同一次启动完成
+            return await self.wait_until_ready(server_name, timeout)
+        
+        return info['status'] == 'running'
+    
+    def _record_cold_start(self, server_name: str, future: asyncio.Future) -> None:
+        """
+        记录一次冷启动的耗时（不依赖触发冷启动的请求是否仍在等待）
+        
+        Args:
+            server_name: 服务器名称
+            future: 冷启动的就绪信号
+        """
+        info = self.server_info.get(server_name)
+        if info is None or future.cancelled() or not future.result():
+            return
+        cold_start_seconds = info.get('ready_seconds')
+        info['cold_start_seconds'] = cold_start_seconds
+        info['cold_starts'] = info.get('cold_starts', 0) + 1
+        logger.info(f"✓ 服务器 {server_name} 冷启动完成，耗时 {cold_start_seconds:.2f}秒")
+
+    @asynccontextmanager
+    async def use_server(self, server_name: str):
+        """
+        在进程内直接使用服务器的FastMCP实例（供Inspector等内部调用方），不经过HTTP监听和认证中间件
+
+        与 MCPProxyApp 处理HTTP请求的流程一致：熔断器打开时失败，空闲或启动中的服务器先等待其就绪，
+        请求受并发隔离舱限制，并计入进行中的请求数和最近访问时间（空闲回收据此判断），
+        以及实例的 mcp_app 上的进行中请求数（蓝绿重启排空旧实例时据此等待）。
+        重启后服务器信息中的实例会被替换，调用方每次请求都应使用这里给出的实例。
+        
+        只在实例的生命周期由服务器管理器运行时给出实例：在未运行生命周期的实例上建立
+        进程内客户端会由客户端自行启动生命周期（及其后端子进程），因此这种情况直接失败。
+
+        Args:
+            server_name: 服务器名称
+
+        Yields:
+            FastMCP: 服务器当前的FastMCP实例
+
+        Raises:
+            ServerUnavailableError: 服务器不存在、未运行、故障恢复中或繁忙
+        """
+        server_info = self.server_info.get(server_name)
+        if not server_info:
+            raise ServerUnavailableError(f"MCP服务器 '{server_name}' 不存在", status_code=404)
+
+        breaker = server_info.get('breaker')
+        if breaker is not None and breaker.state != 'closed':
+            raise ServerUnavailableError(
+                f"MCP服务器 '{server_name}' 故障恢复中", retry_after=breaker.retry_after()
+            )
+
+        server_status = server_info.get('status', 'unknown')
+        if server_status in ('idle', 'starting', 'stopping'):
+            await self.ensure_server_started(server_name, timeout=settings.mcpcat_request_ready_timeout)
+            server_status = server_info.get('status', 'unknown')
+        if server_status in ('starting', 'stopping'):
+            raise ServerUnavailableError(f"MCP服务器 '{server_name}' 启动中，请稍后重试")
+        if server_status != 'running':
+            raise ServerUnavailableError(f"MCP服务器 '{server_name}' 当前不可用 (状态: {server_status})")
+
+        server_info['in_flight'] = server_info.get('in_flight', 0) + 1
+        try:
+            bulkhead = server_info.get('bulkhead')
+            if bulkhead is not None:
+                try:
+                    await bulkhead.acquire()
+                except BulkheadRejected as e:
+                    raise ServerUnavailableError(
+                        f"MCP服务器 '{server_name}' 繁忙: {e}", retry_after=e.retry_after
+                    ) from e
+            try:
+                # 排队期间服务器可能已被关闭或重启，同步读取当前实例并确认其生命周期正在运行
+                lifespan_task = server_info.get('lifespan_task')
+                ready = server_info.get('ready')
+                if (
+                    server_info.get('status') != 'running'
+                    or lifespan_task is None or lifespan_task.done()
+                    or ready is None or not ready.done() or ready.cancelled() or not ready.result()
+                ):
+                    raise ServerUnavailableError(f"MCP服务器 '{server_name}' 的生命周期未在运行")
+                mcp, mcp_app = server_info['mcp'], server_info['mcp_app']
+                self.mcp_proxy.acquire_app(mcp_app)
+                try:
+                    yield mcp
+                finally:
+                    self.mcp_proxy.release_app(mcp_app)
+            finally:
+                if bulkhead is not None:
+                    bulkhead.release()
+        finally:
+            server_info['in_flight'] -= 1
+            server_info['last_used'] = time.monotonic()
 
+    async def _cancel_lifespan_task(self, server_name: str) -> None:
+        """
+        取消服务器的生命周期任务并等待其退出（包括蓝绿重启中排空的旧实例）
+        
+        Args:
+            server_name: 服务器名称
+        """
+        info = self.server_info.get(server_name, {})
+        for old_instance in info.pop('draining', ()):
+            old_instance['drain_task'].cancel()
+        
+        # 查找并取消对应的生命周期任务
+        tasks_to_cancel = [
+            task for task in self.dynamic_tasks
+            if getattr(task, '_server_name', None) == server_name and not task.done()
+        ]
+        if tasks_to_cancel:
+            await self._stop_lifespan_tasks(tasks_to_cancel)
+            for task in tasks_to_cancel:
+                self.dynamic_tasks.discard(task)
+    
+    async def _stop_lifespan_tasks(self, tasks: List[asyncio.Task], timeout: float = 5.0) -> bool:
+        """
+        通知生命周期任务正常退出，超时仍未退出的任务被强制取消
+        
+        Args:
+            tasks: 生命周期任务列表
+            timeout: 等待正常退出的超时时间（秒）
+            
+        Returns:
+            bool: 是否全部在超时前正常退出
+        """
+        tasks = [task for task in tasks if not task.done()]
+        if not tasks:
+            return True
+        
+        for task in tasks:
+            stop_event = getattr(task, '_stop_event', None)
+            if stop_event is not None:
+                stop_event.set()
+            elif not task.done():
+                task.cancel()
+        
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=1.0)
+        return not pending
+    
+    async def _scale_to_zero(self, server_name: str) -> None:
+        """
+        关闭空闲服务器的生命周期（及其子进程），状态变为 idle，下次请求时冷启动
+        
+        Args:
+            server_name: 服务器名称
+        """
+        info = self.server_info[server_name]
+        # 先同步切换状态，之后到达的请求不会再进入即将关闭的实例，
+        # 而是等待关闭完成后重新冷启动
+        self._update_server_status(server_name, 'stopping')
+        stopped = info['stopped'] = asyncio.Event()
+        
+        try:
+            rss_before = _descendant_rss_bytes()
+            # 只关闭当前生效的生命周期；蓝绿重启中排空的旧实例由各自的排空任务关闭
+            lifespan_task = info.get('lifespan_task')
+            if lifespan_task is not None:
+                await self._stop_lifespan_tasks([lifespan_task])
+                self.dynamic_tasks.discard(lifespan_task)
+            rss_after = _descendant_rss_bytes()
+            
+            if rss_before is not None and rss_after is not None:
+                info['memory_saved_bytes'] = max(0, rss_before - rss_after)
+            self._update_server_status(server_name, 'idle')
+        finally:
+            info.pop('stopped', None)
+            stopped.set()
+        
+        memory_saved = info.get('memory_saved_bytes')
+        memory_note = f"，释放内存 {memory_saved / 1024 / 1024:.1f}MB" if memory_saved is not None else ""
+        print(f"💤 服务器 {server_name} 空闲超时，已关闭{memory_note}")
+    
+    async def _idle_reaper_loop(self, interval: float):
+        """
+        定期关闭超过 idle_timeout 未收到请求的服务器
+        
+        Args:
+            interval: 检查间隔（秒）
+        """
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for server_name, info in list(self.server_info.items()):
+                idle_timeout = info.get('config', {}).get('idle_timeout')
+                if (
+                    idle_timeout
+                    and info.get('status') == 'running'
+                    and not info.get('restarting')
+                    and info.get('in_flight', 0) == 0
+                    and now - info.get('last_used', now) >= idle_timeout
+                ):
+                    try:
+                        await self._scale_to_zero(server_name)
+                    except Exception as e:
+                        logger.error(f"关闭空闲服务器 {server_name} 失败: {e}")
+    
+    async def _health_probe_loop(self, interval: float, jitter: float):
+        """
+        定期探测所有运行中的后端
+        
+        每轮中各服务器的探测在 [0, jitter) 内随机错开，避免同时打到所有后端；
+        空闲和启动中的服务器不探测，不会因为探测而被唤醒。
+        
+        Args:
+            interval: 探测间隔（秒）
+            jitter: 随机抖动上限（秒）
+        """
+        while True:
+            await asyncio.sleep(interval)
+            probes = [
+                self._probe_server(server_name, random.uniform(0, jitter) if jitter > 0 else 0)
+                for server_name, info in list(self.server_info.items())
+                if info.get('status') == 'running' and info.get('health') is not None
+            ]
+            if probes:
+                await asyncio.gather(*probes, return_exceptions=True)
+    
+    async def _probe_server(self, server_name: str, delay: float = 0) -> None:
+        """
+        探测单个后端并记录延迟或失败
+        
+        Args:
+            server_name: 服务器名称
+            delay: 探测前的等待时间（秒）
+        """
+        if delay:
+            await asyncio.sleep(delay)
+        
+        info = self.server_info.get(server_name)
+        if info is None or info.get('status') != 'running':
+            return
+        health = info['health']
+        
+        started_at = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                self._ping_backend(info['mcp']),
+                timeout=settings.mcpcat_health_check_timeout
+            )
+        except Exception as e:
+            previous_state = health.state
+            health.record_failure(str(e) or type(e).__name__)
+            if health.state != previous_state:
+                logger.warning(f"⚠️  服务器 {server_name} 健康状态变为 {health.state}: {health.last_error}")
+                if health.state == 'unhealthy':
+                    self._on_backend_failure(server_name, f"健康探测连续失败: {health.last_error}")
+            return
+        
+        if health.state not in ('healthy', 'unknown'):
+            logger.info(f"✓ 服务器 {server_name} 健康探测恢复")
+        health.record_success(time.monotonic() - started_at)
+    
+    @staticmethod
+    async def _ping_backend(mcp) -> None:
+        """
+        向后端发送一次轻量探测
+        
+        stdio副本池复用保持连接的客户端逐个副本ping；远程会话池逐个会话ping并重连断开的会话；
+        其他代理通过新的客户端会话ping上游；
+        OpenAPI服务器向上游API发送HEAD请求，只要有HTTP响应即视为可达。
+        
+        Args:
+            mcp: FastMCP服务器实例
+        """
+        pool = getattr(mcp, 'replica_pool', None)
+        if pool is not None:
+            await pool.ping()
+            return
+        
+        session_pool = getattr(mcp, 'session_pool', None)
+        if session_pool is not None:
+            await session_pool.ping()
+            return
+        
+        http_client = getattr(mcp, 'http_client', None)
+        if http_client is not None:
+            await http_client.head('/')
+            return
+        
+        client = mcp.client_factory()
+        async with client:
+            await client.ping()
+    
+    @staticmethod
+    def _get_restart_policy(info: Dict[str, Any]) -> RestartPolicyConfig:
+        """
+        获取服务器的自动重启策略
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            RestartPolicyConfig: 配置的策略，未配置时为默认策略
+        """
+        policy = info.get('config', {}).get('restart_policy')
+        if isinstance(policy, RestartPolicyConfig):
+            return policy
+        return RestartPolicyConfig(**(policy or {}))
+    
+    def _on_backend_failure(self, server_name: str, reason: str) -> None:
+        """
+        后端故障时打开熔断器并启动自动重启任务
+        
+        Args:
+            server_name: 服务器名称
+            reason: 故障原因
+        """
+        info = self.server_info.get(server_name)
+        if info is None or not (self.app_started and self.main_app):
+            return
+        if server_name in self.supervisor_tasks:
+            # 自动重启进行中，由重启任务处理，只更新故障原因
+            info['breaker'].reason = reason
+            return
+        if not self._get_restart_policy(info).enabled:
+            return
+        
+        info['breaker'].open(reason, time.monotonic())
+        self.supervisor_tasks[server_name] = asyncio.create_task(
+            self._supervise_server(server_name)
+        )
+    
+    async def _supervise_server(self, server_name: str):
+        """
+        按指数退避（带随机抖动）自动重启故障后端，直到恢复
+        
+        时间窗口内的重启次数达到上限后，等待最早的一次重启移出窗口再继续；
+        等待期间熔断器保持打开，代理直接返回503和Retry-After。
+        
+        Args:
+            server_name: 服务器名称
+        """
+        info = self.server_info[server_name]
+        breaker: CircuitBreaker = info['breaker']
+        policy = self._get_restart_policy(info)
+        attempt = 0
+        
+        try:
+            while self.app_started and self.server_info.get(server_name) is info:
+                backoff = min(policy.max_backoff, policy.initial_backoff * (2 ** attempt))
+                retry_at = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+                if breaker.recent_restarts(policy.window) >= policy.max_restarts:
+                    retry_at = max(retry_at, breaker.next_restart_allowed_at(policy.window))
+                    logger.warning(
+                        f"服务器 {server_name} 在 {policy.window:.0f}秒内已重启 {policy.max_restarts} 次，"
+                        f"{retry_at - time.monotonic():.0f}秒后再尝试"
+                    )
+                breaker.open(breaker.reason or 'unknown', retry_at)
+                print(f"🔁 服务器 {server_name} 将在 {retry_at - time.monotonic():.1f}秒后自动重启（原因: {breaker.reason}）")
+                await asyncio.sleep(max(0.0, retry_at - time.monotonic()))
+                
+                breaker.half_open()
+                breaker.record_restart()
+                await self._cancel_lifespan_task(server_name)
+                
+                # 使用全新的服务器实例重启，不复用故障实例中可能已损坏的连接状态
+                mcp = await MCPServerFactory.create_server_async(server_name, info['config'])
+                if mcp is None:
+                    breaker.reason = "创建服务器实例失败"
+                    attempt += 1
+                    continue
+                self._build_server_apps(server_name, mcp)
+                self._spawn_lifespan_task(server_name, self.main_app)
+                if await self.wait_until_ready(server_name, settings.mcpcat_startup_timeout):
+                    breaker.close()
+                    print(f"✅ 服务器 {server_name} 自动重启成功（累计 {breaker.restarts} 次）")
+                    return
+                attempt += 1
+        finally:
+            if self.supervisor_tasks.get(server_name) is asyncio.current_task():
+                del self.supervisor_tasks[server_name]
+    
+    async def _cancel_supervisor(self, server_name: str) -> None:
+        """
+        取消服务器的自动重启任务并关闭熔断器（手动停止、重启或移除时调用）
+        
+        Args:
+            server_name: 服务器名称
+        """
+        task = self.supervisor_tasks.pop(server_name, None)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        breaker = self.server_info.get(server_name, {}).get('breaker')
+        if breaker is not None:
+            breaker.close()
+    
     async def add_and_mount_server(self, app: FastAPI, key: str, value: Dict[str, Any]) -> bool:
         """
         添加并动态挂载MCP服务器到运行中的应用
@@ -349,8 +1328,9 @@ class MCPServerManager:
             logger.error(f"服务器 {key} 已存在")
             return False
         
-        # 先添加服务器
-        if not self.add_mcp_server(key, value):
+        # 先添加服务器（在事件循环外创建实例，下载OpenAPI规范不会阻塞其他请求）
+        mcp = await MCPServerFactory.create_server_async(key, value)
+        if mcp is None or not self.add_mcp_server(key, value, mcp=mcp):
             return False
         
         # 然后动态挂载
@@ -366,28 +1346,23 @@ class MCPServerManager:
         except Exception as e:
             logger.warning(f"保存服务器 {key} 配置时出现警告: {e}")
         
-        # 如果应用已经在运行，立即启动这个服务器的生命周期
-        if self.app_started and self.main_app:
+        # 如果应用已经在运行，立即启动这个服务器的生命周期（lazy服务器等首个请求再启动）
+        if self.app_started and self.main_app and value.get('lazy'):
+            self._update_server_status(key, 'idle')
+        elif self.app_started and self.main_app:
             try:
-                # 创建独立的后台任务来运行动态服务器的生命周期
-                task = asyncio.create_task(
-                    self._run_dynamic_server_lifespan(key, self.main_app)
-                )
-                # 为任务添加服务器名称标识
-                task._server_name = key
-                self.dynamic_tasks.add(task)
-                
-                # 添加回调来清理完成的任务
-                task.add_done_callback(self.dynamic_tasks.discard)
-                
-                # 等待一小段时间确保服务器启动完成
-                await asyncio.sleep(0.1)
+                # 创建独立的后台任务来运行动态服务器的生命周期，并等待其就绪
+                self._spawn_lifespan_task(key, self.main_app)
+                ready = await self.wait_until_ready(key, settings.mcpcat_startup_timeout)
                 
                 # 检查服务器是否成功启动
-                if self.server_info[key]['status'] == 'running':
-                    print(f"✅ 动态服务器 {key} 已挂载并启动，完整功能立即可用")
+                if ready:
+                    print(f"✅ 动态服务器 {key} 已挂载并启动，耗时 "
+                          f"{self.server_info[key]['ready_seconds']:.2f}秒，完整功能立即可用")
+                elif self.server_info[key]['status'] == 'starting':
+                    print(f"⚠️  动态服务器 {key} 已挂载，{settings.mcpcat_startup_timeout:.0f}秒内未就绪，生命周期启动中...")
                 else:
-                    print(f"⚠️  动态服务器 {key} 已挂载，生命周期启动中...")
+                    print(f"⚠️  动态服务器 {key} 已挂载，但生命周期启动失败: {self.server_info[key].get('error')}")
                 
             except Exception as e:
                 print(f"✗ 动态服务器 {key} 启动失败: {e}")
@@ -422,60 +1397,62 @@ class MCPServerManager:
         self.app_started = True
         self.main_app = app
         
-        # 使用 AsyncExitStack 来正确管理所有的 lifespan 上下文
-        async with AsyncExitStack() as stack:
-            # 启动所有FastMCP服务器的生命周期
-            for task_name, task_lifespan in self.lifespan_tasks.items():
-                try:
-                    # 每个FastMCP应用的lifespan必须在这里被正确管理
-                    await stack.enter_async_context(task_lifespan(app))
-                    print(f"✓ MCP服务器 {task_name} 生命周期启动成功")
-                    
-                    # 更新服务器状态
-                    self._update_server_status(task_name, 'running')
-                        
-                except Exception as e:
-                    print(f"✗ MCP服务器 {task_name} 生命周期启动失败: {e}")
-                    
-                    # 更新服务器状态
-                    self._update_server_status(task_name, 'failed', str(e))
+        # 所有服务器的生命周期并发启动，每个服务器一个任务，并发数受配置限制；
+        # 服务器就绪后各自变为 running，启动中的服务器请求由代理应用返回503
+        self.startup_semaphore = asyncio.Semaphore(max(1, settings.mcpcat_startup_concurrency))
+        started_count = 0
+        for task_name in list(self.lifespan_tasks.keys()):
+            if self.server_info.get(task_name, {}).get('config', {}).get('lazy'):
+                # lazy服务器在首个请求到达时才启动
+                self._update_server_status(task_name, 'idle')
+                continue
+            self._spawn_lifespan_task(task_name, app)
+            started_count += 1
+        print(f"已并发启动 {started_count} 个MCP服务器的生命周期"
+              f"（并发上限 {settings.mcpcat_startup_concurrency}）")
+        
+        self.idle_reaper_task = asyncio.create_task(
+            self._idle_reaper_loop(settings.mcpcat_idle_check_interval)
+        )
+        self.health_probe_task = asyncio.create_task(
+            self._health_probe_loop(
+                settings.mcpcat_health_check_interval,
+                settings.mcpcat_health_check_jitter
+            )
+        )
+        
+        try:
+            yield
+        finally:
+            print("应用关闭中...")
+            self.idle_reaper_task.cancel()
+            self.idle_reaper_task = None
+            self.health_probe_task.cancel()
+            self.health_probe_task = None
+            for supervisor_task in list(self.supervisor_tasks.values()):
+                supervisor_task.cancel()
+            self.supervisor_tasks.clear()
+            for info in self.server_info.values():
+                for old_instance in info.pop('draining', ()):
+                    old_instance['drain_task'].cancel()
             
-            try:
-                yield
-            finally:
-                print("应用关闭中...")
-                
-                # 取消所有动态服务器任务
-                if self.dynamic_tasks:
-                    print(f"正在关闭 {len(self.dynamic_tasks)} 个动态服务器...")
-                    for task in self.dynamic_tasks:
-                        if not task.done():
-                            task.cancel()
-                    
-                    # 等待所有任务完成，给更多时间
-                    if self.dynamic_tasks:
-                        try:
-                            await asyncio.wait_for(
-                                asyncio.gather(*self.dynamic_tasks, return_exceptions=True),
-                                timeout=5.0  # 给5秒时间优雅关闭
-                            )
-                            print("✓ 所有动态服务器已关闭")
-                        except asyncio.TimeoutError:
-                            print("⚠️  部分动态服务器关闭超时，强制终止")
-                
-                # 给底层连接一些时间完成
-                await asyncio.sleep(0.5)
-                
-                # AsyncExitStack 会自动按相反顺序调用所有的 __aexit__
-                
-                # 更新所有服务器状态为已停止
-                for task_name in self.lifespan_tasks.keys():
-                    self._update_server_status(task_name, 'stopped')
-                
-                # 清理状态
-                self.app_started = False
-                self.main_app = None
-                self.dynamic_tasks.clear()
+            # 关闭所有服务器生命周期任务，给5秒时间优雅关闭
+            if self.dynamic_tasks:
+                print(f"正在关闭 {len(self.dynamic_tasks)} 个服务器...")
+                if await self._stop_lifespan_tasks(list(self.dynamic_tasks)):
+                    print("✓ 所有服务器已关闭")
+                else:
+                    print("⚠️  部分服务器关闭超时，强制终止")
+            
+            # 更新所有服务器状态为已停止
+            for task_name in self.lifespan_tasks.keys():
+                self._update_server_status(task_name, 'stopped')
+            
+            # 清理状态
+            self.app_started = False
+            self.main_app = None
+            self.startup_semaphore = None
+            self.dynamic_tasks.clear()
     
     def get_server_status(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -490,12 +1467,165 @@ class MCPServerManager:
                 'type': info.get('config', {}).get('type', 'unknown'),
                 'require_auth': info.get('config', {}).get('require_auth', True),
                 'error': info.get('error'),
+                'startup_seconds': info.get('startup_seconds'),
+                'ready_seconds': info.get('ready_seconds'),
+                'lazy': info.get('config', {}).get('lazy', False),
+                'idle_timeout': info.get('config', {}).get('idle_timeout'),
+                'in_flight': info.get('in_flight', 0),
+                'bulkhead': info['bulkhead'].to_dict() if info.get('bulkhead') is not None else None,
+                'draining': bool(info.get('draining')),
+                'replicas': self._get_replica_stats(info),
+                'timeouts': self._get_timeout_stats(info),
+                'listing_cache': self._get_listing_cache_stats(info),
+                'result_cache': self._get_result_cache_stats(info),
+                'coalescing': self._get_coalescing_stats(info),
+                'http_pool': self._get_http_pool_stats(info),
+                'http_cache': self._get_http_cache_stats(info),
+                'session_pool': self._get_session_pool_stats(info),
+                'health': info['health'].to_dict() if info.get('health') is not None else None,
+                'circuit': info['breaker'].to_dict() if info.get('breaker') is not None else None,
+                'cold_starts': info.get('cold_starts', 0),
+                'cold_start_seconds': info.get('cold_start_seconds'),
+                'memory_saved_mb': (
+                    round(info['memory_saved_bytes'] / 1024 / 1024, 1)
+                    if info.get('status') == 'idle' and info.get('memory_saved_bytes') is not None
+                    else None
+                ),
                 'mcp_endpoint': f"/mcp/{name}",
                 'sse_endpoint': f"/sse/{name}"
             }
             for name, info in self.server_info.items()
         }
     
+    @staticmethod
+    def _get_replica_stats(info: Dict[str, Any]) -> Optional[List[Dict[str, int]]]:
+        """
+        获取stdio服务器各副本的负载统计
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[List[Dict[str, int]]]: 副本统计列表，非stdio服务器返回None
+        """
+        pool = getattr(info.get('mcp'), 'replica_pool', None)
+        return pool.get_stats() if pool is not None else None
+    
+    @staticmethod
+    def _get_timeout_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取服务器的上游超时配置与超时次数
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 超时统计，服务器实例尚未创建时返回None
+        """
+        timeouts = getattr(info.get('mcp'), 'upstream_timeouts', None)
+        return timeouts.to_dict() if timeouts is not None else None
+    
+    @staticmethod
+    def _get_listing_cache_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取服务器的上游列表缓存命中统计
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 缓存统计，非代理服务器（如OpenAPI）返回None
+        """
+        listing_cache = getattr(info.get('mcp'), 'listing_cache', None)
+        return listing_cache.to_dict() if listing_cache is not None else None
+    
+    @staticmethod
+    def _get_result_cache_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取服务器的工具结果缓存统计
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 缓存统计，未配置结果缓存时返回None
+        """
+        result_cache = getattr(info.get('mcp'), 'result_cache', None)
+        return result_cache.to_dict() if result_cache is not None else None
+    
+    @staticmethod
+    def _get_coalescing_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取服务器的请求合并统计
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 合并统计，未启用请求合并时返回None
+        """
+        single_flight = getattr(info.get('mcp'), 'single_flight', None)
+        return single_flight.to_dict() if single_flight is not None else None
+    
+    @staticmethod
+    def _get_http_pool_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取服务器的上游HTTP连接池使用统计
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 连接池统计，stdio服务器返回None
+        """
+        http_pool = getattr(info.get('mcp'), 'http_pool', None)
+        return http_pool.get_stats() if http_pool is not None else None
+    
+    @staticmethod
+    def _get_http_cache_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取OpenAPI服务器的上游HTTP响应缓存命中率和节省的字节数
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 缓存统计，未启用响应缓存时返回None
+        """
+        http_cache = getattr(info.get('mcp'), 'http_cache', None)
+        return http_cache.to_dict() if http_cache is not None else None
+    
+    @staticmethod
+    def _get_session_pool_stats(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取远程服务器上游会话池的连接与负载统计
+        
+        Args:
+            info: 服务器信息
+            
+        Returns:
+            Optional[Dict[str, Any]]: 会话池统计，未启用会话池时返回None
+        """
+        session_pool = getattr(info.get('mcp'), 'session_pool', None)
+        return session_pool.get_stats() if session_pool is not None else None
+    
+    def flush_result_cache(self, server_name: str) -> Optional[int]:
+        """
+        清空服务器的工具结果缓存
+        
+        Args:
+            server_name: 服务器名称
+            
+        Returns:
+            Optional[int]: 清除的结果数，未配置结果缓存时返回None
+        """
+        result_cache = getattr(self.server_info[server_name].get('mcp'), 'result_cache', None)
+        if result_cache is None:
+            return None
+        flushed = result_cache.flush()
+        logger.info(f"✓ 服务器 {server_name} 的结果缓存已清空（{flushed} 条）")
+        return flushed
+    
     def get_mount_list(self) -> List[Dict[str, Any]]:
         """
         获取挂载列表 - 向后兼容
@@ -529,20 +1659,9 @@ class MCPServerManager:
             return False
         
         try:
-            # 查找并取消对应的动态任务
-            task_to_cancel = None
-            for task in self.dynamic_tasks:
-                if hasattr(task, '_server_name') and task._server_name == server_name:
-                    task_to_cancel = task
-                    break
-            
-            if task_to_cancel and not task_to_cancel.done():
-                task_to_cancel.cancel()
-                try:
-                    await asyncio.wait_for(task_to_cancel, timeout=5.0)
-                except (asyncio.CancelledError, asyncio.TimeoutError):
-                    pass
-                self.dynamic_tasks.discard(task_to_cancel)
+            # 手动停止时不再自动重启
+            await self._cancel_supervisor(server_name)
+            await self._cancel_lifespan_task(server_name)
             
             # 更新服务器状态
             self._update_server_status(server_name, 'stopped')
@@ -574,21 +1693,22 @@ class MCPServerManager:
                 logger.info(f"服务器 {server_name} 已经在运行")
                 return True
             
-            # 如果应用已经启动，启动服务器的生命周期
+            # 如果应用已经启动，启动服务器的生命周期并等待其就绪
             if self.app_started and self.main_app:
-                task = asyncio.create_task(
-                    self._run_dynamic_server_lifespan(server_name, self.main_app)
-                )
-                # 为任务添加服务器名称标识
-                task._server_name = server_name
-                self.dynamic_tasks.add(task)
-                task.add_done_callback(self.dynamic_tasks.discard)
+                if self.server_info[server_name]['status'] != 'starting':
+                    self._spawn_lifespan_task(server_name, self.main_app)
                 
-                # 等待一小段时间确保服务器启动
-                await asyncio.sleep(0.1)
+                timeout = settings.mcpcat_startup_timeout
+                if await self.wait_until_ready(server_name, timeout):
+                    ready_seconds = self.server_info[server_name].get('ready_seconds')
+                    logger.info(f"✓ 服务器 {server_name} 启动成功，耗时 {ready_seconds:.2f}秒")
+                    return True
                 
-                logger.info(f"✓ 服务器 {server_name} 启动成功")
-                return True
+                if self.server_info[server_name]['status'] == 'starting':
+                    # 启动仍在进行，就绪后状态会自动变为 running
+                    self.server_info[server_name]['error'] = f"服务器在 {timeout:.0f}秒内未就绪"
+                logger.error(f"启动服务器 {server_name} 失败: {self.server_info[server_name].get('error')}")
+                return False
             else:
                 # 如果应用还没启动，只更新状态
                 self._update_server_status(server_name, 'loaded')
@@ -603,6 +1723,9 @@ class MCPServerManager:
         """
         重启服务器，可选择更新配置
         
+        运行中的服务器采用蓝绿切换：新实例就绪后再切换流量，旧实例排空后关闭，
+        重启期间请求不中断；未运行的服务器直接停止并重新启动。
+        
         Args:
             server_name: 服务器名称
             new_config: 新的配置（可选）
@@ -614,16 +1737,16 @@ class MCPServerManager:
             logger.error(f"服务器 {server_name} 不存在")
             return False
         
+        if self.app_started and self.main_app and self.server_info[server_name]['status'] == 'running':
+            return await self._blue_green_restart(server_name, new_config)
+        
         try:
             logger.info(f"开始重启服务器 {server_name}")
             self._update_server_status(server_name, 'restarting')
             
-            # 1. 停止当前服务
+            # 1. 停止当前服务（等待旧的生命周期完全关闭后返回）
             await self.stop_server(server_name)
             
-            # 等待一小段时间确保旧的生命周期完全关闭
-            await asyncio.sleep(0.2)
-            
             # 2. 更新配置（如果提供）
             if new_config:
                 # 验证新配置
@@ -642,24 +1765,18 @@ class MCPServerManager:
                 
                 # 更新内存中的配置
                 self.server_info[server_name]['config'] = new_config
+                self._configure_bulkhead(server_name)
             
             # 3. 重新创建服务器实例
             config = new_config or self.server_info[server_name]['config']
-            mcp = MCPServerFactory.create_server(server_name, config)
+            mcp = await MCPServerFactory.create_server_async(server_name, config)
             if not mcp:
                 logger.error("重新创建MCP服务器实例失败")
                 self._update_server_status(server_name, 'failed', "创建服务器实例失败")
                 return False
             
-            # 4. 更新服务器信息
-            self.server_info[server_name]['mcp'] = mcp
-            mcp_app = mcp.http_app(path='/')
-            sse_app = mcp.http_app(path="/", transport="sse")
-            self.server_info[server_name]['mcp_app'] = mcp_app
-            self.server_info[server_name]['sse_app'] = sse_app
-            
-            # 5. 重要：更新生命周期任务为新的MCP实例的生命周期
-            self.lifespan_tasks[server_name] = mcp_app.lifespan
+            # 4. 更新服务器信息，生命周期任务更新为新的MCP实例的生命周期
+            self._build_server_apps(server_name, mcp)
             
             # 注意：不需要更新挂载列表，因为代理应用会自动使用server_info中的新应用实例
             
@@ -678,6 +1795,141 @@ class MCPServerManager:
             self._update_server_status(server_name, 'failed', str(e))
             return False
     
+    async def _blue_green_restart(self, server_name: str, new_config: dict = None) -> bool:
+        """
+        蓝绿重启运行中的服务器
+        
+        1. 新实例与旧实例并行启动，等待其就绪（失败时旧实例继续服务，配置不变）
+        2. 原子地切换服务器信息中的当前实例，新请求立即发往新实例
+        3. 旧实例继续处理进行中的请求和属于其会话的请求，排空或超过宽限期后关闭；
+           上一次重启尚未排空的实例各自继续排空
+        
+        Args:
+            server_name: 服务器名称
+            new_config: 新的配置（可选）
+            
+        Returns:
+            bool: 是否成功切换到新实例
+        """
+        info = self.server_info[server_name]
+        # 重启期间状态保持 running，标记重启中，空闲回收不会关闭正在切换的服务器
+        info['restarting'] = True
+        try:
+            logger.info(f"开始蓝绿重启服务器 {server_name}")
+            
+            if new_config:
+                is_valid, error_msg = ConfigService.validate_server_config(new_config)
+                if not is_valid:
+                    logger.error(f"新配置验证失败: {error_msg}")
+                    info['error'] = f"配置验证失败: {error_msg}"
+                    return False
+            config = new_config or info['config']
+            
+            # 1. 并行启动新实例
+            mcp = await MCPServerFactory.create_server_async(server_name, config)
+            if not mcp:
+                logger.error("重新创建MCP服务器实例失败")
+                info['error'] = "创建服务器实例失败"
+                return False
+            new_instance = self._create_server_apps(mcp)
+            task = self._create_lifespan_task(
+                server_name, self.main_app, new_instance['mcp_app'].lifespan
+            )
+            timeout = settings.mcpcat_startup_timeout
+            if not await self._wait_ready(task._ready, timeout) or self.server_info.get(server_name) is not info:
+                await self._stop_lifespan_tasks([task])
+                logger.error(f"服务器 {server_name} 的新实例启动失败或未能在 {timeout:.0f}秒内就绪，继续使用旧实例")
+                info['error'] = "新实例启动失败或超时，继续使用旧实例"
+                return False
+            
+            if new_config:
+                if not ConfigService.update_server_config(server_name, new_config):
+                    await self._stop_lifespan_tasks([task])
+                    logger.error("更新配置文件失败")
+                    info['error'] = "更新配置文件失败"
+                    return False
+                info['config'] = new_config
+                self._configure_bulkhead(server_name)
+            
+            # 2. 切换当前实例（同步完成，期间不会有请求看到不一致的状态）
+            await self._cancel_supervisor(server_name)
+            old_instance = {
+                'mcp': info['mcp'],
+                'mcp_app': info['mcp_app'],
+                'sse_app': info['sse_app'],
+                'lifespan_task': info.get('lifespan_task')
+            }
+            info.update(new_instance)
+            info['lifespan_used'] = True
+            info['lifespan_task'] = task
+            info['ready'] = task._ready
+            self.lifespan_tasks[server_name] = new_instance['mcp_app'].lifespan
+            self._apply_startup_metrics(server_name, task)
+            self._update_server_status(server_name, 'running')
+            
+            # 3. 后台排空旧实例
+            info.setdefault('draining', []).append(old_instance)
+            old_instance['drain_task'] = asyncio.create_task(
+                self._drain_instance(server_name, old_instance, settings.mcpcat_restart_drain_timeout)
+            )
+            
+            print(f"🔀 服务器 {server_name} 已切换到新实例（就绪耗时 {task._ready_seconds:.2f}秒），"
+                  f"旧实例排空中（宽限期 {settings.mcpcat_restart_drain_timeout:.0f}秒）")
+            return True
+            
+        except Exception as e:
+            logger.error(f"重启服务器 {server_name} 失败: {e}")
+            info['error'] = str(e)
+            return False
+        finally:
+            info.pop('restarting', None)
+    
+    async def _drain_instance(self, server_name: str, instance: Dict[str, Any], grace: float):
+        """
+        等待旧实例上的进行中请求结束、在其上建立的会话关闭（最长 grace 秒），然后关闭其生命周期
+        
+        排空期间携带旧会话ID的请求继续发往旧实例；超过宽限期仍未关闭的会话随旧实例一起结束。
+        
+        Args:
+            server_name: 服务器名称
+            instance: 旧实例信息
+            grace: 宽限期（秒）
+        """
+        try:
+            deadline = time.monotonic() + grace
+            drained = (
+                await self.mcp_proxy.wait_drained(instance['mcp_app'], deadline - time.monotonic())
+                and await self.sse_proxy.wait_drained(instance['sse_app'], deadline - time.monotonic())
+            )
+            if drained:
+                print(f"✓ 服务器 {server_name} 的旧实例已排空，正在关闭")
+            else:
+                print(f"⚠️  服务器 {server_name} 的旧实例在 {grace:.0f}秒宽限期内未排空，强制关闭")
+            
+            # 先停止路由旧会话，再关闭旧实例
+            self._forget_draining(server_name, instance)
+            if instance['lifespan_task'] is not None:
+                await self._stop_lifespan_tasks([instance['lifespan_task']])
+        finally:
+            self._forget_draining(server_name, instance)
+    
+    def _forget_draining(self, server_name: str, instance: Dict[str, Any]) -> None:
+        """
+        从服务器的排空列表中移除旧实例，并丢弃其会话记录
+        
+        Args:
+            server_name: 服务器名称
+            instance: 旧实例信息
+        """
+        info = self.server_info.get(server_name)
+        draining = info.get('draining') if info is not None else None
+        if draining and instance in draining:
+            draining.remove(instance)
+            if not draining:
+                del info['draining']
+        self.mcp_proxy.forget_app(instance['mcp_app'])
+        self.sse_proxy.forget_app(instance['sse_app'])
+    
     async def remove_server(self, server_name: str) -> bool:
         """
         完全移除服务器
@@ -700,6 +1952,8 @@ class MCPServerManager:
             
             # 2. 清理内存数据
             if server_name in self.server_info:
+                self.mcp_proxy.forget_app(self.server_info[server_name].get('mcp_app'))
+                self.sse_proxy.forget_app(self.server_info[server_name].get('sse_app'))
                 del self.server_info[server_name]
             if server_name in self.lifespan_tasks:
                 del self.lifespan_tasks[server_name]
@@ -708,14 +1962,8 @@ class MCPServerManager:
             from app.services.config_service import ConfigService
             ConfigService.remove_server_from_config(server_name)
             
-            # 4. 清理挂载列表（移除代理应用引用）
-            self.app_mount_list = [
-                mount for mount in self.app_mount_list 
-                if not mount['path'].endswith(f'/{server_name}')
-            ]
-            
-            # 注意：FastAPI不支持动态卸载路由，所以代理应用仍然存在
-            # 但由于server_info已被删除，代理会返回404错误
+            # 注意：路由由共享的代理应用按名称分发，server_info删除后
+            # 该服务器的请求直接返回404，不会在路由表中留下残留
             
             logger.info(f"✓ 服务器 {server_name} 移除成功")
             return True
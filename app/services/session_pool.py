@@ -0,0 +1,231 @@
+"""上游会话池 - 远程后端保持若干个已初始化的长连接会话，请求在这些会话上复用"""
+
+import asyncio
+import copy
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastmcp import FastMCP
+
+from app.services.http_pool import UpstreamHttpPool
+from app.services.upstream_timeouts import TimeoutProxyClient
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """单个长连接上游会话及其负载统计"""
+
+    __slots__ = ('index', 'client', 'in_flight', 'requests', 'reconnects', 'last_error', '_reconnecting')
+
+    def __init__(self, index: int, client: 'PooledProxyClient'):
+        self.index = index
+        # 会话的基础客户端，在生命周期内保持连接，请求客户端是共享其会话状态的浅拷贝
+        self.client = client
+        self.in_flight = 0
+        self.requests = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self._reconnecting: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        """会话后台任务仍在运行（未断开）"""
+        task = self.client._session_state.session_task
+        return task is not None and not task.done() and self.client.is_connected()
+
+    def new_client(self) -> 'PooledProxyClient':
+        """创建共享该会话、计入负载统计的客户端"""
+        # 与 Client.new() 不同，浅拷贝保留会话状态，进入客户端上下文时复用已初始化的会话
+        client = copy.copy(self.client)
+        client._pooled_session = self
+        self.requests += 1
+        return client
+
+
+class PooledProxyClient(TimeoutProxyClient):
+    """
+    共享池中会话的代理客户端
+
+    进入和退出客户端上下文时更新会话的进行中请求数，供最少进行中请求负载均衡使用。
+    基础客户端不绑定会话，只有 PooledSession.new_client() 创建的请求客户端才计入统计。
+    """
+
+    _pooled_session: Optional[PooledSession] = None
+
+    async def __aenter__(self):
+        session = self._pooled_session
+        if session is not None:
+            session.in_flight += 1
+        try:
+            return await super().__aenter__()
+        except BaseException:
+            if session is not None:
+                session.in_flight -= 1
+            raise
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            return await super().__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            if self._pooled_session is not None:
+                self._pooled_session.in_flight -= 1
+
+
+class UpstreamSessionPool:
+    """
+    远程后端（sse / streamable-http）的上游会话池
+
+    默认每个客户端会话都会建立独立的上游会话，首个请求需要等待连接和初始化握手。
+    启用会话池后，生命周期启动时建立 size 个已初始化的上游会话并一直保持，
+    请求选择进行中请求最少的会话并在其上复用（MCP会话本身支持并发请求）。
+    会话断开时由健康探测或下一个请求触发后台重连，重连完成前请求落在其他会话上；
+    所有会话都不可用时退回为请求建立独立的上游会话。
+
+    上游发起的请求（采样、elicitation）和日志/进度通知在共享会话上无法对应到具体的客户端会话，
+    依赖这些能力的后端不应启用会话池。
+    """
+
+    def __init__(self, client: PooledProxyClient, size: int = 1,
+                 http_pool: Optional[UpstreamHttpPool] = None):
+        """
+        初始化会话池
+
+        Args:
+            client: 上游代理客户端模板，每个会话复制一份独立的会话状态
+            size: 保持的上游会话数量
+            http_pool: 上游HTTP连接池，与会话池一同由生命周期关闭
+        """
+        self.template = client
+        self.sessions: List[PooledSession] = [
+            PooledSession(index, client.new()) for index in range(max(1, size))
+        ]
+        self.http_pool = http_pool
+        # 没有可用会话时退回独立上游会话的次数
+        self.fallbacks = 0
+
+    def client_factory(self) -> PooledProxyClient:
+        """
+        为当前请求选择会话并返回新的客户端
+
+        Returns:
+            PooledProxyClient: 共享所选会话的客户端，没有可用会话时为使用独立会话的客户端
+        """
+        available = []
+        for session in self.sessions:
+            if session.connected:
+                available.append(session)
+            else:
+                self._schedule_reconnect(session)
+
+        if not available:
+            self.fallbacks += 1
+            return self.template.new()
+        return min(available, key=lambda session: (session.in_flight, session.requests)).new_client()
+
+    def _schedule_reconnect(self, session: PooledSession) -> None:
+        """在后台重连已断开的会话，同一会话同时只有一个重连任务"""
+        if session._reconnecting is not None and not session._reconnecting.done():
+            return
+        try:
+            session._reconnecting = asyncio.get_running_loop().create_task(self._reconnect(session))
+        except RuntimeError:
+            # 不在事件循环中（例如生命周期已结束），由下次启动重新连接
+            pass
+
+    async def _reconnect(self, session: PooledSession) -> None:
+        """
+        重新建立会话并完成初始化握手
+
+        Args:
+            session: 已断开的会话
+        """
+        logger.info(f"重新连接上游会话 {session.index}")
+        try:
+            # 断开的会话仍持有基础客户端的引用计数，需要强制重置后才能重新连接
+            await session.client._disconnect(force=True)
+        except Exception as e:
+            logger.debug(f"重置上游会话 {session.index} 时出错: {e}")
+        try:
+            await session.client._connect()
+        except Exception as e:
+            session.last_error = str(e) or type(e).__name__
+            logger.warning(f"重新连接上游会话 {session.index} 失败: {session.last_error}")
+            raise
+        session.reconnects += 1
+        session.last_error = None
+        logger.info(f"✓ 上游会话 {session.index} 已重新连接")
+
+    async def _check(self, session: PooledSession) -> None:
+        """
+        探测单个会话，断开或探测失败时重连一次后再探测
+
+        Args:
+            session: 要探测的会话
+        """
+        if session.connected:
+            try:
+                await session.client.ping()
+                return
+            except Exception as e:
+                logger.warning(f"上游会话 {session.index} 探测失败: {e}")
+        task = session._reconnecting
+        if task is not None and not task.done():
+            await task
+        else:
+            await self._reconnect(session)
+        await session.client.ping()
+
+    async def ping(self) -> None:
+        """并发探测所有会话并重连断开的会话，任一会话最终不可用时抛出异常"""
+        await asyncio.gather(*(self._check(session) for session in self.sessions))
+
+    @asynccontextmanager
+    async def lifespan(self, server: FastMCP):
+        """
+        会话池的生命周期：上游会话的存续与服务器生命周期绑定
+
+        进入时并发建立所有会话并完成MCP初始化握手，生命周期启动完成即表示后端就绪；
+        退出时断开所有会话，再关闭上游HTTP连接池。
+
+        Args:
+            server: FastMCP代理服务器实例
+        """
+        async with AsyncExitStack() as stack:
+            if self.http_pool is not None:
+                await stack.enter_async_context(self.http_pool.lifespan(server))
+            try:
+                await asyncio.gather(*(session.client._connect() for session in self.sessions))
+                yield {}
+            finally:
+                for session in self.sessions:
+                    if session._reconnecting is not None:
+                        session._reconnecting.cancel()
+                        session._reconnecting = None
+                    try:
+                        await session.client._disconnect(force=True)
+                    except Exception as e:
+                        logger.warning(f"断开上游会话 {session.index} 时出错: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取会话池统计
+
+        Returns:
+            Dict[str, Any]: 各会话的连接状态、进行中请求数、累计请求数和重连次数，以及退回次数
+        """
+        return {
+            'sessions': [
+                {
+                    'session': session.index,
+                    'connected': session.connected,
+                    'in_flight': session.in_flight,
+                    'requests': session.requests,
+                    'reconnects': session.reconnects,
+                    'last_error': session.last_error
+                }
+                for session in self.sessions
+            ],
+            'fallbacks': self.fallbacks
+        }
@@ -0,0 +1,98 @@
+"""请求合并 - 相同的并发上游请求只发送一次，所有等待者共享同一个结果"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from app.services.result_cache import ToolResultCache
+
+
+class SingleFlight:
+    """
+    单个服务器的请求合并器（single-flight）
+
+    相同键（方法 + 规范化参数）的请求正在进行时，后到的请求不再发往上游，
+    而是等待进行中的请求并得到同一个结果或异常。
+    上游请求在独立的任务中执行，某个等待者被取消不会影响其他等待者。
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.total = 0
+        self.by_method: Dict[str, int] = {}
+        self.by_tool: Dict[str, int] = {}
+
+    async def do(self, method: str, key: str, call: Callable[[], Awaitable[Any]],
+                 tool: Optional[str] = None) -> Any:
+        """
+        执行请求，相同请求正在进行时合并到进行中的请求
+
+        Args:
+            method: MCP方法名
+            key: 规范化后的请求参数
+            call: 发送上游请求的无参协程函数
+            tool: 工具名称（工具调用时）
+
+        Returns:
+            Any: 上游请求的结果
+        """
+        flight_key = (method, key)
+        task = self._in_flight.get(flight_key)
+        if task is not None:
+            self._record(method, tool)
+        else:
+            task = asyncio.ensure_future(call())
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish(flight_key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, flight_key: Tuple[str, str], task: asyncio.Task) -> None:
+        """请求结束后移除记录，并取走异常（所有等待者都已取消时避免未处理异常的警告）"""
+        self._in_flight.pop(flight_key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def _record(self, method: str, tool: Optional[str]) -> None:
+        self.total += 1
+        self.by_method[method] = self.by_method.get(method, 0) + 1
+        if tool is not None:
+            self.by_tool[tool] = self.by_tool.get(tool, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出合并统计
+
+        Returns:
+            Dict[str, Any]: 被合并的请求数（总数、按方法、按工具）和进行中的上游请求数
+        """
+        return {
+            'coalesced': self.total,
+            'by_method': self.by_method,
+            'by_tool': self.by_tool,
+            'in_flight': len(self._in_flight)
+        }
+
+
+class CoalescingMiddleware(Middleware):
+    """合并配置中列出的工具的相同并发调用（仅适用于幂等的只读工具）"""
+
+    def __init__(self, single_flight: SingleFlight, tools: Iterable[str]):
+        """
+        初始化中间件
+
+        Args:
+            single_flight: 请求合并器
+            tools: 允许合并调用的工具名称
+        """
+        self.single_flight = single_flight
+        self.tools = frozenset(tools)
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        name = context.message.name
+        if name not in self.tools:
+            return await call_next(context)
+        key = ToolResultCache.make_key(name, context.message.arguments)
+        return await self.single_flight.do(
+            'tools/call', key, lambda: call_next(context), tool=name
+        )
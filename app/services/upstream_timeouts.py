@@ -0,0 +1,275 @@
+"""上游请求超时 - 按服务器/工具的超时配置、取消通知与超时统计"""
+
+import asyncio
+import datetime
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import anyio
+import mcp.types
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.server.proxy import ProxyClient
+from mcp import McpError
+from mcp.types import ErrorData
+
+logger = logging.getLogger(__name__)
+
+# 与MCP SDK请求超时使用的错误码一致
+REQUEST_TIMEOUT = 408
+
+# 当前任务最近一次实际发出的上游请求ID，由会话的 send_request 包装记录
+_sent_request: ContextVar[Optional[Dict[str, Any]]] = ContextVar('mcpcat_sent_request', default=None)
+
+
+def _track_request_ids(session) -> None:
+    """
+    包装上游会话的 send_request，把实际发出的请求ID记录到调用方任务的上下文中
+
+    会话可能被多个客户端共享（会话池），其他协程随时可能先占用下一个ID，
+    因此只在发出请求的那一刻记录：send_request 在第一次挂起之前同步分配ID，
+    包装函数读取ID与原方法分配ID之间没有挂起点。
+
+    Args:
+        session: MCP客户端会话
+    """
+    if getattr(session, '_mcpcat_tracks_request_ids', False):
+        return
+    send_request = session.send_request
+
+    async def tracked_send_request(*args, **kwargs):
+        record = _sent_request.get()
+        if record is not None:
+            record['id'] = session._request_id
+        return await send_request(*args, **kwargs)
+
+    session.send_request = tracked_send_request
+    session._mcpcat_tracks_request_ids = True
+
+
+class UpstreamTimeouts:
+    """
+    单个服务器的上游超时配置与统计
+
+    默认超时作用于所有代理请求，工具调用可以按工具名覆盖；
+    超时次数按MCP方法和工具名分别统计，便于调整配置。
+    """
+
+    def __init__(self, default: Optional[float] = None, tools: Optional[Dict[str, float]] = None):
+        """
+        初始化超时配置
+
+        Args:
+            default: 默认超时时间（秒），None表示不限制
+            tools: 按工具名覆盖的超时时间（秒）
+        """
+        self.default = default
+        self.tools = dict(tools or {})
+        self.total = 0
+        self.by_method: Dict[str, int] = {}
+        self.by_tool: Dict[str, int] = {}
+
+    def for_tool(self, name: str) -> Optional[float]:
+        """
+        获取工具调用的超时时间
+
+        Args:
+            name: 工具名称
+
+        Returns:
+            Optional[float]: 超时时间（秒），None表示不限制
+        """
+        return self.tools.get(name, self.default)
+
+    @property
+    def longest(self) -> Optional[float]:
+        """所有配置中最长的超时时间（秒），用于设置底层连接的超时"""
+        values = [value for value in (self.default, *self.tools.values()) if value is not None]
+        return max(values) if values else None
+
+    def record(self, method: str, tool: Optional[str] = None) -> None:
+        """
+        记录一次超时
+
+        Args:
+            method: MCP方法名
+            tool: 工具名称（工具调用时）
+        """
+        self.total += 1
+        self.by_method[method] = self.by_method.get(method, 0) + 1
+        if tool is not None:
+            self.by_tool[tool] = self.by_tool.get(tool, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出超时配置与统计
+
+        Returns:
+            Dict[str, Any]: 默认超时、工具覆盖和超时次数
+        """
+        return {
+            'default': self.default,
+            'tools': self.tools,
+            'total': self.total,
+            'by_method': self.by_method,
+            'by_tool': self.by_tool
+        }
+
+
+def timeout_error(target: str, timeout: float) -> McpError:
+    """
+    构造返回给客户端的超时错误
+
+    Args:
+        target: 超时的工具或请求描述
+        timeout: 超时时间（秒）
+
+    Returns:
+        McpError: 错误码为408的MCP错误
+    """
+    return McpError(ErrorData(
+        code=REQUEST_TIMEOUT,
+        message=f"上游{target}超时（{timeout:g}秒），请求已取消"
+    ))
+
+
+class TimeoutProxyClient(ProxyClient):
+    """
+    带超时控制的代理客户端
+
+    默认超时作用于所有代理请求，工具调用使用按工具覆盖的超时；
+    初始化握手不受影响（冷启动较慢的后端不会因此连接失败）。
+    超时后向上游发送 notifications/cancelled，让上游停止处理，
+    并向客户端返回明确的超时错误，同时记录超时次数。
+    """
+
+    def __init__(self, transport: Any, timeouts: Optional[UpstreamTimeouts] = None, **kwargs):
+        """
+        初始化代理客户端
+
+        Args:
+            transport: 上游传输配置
+            timeouts: 超时配置与统计，多个客户端副本共享同一个实例
+        """
+        self.timeouts = timeouts or UpstreamTimeouts()
+        super().__init__(transport, **kwargs)
+
+    async def _send_with_timeout(self, method: str, target: str, timeout: Optional[float],
+                                 call, tool: Optional[str] = None):
+        """
+        发送请求，超时后通知上游取消
+
+        取消通知使用本次调用实际发出的请求ID（可能在共享会话上与其他请求交错），
+        超时时请求尚未发出则不发送取消通知。
+
+        Args:
+            method: MCP方法名
+            target: 错误信息中的请求描述
+            timeout: 超时时间（秒）
+            call: 发送请求的无参协程函数
+            tool: 工具名称（工具调用时）
+        """
+        _track_request_ids(self.session)
+        sent: Dict[str, Any] = {}
+        token = _sent_request.set(sent)
+        try:
+            with anyio.fail_after(timeout):
+                return await call()
+        except TimeoutError as e:
+            self.timeouts.record(method, tool)
+            request_id = sent.get('id')
+            if request_id is None:
+                logger.warning(f"上游{target}超时（{timeout:g}秒），请求尚未发出")
+                raise timeout_error(target, timeout) from e
+            logger.warning(f"上游{target}超时（{timeout:g}秒），通知上游取消请求 {request_id}")
+            try:
+                await self.session.send_notification(mcp.types.ClientNotification(
+                    mcp.types.CancelledNotification(
+                        params=mcp.types.CancelledNotificationParams(
+                            requestId=request_id,
+                            reason=f"timeout after {timeout:g}s"
+                        )
+                    )
+                ))
+            except Exception as notify_error:
+                logger.warning(f"发送取消通知失败: {notify_error}")
+            raise timeout_error(target, timeout) from e
+        finally:
+            _sent_request.reset(token)
+
+    async def call_tool_mcp(self, name: str, arguments: Dict[str, Any], progress_handler=None,
+                            timeout=None, meta=None) -> mcp.types.CallToolResult:
+        if timeout is None:
+            timeout = self.timeouts.for_tool(name)
+        elif isinstance(timeout, datetime.timedelta):
+            timeout = timeout.total_seconds()
+        return await self._send_with_timeout(
+            'tools/call', f"工具 '{name}' 调用", timeout,
+            lambda: super(TimeoutProxyClient, self).call_tool_mcp(
+                name, arguments, progress_handler=progress_handler, meta=meta
+            ),
+            tool=name
+        )
+
+    async def list_tools_mcp(self) -> mcp.types.ListToolsResult:
+        return await self._send_with_timeout(
+            'tools/list', "工具列表请求", self.timeouts.default, super().list_tools_mcp
+        )
+
+    async def list_resources_mcp(self) -> mcp.types.ListResourcesResult:
+        return await self._send_with_timeout(
+            'resources/list', "资源列表请求", self.timeouts.default, super().list_resources_mcp
+        )
+
+    async def list_resource_templates_mcp(self) -> mcp.types.ListResourceTemplatesResult:
+        return await self._send_with_timeout(
+            'resources/templates/list', "资源模板列表请求", self.timeouts.default,
+            super().list_resource_templates_mcp
+        )
+
+    async def read_resource_mcp(self, uri, meta=None) -> mcp.types.ReadResourceResult:
+        return await self._send_with_timeout(
+            'resources/read', f"资源 '{uri}' 读取", self.timeouts.default,
+            lambda: super(TimeoutProxyClient, self).read_resource_mcp(uri, meta=meta)
+        )
+
+    async def list_prompts_mcp(self) -> mcp.types.ListPromptsResult:
+        return await self._send_with_timeout(
+            'prompts/list', "提示词列表请求", self.timeouts.default, super().list_prompts_mcp
+        )
+
+    async def get_prompt_mcp(self, name: str, arguments: Optional[Dict[str, Any]] = None,
+                             meta=None) -> mcp.types.GetPromptResult:
+        return await self._send_with_timeout(
+            'prompts/get', f"提示词 '{name}' 获取", self.timeouts.default,
+            lambda: super(TimeoutProxyClient, self).get_prompt_mcp(name, arguments, meta=meta)
+        )
+
+
+class ToolTimeoutMiddleware(Middleware):
+    """
+    网关本地执行的工具（OpenAPI服务器）的超时控制
+
+    超时后取消正在执行的工具（包括向上游API发出的HTTP请求），向客户端返回明确的超时错误。
+    """
+
+    def __init__(self, timeouts: UpstreamTimeouts):
+        """
+        初始化中间件
+
+        Args:
+            timeouts: 超时配置与统计
+        """
+        self.timeouts = timeouts
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        name = context.message.name
+        timeout = self.timeouts.for_tool(name)
+        if timeout is None:
+            return await call_next(context)
+        try:
+            return await asyncio.wait_for(call_next(context), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts.record('tools/call', name)
+            logger.warning(f"工具 '{name}' 调用超时（{timeout:g}秒），已取消")
+            raise timeout_error(f"工具 '{name}' 调用", timeout)
@@ -0,0 +1,151 @@
+"""
+AuthMiddleware SSE流开销基准测试
+
+对比基于 BaseHTTPMiddleware 的旧实现与纯ASGI实现在SSE流上的
+首字节时间（TTFB）和每个事件的额外开销。两者使用相同的认证判断逻辑，
+差异只来自响应是否被中间件包装。
+
+用法:
+    python benchmarks/bench_auth_middleware_sse.py --events 2000 --runs 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 使用临时配置文件，避免污染项目配置
+_tmp_dir = tempfile.mkdtemp(prefix="mcpcat-bench-")
+os.environ["MCPCAT_CONFIG_PATH"] = str(Path(_tmp_dir) / "config.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.auth import AuthMiddleware  # noqa: E402
+from app.models.mcp_config import PermissionType  # noqa: E402
+from app.services.security_service import security_service  # noqa: E402
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """旧实现：同样的认证逻辑，但通过 BaseHTTPMiddleware 包装响应"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.auth = AuthMiddleware(app)
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if self.auth.is_public_path(path) or self.auth.is_mcp_server_public(path):
+            return await call_next(request)
+        response, _ = self.auth._authenticate(
+            request.scope, path, request.method,
+            self.auth.get_required_permission(path, request.method)
+        )
+        if response is not None:
+            return response
+        return await call_next(request)
+
+
+def make_sse_app(events: int):
+    """构造一个立即推送固定数量事件的SSE应用"""
+    payload = b'event: message\ndata: {"jsonrpc":"2.0","method":"notifications/progress"}\n\n'
+
+    async def sse_app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [[b"content-type", b"text/event-stream"]],
+        })
+        for _ in range(events):
+            await send({"type": "http.response.body", "body": payload, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    return sse_app
+
+
+async def run_stream(app, api_key: str, header_name: str):
+    """驱动一次SSE请求，返回 (TTFB秒, 总耗时秒, 收到的事件数)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/sse/bench/",
+        "raw_path": b"/sse/bench/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            [header_name.lower().encode(), api_key.encode()],
+            [b"accept", b"text/event-stream"],
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    finished = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    first_byte = None
+    chunks = 0
+
+    async def send(message):
+        nonlocal first_byte, chunks
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            chunks += 1
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            finished.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    end = time.perf_counter()
+    return first_byte - start, end - start, chunks
+
+
+async def bench(name: str, app, runs: int, events: int, api_key: str, header_name: str):
+    # 预热
+    await run_stream(app, api_key, header_name)
+    ttfbs, per_event = [], []
+    for _ in range(runs):
+        ttfb, total, chunks = await run_stream(app, api_key, header_name)
+        assert chunks == events, f"{name}: 期望 {events} 个事件，实际 {chunks}"
+        ttfbs.append(ttfb)
+        per_event.append((total - ttfb) / max(chunks - 1, 1))
+    print(
+        f"{name:<24} TTFB 中位数 {statistics.median(ttfbs) * 1e6:9.1f} µs   "
+        f"每事件 {statistics.median(per_event) * 1e6:7.2f} µs"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000, help="每个流的事件数")
+    parser.add_argument("--runs", type=int, default=20, help="每种实现的运行次数")
+    args = parser.parse_args()
+
+    key = security_service.add_api_key("bench", PermissionType.READ, key="bench-key-0001")
+    header_name = security_service.get_auth_header_name()
+    sse_app = make_sse_app(args.events)
+
+    print(f"SSE流: {args.events} 个事件 x {args.runs} 次")
+    await bench("BaseHTTPMiddleware(旧)", LegacyAuthMiddleware(sse_app),
+                args.runs, args.events, key.key, header_name)
+    await bench("纯ASGI(新)", AuthMiddleware(sse_app),
+                args.runs, args.events, key.key, header_name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+OpenAPI服务器构建时间基准测试
+
+生成包含不同数量操作的OpenAPI规范（路径参数、查询参数、引用组件的请求体和响应），
+分别统计三种情况下创建OpenAPI服务器的耗时：
+- from_openapi: 直接使用 FastMCP.from_openapi（未使用产物缓存时的行为）
+- 冷启动: 产物缓存为空，完整构建并写入产物
+- 热启动: 规范和路由配置未变化，从预编译产物创建
+
+用法:
+    python benchmarks/bench_openapi_artifacts.py --operations 100 1000 3000 --repeat 3
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 使用临时配置文件，避免污染项目配置
+_tmp_dir = tempfile.mkdtemp(prefix="mcpcat-bench-")
+os.environ["MCPCAT_CONFIG_PATH"] = str(Path(_tmp_dir) / "config.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastmcp import FastMCP  # noqa: E402
+from fastmcp.server.openapi import MCPType, RouteMap  # noqa: E402
+
+from app.services.openapi_artifact_cache import OpenAPIArtifactCache  # noqa: E402
+
+ROUTE_CONFIGS = [{"methods": ["GET", "POST"], "pattern": "^/api/.*"}]
+
+
+def make_spec(operations: int) -> dict:
+    """生成包含指定数量操作的规范，一半GET一半POST"""
+    schemas = {}
+    paths = {}
+    for index in range(operations // 2):
+        schemas[f"Item{index}"] = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "name": {"type": "string"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "owner": {"$ref": "#/components/schemas/Owner"}
+            },
+            "required": ["id", "name"]
+        }
+        ref = {"$ref": f"#/components/schemas/Item{index}"}
+        paths[f"/api/items{index}/{{item_id}}"] = {
+            "get": {
+                "operationId": f"get_item_{index}",
+                "summary": f"Get item {index}",
+                "parameters": [
+                    {"name": "item_id", "in": "path", "required": True, "schema": {"type": "integer"}},
+                    {"name": "verbose", "in": "query", "schema": {"type": "boolean"}}
+                ],
+                "responses": {"200": {"description": "ok", "content": {"application/json": {"schema": ref}}}}
+            },
+            "post": {
+                "operationId": f"update_item_{index}",
+                "summary": f"Update item {index}",
+                "parameters": [
+                    {"name": "item_id", "in": "path", "required": True, "schema": {"type": "integer"}}
+                ],
+                "requestBody": {"required": True, "content": {"application/json": {"schema": ref}}},
+                "responses": {"200": {"description": "ok", "content": {"application/json": {"schema": ref}}}}
+            }
+        }
+    schemas["Owner"] = {"type": "object", "properties": {"id": {"type": "integer"}, "email": {"type": "string"}}}
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "bench", "version": "1.0"},
+        "paths": paths,
+        "components": {"schemas": schemas}
+    }
+
+
+def route_maps() -> list:
+    maps = [RouteMap(methods=c["methods"], pattern=c["pattern"], mcp_type=MCPType.TOOL) for c in ROUTE_CONFIGS]
+    return maps + [RouteMap(mcp_type=MCPType.EXCLUDE)]
+
+
+def timed(fn, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_case(operations: int, repeat: int):
+    spec = make_spec(operations)
+    client = httpx.AsyncClient(base_url="http://localhost")
+    cache_dir = Path(_tmp_dir) / f"artifacts-{operations}"
+    cache = OpenAPIArtifactCache(str(cache_dir))
+
+    baseline, _ = timed(lambda: FastMCP.from_openapi(openapi_spec=spec, client=client, route_maps=route_maps()), repeat)
+
+    def cold():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return cache.build(spec, ROUTE_CONFIGS, client=client, route_maps=route_maps())
+
+    cold_seconds, cold_mcp = timed(cold, repeat)
+    warm_seconds, warm_mcp = timed(lambda: cache.build(spec, ROUTE_CONFIGS, client=client, route_maps=route_maps()), repeat)
+    assert warm_mcp.openapi_artifact == 'hit'
+    assert sorted(warm_mcp._tool_manager._tools) == sorted(cold_mcp._tool_manager._tools)
+    size_kb = sum(path.stat().st_size for path in cache_dir.iterdir()) / 1024
+    return baseline, cold_seconds, warm_seconds, len(warm_mcp._tool_manager._tools), size_kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operations", type=int, nargs="+", default=[100, 1000, 3000], help="规范中的操作数量列表")
+    parser.add_argument("--repeat", type=int, default=3, help="每种情况重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    print(f"{'操作数':>6} {'工具数':>6} {'from_openapi(ms)':>17} {'冷启动(ms)':>11} {'热启动(ms)':>11} {'加速比':>7} {'产物(KB)':>9}")
+    for operations in args.operations:
+        baseline, cold, warm, tools, size_kb = run_case(operations, args.repeat)
+        print(f"{operations:>6} {tools:>6} {baseline * 1000:>17.1f} {cold * 1000:>11.1f} "
+              f"{warm * 1000:>11.1f} {baseline / warm:>6.1f}x {size_kb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
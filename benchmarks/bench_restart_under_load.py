@@ -0,0 +1,149 @@
+"""
+运行中重启的可用性验证
+
+启动网关（uvicorn，本地端口）和一个启动较慢的stdio桩服务器（模拟 npx/uvx 后端），
+多个并发客户端持续打开会话、调用工具、关闭会话（模拟稳定负载下的Agent），
+期间多次通过 restart_server 修改配置并重启服务器，统计失败的请求数。
+
+对比两种方式：
+    blue-green  restart_server 的蓝绿切换（新实例就绪后切换流量，旧实例排空后关闭）
+    stop-start  先 stop_server 再 start_server（旧的重启方式）
+
+用法:
+    python benchmarks/bench_restart_under_load.py --agents 8 --restarts 3 --startup-ms 1500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+# 使用临时配置文件，避免污染项目配置
+_tmp_dir = tempfile.mkdtemp(prefix="mcpcat-bench-")
+os.environ["MCPCAT_CONFIG_PATH"] = str(Path(_tmp_dir) / "config.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastmcp import Client  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.server_manager import MCPServerManager  # noqa: E402
+
+STUB_SERVER = textwrap.dedent('''
+    import asyncio, os, sys, time
+    from fastmcp import FastMCP
+
+    mcp = FastMCP("stub")
+
+    @mcp.tool
+    async def work(ms: float) -> str:
+        await asyncio.sleep(ms / 1000)
+        return os.environ.get("STUB_VERSION", "")
+
+    # 模拟 npx/uvx 后端较慢的冷启动
+    time.sleep(float(sys.argv[1]))
+    mcp.run(show_banner=False, log_level="WARNING")
+''')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_case(mode: str, stub_path: str, args) -> dict:
+    def server_config(version: int) -> dict:
+        return {
+            "type": "stdio",
+            "command": sys.executable,
+            "args": [stub_path, str(args.startup_ms / 1000)],
+            "env": {"STUB_VERSION": str(version)},
+            "require_auth": False,
+        }
+
+    Path(os.environ["MCPCAT_CONFIG_PATH"]).write_text(
+        json.dumps({"mcpServers": {"svc": server_config(0)}})
+    )
+    manager = MCPServerManager()
+    manager.add_mcp_server("svc", server_config(0))
+    app = FastAPI(lifespan=manager.create_unified_lifespan)
+    manager.mount_all_servers(app)
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    await manager.wait_until_ready("svc")
+
+    stats = {"ok": 0, "failed": 0, "versions": set(), "errors": {}}
+    stop = asyncio.Event()
+
+    async def agent():
+        while not stop.is_set():
+            try:
+                async with Client(f"http://127.0.0.1:{port}/mcp/svc/", timeout=30) as client:
+                    for _ in range(args.calls):
+                        result = await client.call_tool("work", {"ms": args.work_ms})
+                        stats["ok"] += 1
+                        stats["versions"].add(result.data)
+            except Exception as e:
+                stats["failed"] += 1
+                error = type(e).__name__
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+                await asyncio.sleep(0.05)
+
+    agents = [asyncio.create_task(agent()) for _ in range(args.agents)]
+    await asyncio.sleep(1.0)
+    restart_seconds = []
+    for version in range(1, args.restarts + 1):
+        started_at = time.perf_counter()
+        if mode == "blue-green":
+            await manager.restart_server("svc", server_config(version))
+        else:
+            await manager.stop_server("svc")
+            await manager.restart_server("svc", server_config(version))
+        restart_seconds.append(time.perf_counter() - started_at)
+        await asyncio.sleep(args.interval)
+
+    stop.set()
+    await asyncio.gather(*agents)
+    server.should_exit = True
+    await serve_task
+    stats["restart_seconds"] = sum(restart_seconds) / len(restart_seconds)
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=8, help="并发客户端数")
+    parser.add_argument("--calls", type=int, default=5, help="每个会话的工具调用次数")
+    parser.add_argument("--work-ms", type=float, default=50.0, help="每次工具调用的处理时间（毫秒）")
+    parser.add_argument("--startup-ms", type=float, default=1500.0, help="桩服务器的启动时间（毫秒）")
+    parser.add_argument("--restarts", type=int, default=3, help="重启次数")
+    parser.add_argument("--interval", type=float, default=2.0, help="两次重启之间的间隔（秒）")
+    parser.add_argument("--modes", nargs="+", default=["blue-green", "stop-start"],
+                        choices=["blue-green", "stop-start"], help="对比的重启方式")
+    args = parser.parse_args()
+
+    settings.mcpcat_restart_drain_timeout = 10.0
+    stub_path = Path(_tmp_dir) / "stub_server.py"
+    stub_path.write_text(STUB_SERVER)
+
+    print(f"{'方式':<12} {'成功调用':>8} {'失败会话':>8} {'平均重启耗时(秒)':>16}  服务版本  错误")
+    for mode in args.modes:
+        stats = await run_case(mode, str(stub_path), args)
+        print(f"{mode:<12} {stats['ok']:>8} {stats['failed']:>8} {stats['restart_seconds']:>16.2f}  "
+              f"{sorted(stats['versions'])}  {stats['errors'] or '-'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
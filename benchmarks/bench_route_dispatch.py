@@ -0,0 +1,146 @@
+"""
+AuthMiddleware 路由决策微基准测试
+
+对比旧实现（逐个匹配公开路径正则、遍历权限映射、每次调用 re.match 提取服务器名称）
+与编译后的单一路由决策正则在真实路径组合上的单次决策耗时。
+服务器认证配置查询在两边都替换为同样的字典查找，只比较路由匹配本身的开销。
+
+用法:
+    python benchmarks/bench_route_dispatch.py --iterations 200000
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+os.environ.setdefault(
+    "MCPCAT_CONFIG_PATH", str(Path(tempfile.mkdtemp(prefix="mcpcat-bench-")) / "config.json")
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.middleware.auth import AuthMiddleware  # noqa: E402
+from app.models.mcp_config import PermissionType  # noqa: E402
+
+# 模拟的服务器认证配置：服务器名称 -> 是否需要认证
+SERVER_REQUIRE_AUTH = {"fetch": False, "time": True, "context7": True}
+
+# 请求路径组合 (方法, 路径)
+REQUEST_MIX = [
+    ("POST", "/mcp/time/"),
+    ("POST", "/mcp/context7/"),
+    ("GET", "/mcp/fetch/"),
+    ("GET", "/sse/time"),
+    ("POST", "/sse/context7/messages/"),
+    ("POST", "/api/servers/time/restart"),
+    ("GET", "/api/servers/time/health"),
+    ("GET", "/api/servers"),
+    ("PUT", "/api/servers/time"),
+    ("GET", "/ui/main.dart.js"),
+    ("GET", "/ui/assets/fonts/MaterialIcons-Regular.otf"),
+    ("GET", "/api/health"),
+]
+
+
+class LegacyRouteResolver:
+    """旧实现的路由判断逻辑（逐条正则匹配）"""
+
+    def __init__(self):
+        self.public_patterns = [re.compile(p) for p in [
+            r"^/$", r"^/ui/.*", r"^/static/.*", r"^/api/health$",
+            r"^/api/auth/verify$", r"^/api/auth/config$", r"^/api/auth/first-run-keys$",
+        ]]
+        self.permission_patterns = {re.compile(p): perm for p, perm in {
+            r"^/api/servers/[^/]+/start$": PermissionType.WRITE,
+            r"^/api/servers/[^/]+/stop$": PermissionType.WRITE,
+            r"^/api/servers/[^/]+/restart$": PermissionType.WRITE,
+            r"^/api/servers/[^/]+/health$": PermissionType.READ,
+            r"^/api/servers/[^/]+/config$": PermissionType.READ,
+            r"^/mcp/[^/]+/.*": PermissionType.READ,
+            r"^/sse/[^/]+.*": PermissionType.READ,
+        }.items()}
+
+    def is_public_path(self, path):
+        return any(pattern.match(path) for pattern in self.public_patterns)
+
+    def is_mcp_server_public(self, path):
+        mcp_match = re.match(r"^/mcp/([^/]+)", path)
+        if mcp_match:
+            return not SERVER_REQUIRE_AUTH.get(mcp_match.group(1), True)
+        sse_match = re.match(r"^/sse/([^/]+)", path)
+        if sse_match:
+            return not SERVER_REQUIRE_AUTH.get(sse_match.group(1), True)
+        return False
+
+    def get_required_permission(self, path, method):
+        for pattern, permission in self.permission_patterns.items():
+            if pattern.match(path):
+                return permission
+        if path.startswith('/api/servers'):
+            method_upper = method.upper()
+            if path == '/api/servers' and method_upper == 'GET':
+                return PermissionType.READ
+            if path == '/api/servers' and method_upper == 'POST':
+                return PermissionType.WRITE
+            if path.startswith('/api/servers/') and method_upper == 'GET':
+                return PermissionType.READ
+            if path.startswith('/api/servers/') and method_upper in ['PUT', 'DELETE']:
+                return PermissionType.WRITE
+        if method.upper() in ['POST', 'PUT', 'DELETE']:
+            return PermissionType.WRITE
+        return PermissionType.READ
+
+    def decide(self, path, method):
+        if self.is_public_path(path):
+            return True, None
+        if self.is_mcp_server_public(path):
+            return True, None
+        return False, self.get_required_permission(path, method)
+
+
+class CompiledRouteResolver:
+    """新实现：一次匹配得出决策"""
+
+    def __init__(self):
+        self.middleware = AuthMiddleware(app=None)
+
+    def decide(self, path, method):
+        route = self.middleware.resolve_route(path, method)
+        if route.is_public:
+            return True, None
+        if route.server_name is not None and not SERVER_REQUIRE_AUTH.get(route.server_name, True):
+            return True, None
+        return False, route.required_permission
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200000, help="每种实现的决策次数")
+    args = parser.parse_args()
+
+    legacy = LegacyRouteResolver()
+    compiled = CompiledRouteResolver()
+
+    # 先确认两种实现的决策完全一致
+    for method, path in REQUEST_MIX:
+        assert legacy.decide(path, method) == compiled.decide(path, method), (method, path)
+
+    rounds = max(args.iterations // len(REQUEST_MIX), 1)
+    total = rounds * len(REQUEST_MIX)
+    print(f"路径组合 {len(REQUEST_MIX)} 条，共 {total} 次决策")
+    for name, resolver in [("逐条正则(旧)", legacy), ("编译决策正则(新)", compiled)]:
+        decide = resolver.decide
+
+        def run():
+            for method, path in REQUEST_MIX:
+                decide(path, method)
+
+        elapsed = min(timeit.repeat(run, number=rounds, repeat=3))
+        print(f"{name:<16} 每次决策 {elapsed / total * 1e9:8.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+MCP服务器路由基准测试
+
+对比旧方式（每个服务器挂载 /mcp/{name} 和 /sse/{name} 两个 Mount，路由线性扫描 2×N 条）
+与 /mcp、/sse 上各一个分发代理（按名称字典查找）在 10 / 100 / 1000 个服务器时的单次请求路由开销。
+后端替换为直接返回 200 的最小ASGI应用，只测量路由本身。
+
+用法:
+    python benchmarks/bench_server_routing.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault(
+    "MCPCAT_CONFIG_PATH", str(Path(tempfile.mkdtemp(prefix="mcpcat-bench-")) / "config.json")
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.services.server_manager import MCPServerManager  # noqa: E402
+
+
+async def stub_backend(scope, receive, send):
+    """最小后端应用：直接返回 200"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class LegacyServerProxy:
+    """旧方式的单服务器代理：挂载在 /mcp/{name} 上，按固定名称查找服务器"""
+
+    def __init__(self, server_name, server_manager, transport_type):
+        self.server_name = server_name
+        self.server_manager = server_manager
+        self.transport_type = transport_type
+
+    async def __call__(self, scope, receive, send):
+        server_info = self.server_manager.server_info.get(self.server_name)
+        await server_info[f"{self.transport_type}_app"](scope, receive, send)
+
+
+def register_servers(manager: MCPServerManager, count: int):
+    names = [f"server-{i}" for i in range(count)]
+    for name in names:
+        manager.server_info[name] = {
+            "config": {"type": "stdio"},
+            "mcp_app": stub_backend,
+            "sse_app": stub_backend,
+            "status": "running",
+        }
+    return names
+
+
+def build_legacy_app(count: int):
+    manager = MCPServerManager()
+    names = register_servers(manager, count)
+    app = FastAPI()
+    for name in names:
+        app.mount(f"/mcp/{name}", LegacyServerProxy(name, manager, "mcp"))
+        app.mount(f"/sse/{name}", LegacyServerProxy(name, manager, "sse"))
+    return app, names
+
+
+def build_dispatcher_app(count: int):
+    manager = MCPServerManager()
+    names = register_servers(manager, count)
+    app = FastAPI()
+    manager.mount_all_servers(app)
+    return app, names
+
+
+async def call(app, path: str):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, names, requests: int) -> float:
+    rng = random.Random(42)
+    paths = [
+        f"/{rng.choice(('mcp', 'sse'))}/{rng.choice(names)}/" for _ in range(requests)
+    ]
+    # 预热（构建中间件栈）
+    assert await call(app, paths[0]) == 200
+    start = time.perf_counter()
+    for path in paths:
+        await call(app, path)
+    return (time.perf_counter() - start) / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000, help="每种配置的请求数")
+    args = parser.parse_args()
+
+    print(f"{'服务器数':>8} {'旧:路由条数':>12} {'旧:每请求':>12} {'新:路由条数':>12} {'新:每请求':>12}")
+    for count in (10, 100, 1000):
+        legacy_app, names = build_legacy_app(count)
+        legacy = await measure(legacy_app, names, args.requests)
+        dispatcher_app, names = build_dispatcher_app(count)
+        dispatcher = await measure(dispatcher_app, names, args.requests)
+        print(
+            f"{count:>8} {len(legacy_app.router.routes):>12} {legacy * 1e6:>10.1f}µs "
+            f"{len(dispatcher_app.router.routes):>12} {dispatcher * 1e6:>10.1f}µs"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+STDIO副本池吞吐量基准测试
+
+启动一个本地stdio桩服务器（每个子进程同一时间只处理一个工具调用，模拟单管道串行处理的后端），
+通过 MCPServerFactory 创建的代理以 1 / 2 / 4 ... 个副本运行，
+多个并发客户端会话（模拟多个Agent）持续调用工具，统计吞吐量和各副本的路由次数。
+网关和所有子进程在同一台机器上运行，处理时间过短时吞吐量会先受限于CPU而不是单个子进程。
+
+用法:
+    python benchmarks/bench_stdio_replicas.py --replicas 1 2 4 --sessions 16 --calls 5 --work-ms 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+# 使用临时配置文件，避免污染项目配置
+_tmp_dir = tempfile.mkdtemp(prefix="mcpcat-bench-")
+os.environ["MCPCAT_CONFIG_PATH"] = str(Path(_tmp_dir) / "config.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastmcp import Client  # noqa: E402
+
+from app.services.mcp_factory import MCPServerFactory  # noqa: E402
+
+STUB_SERVER = textwrap.dedent('''
+    import asyncio, os, sys
+    from fastmcp import FastMCP
+
+    mcp = FastMCP("stub")
+    work_seconds = float(sys.argv[1])
+    # 单个子进程串行处理请求，与大多数stdio服务器的行为一致
+    lock = asyncio.Lock()
+
+    @mcp.tool
+    async def work() -> int:
+        async with lock:
+            await asyncio.sleep(work_seconds)
+        return os.getpid()
+
+    mcp.run(show_banner=False, log_level="WARNING")
+''')
+
+
+async def run_case(stub_path: str, replicas: int, sessions: int, calls: int, work_ms: float):
+    config = {
+        "type": "stdio",
+        "command": sys.executable,
+        "args": [stub_path, str(work_ms / 1000)],
+        "replicas": replicas,
+    }
+    mcp = MCPServerFactory.create_server(f"bench-{replicas}", config)
+    app = mcp.http_app(path='/')
+
+    async def agent():
+        pids = []
+        async with Client(mcp) as client:
+            for _ in range(calls):
+                result = await client.call_tool("work", {})
+                pids.append(result.data)
+        return pids
+
+    async with app.lifespan(app):
+        # 预热：每个会话的首次调用不计入
+        await asyncio.gather(*(agent() for _ in range(min(sessions, replicas))))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(agent() for _ in range(sessions)))
+        elapsed = time.perf_counter() - start
+        stats = mcp.replica_pool.get_stats()
+
+    # 同一会话的调用应全部落在同一个子进程上
+    pinned = all(len(set(pids)) == 1 for pids in results)
+    total = sessions * calls
+    return total / elapsed, [s['requests'] for s in stats], pinned
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 2, 4], help="副本数量列表")
+    parser.add_argument("--sessions", type=int, default=16, help="并发客户端会话数")
+    parser.add_argument("--calls", type=int, default=5, help="每个会话的工具调用次数")
+    parser.add_argument("--work-ms", type=float, default=200.0, help="桩服务器每次调用的处理时间（毫秒）")
+    args = parser.parse_args()
+
+    stub_path = Path(_tmp_dir) / "stub_server.py"
+    stub_path.write_text(STUB_SERVER)
+
+    print(f"{'副本数':>6} {'吞吐量(次/秒)':>14} {'加速比':>8}  会话固定  各副本路由次数")
+    baseline = None
+    for replicas in args.replicas:
+        throughput, distribution, pinned = await run_case(
+            str(stub_path), replicas, args.sessions, args.calls, args.work_ms
+        )
+        baseline = baseline or throughput
+        print(f"{replicas:>6} {throughput:>14.1f} {throughput / baseline:>7.2f}x  "
+              f"{'✓' if pinned else '✗':>6}    {distribution}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+上游会话池首次调用延迟基准测试
+
+启动一个本地 streamable-http 桩服务器（每个HTTP请求额外延迟 --rtt-ms，模拟到远程后端的网络往返），
+通过 MCPServerFactory 创建的代理分别以 session_pool=0（每个客户端会话独立建立上游会话）
+和 session_pool=N 运行，每个新的客户端会话（模拟一个新的Agent会话）调用一次工具，
+统计首次调用的延迟分布。未启用会话池时首次调用需要等待上游连接和初始化握手。
+
+用法:
+    python benchmarks/bench_upstream_session_pool.py --pool-sizes 0 2 --sessions 50 --rtt-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+import httpx
+
+# 使用临时配置文件，避免污染项目配置
+_tmp_dir = tempfile.mkdtemp(prefix="mcpcat-bench-")
+os.environ["MCPCAT_CONFIG_PATH"] = str(Path(_tmp_dir) / "config.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastmcp import Client  # noqa: E402
+
+from app.services.mcp_factory import MCPServerFactory  # noqa: E402
+
+STUB_SERVER = textwrap.dedent('''
+    import asyncio, sys
+    import uvicorn
+    from fastmcp import FastMCP
+
+    mcp = FastMCP("stub")
+    port = int(sys.argv[1])
+    rtt_seconds = float(sys.argv[2])
+
+    @mcp.tool
+    def echo(value: int) -> int:
+        return value
+
+    app = mcp.http_app(path="/mcp")
+
+    async def delayed(scope, receive, send):
+        # 每个HTTP请求模拟一次网络往返
+        if scope["type"] == "http":
+            await asyncio.sleep(rtt_seconds)
+        await app(scope, receive, send)
+
+    uvicorn.run(delayed, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+''')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_stub(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("桩服务器启动超时")
+
+
+async def run_case(url: str, pool_size: int, sessions: int):
+    config = {"type": "streamable-http", "url": url, "session_pool": pool_size}
+    mcp = MCPServerFactory.create_server(f"bench-{pool_size}", config)
+    app = mcp.http_app(path='/')
+
+    latencies = []
+    async with app.lifespan(app):
+        # 预热列表缓存，只比较工具调用本身
+        async with Client(mcp) as client:
+            await client.list_tools()
+        for index in range(sessions):
+            async with Client(mcp) as client:
+                start = time.perf_counter()
+                await client.call_tool("echo", {"value": index})
+                latencies.append(time.perf_counter() - start)
+        stats = mcp.session_pool.get_stats() if pool_size else None
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    return p50, p95, stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[0, 2], help="会话池大小列表，0表示不启用")
+    parser.add_argument("--sessions", type=int, default=50, help="依次建立的客户端会话数")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="桩服务器每个HTTP请求的额外延迟（毫秒）")
+    args = parser.parse_args()
+
+    stub_path = Path(_tmp_dir) / "stub_server.py"
+    stub_path.write_text(STUB_SERVER)
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    stub = subprocess.Popen([sys.executable, str(stub_path), str(port), str(args.rtt_ms / 1000)])
+    try:
+        await wait_for_stub(url)
+        print(f"{'会话池':>6} {'首次调用p50(ms)':>16} {'首次调用p95(ms)':>16}  各会话请求数")
+        for pool_size in args.pool_sizes:
+            p50, p95, stats = await run_case(url, pool_size, args.sessions)
+            distribution = [s['requests'] for s in stats['sessions']] if stats else '-'
+            print(f"{pool_size:>6} {p50:>16.1f} {p95:>16.1f}  {distribution}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,6 +3,7 @@ MCPCat主应用 - 重构版本
 保持与原有逻辑完全一致，但使用模块化的服务类
 """
 
+import asyncio
 import logging
 from pathlib import Path
 from fastapi import FastAPI
@@ -17,6 +18,7 @@ import os
 # 导入新的服务类
 from app.core.config import settings
 from app.services.server_manager import MCPServerManager
+from app.services.config_service import ConfigService
 from app.services.security_service import security_service
 from app.middleware.auth import AuthMiddleware
 from app.api import health, servers, auth, inspector, market
@@ -58,8 +60,19 @@ async def lifespan_manager(app: FastAPI):
     """
     # 启动 Inspector 清理任务
     inspector_service.start_cleanup_task()
-    async with server_manager.create_unified_lifespan(app):
-        yield
+    # 启动配置文件监视任务，外部修改配置后刷新认证快照
+    config_watch_task = asyncio.create_task(
+        ConfigService.watch_config_file(settings.mcpcat_config_watch_interval)
+    )
+    try:
+        async with server_manager.create_unified_lifespan(app):
+            try:
+                yield
+            finally:
+                # 在后端关闭之前断开 Inspector 会话保持的客户端连接
+                await inspector_service.close_all_sessions()
+    finally:
+        config_watch_task.cancel()
 
 
 # 加载配置和创建服务器
@@ -67,6 +80,10 @@ print("Loading MCP server list...")
 mcpServerList = load_config()
 print("MCP server list loaded.")
 
+# 构建认证快照，配置文件无法解析时在此终止启动，不以空的API Key集合运行，
+# 也不会在下面创建默认Key时用默认配置覆盖损坏的配置文件
+security_service.get_snapshot()
+
 # 确保默认API Key存在
 default_keys = security_service.ensure_default_keys()
 if default_keys:
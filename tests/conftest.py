@@ -0,0 +1,95 @@
+"""测试公共配置 - 使用临时配置文件，避免污染项目配置"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+_tmp_dir = tempfile.mkdtemp(prefix="mcpcat-test-")
+os.environ["MCPCAT_CONFIG_PATH"] = str(Path(_tmp_dir) / "config.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest_asyncio  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.server_manager import MCPServerManager  # noqa: E402
+
+STUB_SERVER = textwrap.dedent('''
+    import asyncio, os, sys, time
+    from fastmcp import FastMCP
+
+    mcp = FastMCP("stub")
+
+    @mcp.tool
+    async def work(ms: float) -> str:
+        await asyncio.sleep(ms / 1000)
+        return os.environ.get("STUB_VERSION", "")
+
+    # 记录启动的后端进程，测试据此检查进程数
+    if os.environ.get("STUB_PIDFILE"):
+        with open(os.environ["STUB_PIDFILE"], "a") as f:
+            f.write(f"{os.getpid()}\\n")
+
+    # 模拟后端较慢的启动
+    time.sleep(float(sys.argv[1]))
+    mcp.run(show_banner=False, log_level="WARNING")
+''')
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_config(stub_path: Path, version: int, startup_seconds: float = 0.3, **extra) -> dict:
+    return {
+        "type": "stdio",
+        "command": sys.executable,
+        "args": [str(stub_path), str(startup_seconds)],
+        "env": {"STUB_VERSION": str(version), "STUB_PIDFILE": str(stub_path.with_suffix(".pids"))},
+        "require_auth": False,
+        **extra,
+    }
+
+
+@pytest_asyncio.fixture
+async def gateway(request, tmp_path, monkeypatch):
+    """
+    启动带有一个stdio服务器的网关，返回 (服务器管理器, 服务器URL, 配置生成函数)
+
+    通过 indirect 参数传入额外的服务器配置（例如 startup_seconds、lazy、idle_timeout），
+    其中 start=False 表示不预先启动服务器。
+    """
+    stub_path = tmp_path / "stub_server.py"
+    stub_path.write_text(STUB_SERVER)
+    extra = dict(getattr(request, "param", {}))
+    start = extra.pop("start", True)
+    config = lambda version: _server_config(stub_path, version, **extra)  # noqa: E731
+    Path(os.environ["MCPCAT_CONFIG_PATH"]).write_text(json.dumps({"mcpServers": {"svc": config(0)}}))
+    monkeypatch.setattr(settings, "mcpcat_restart_drain_timeout", 20.0)
+    monkeypatch.setattr(settings, "mcpcat_idle_check_interval", 0.2)
+
+    manager = MCPServerManager()
+    manager.add_mcp_server("svc", config(0))
+    app = FastAPI(lifespan=manager.create_unified_lifespan)
+    manager.mount_all_servers(app)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    if start:
+        assert await manager.ensure_server_started("svc", timeout=30)
+    try:
+        yield manager, f"http://127.0.0.1:{port}/mcp/svc/", config
+    finally:
+        server.should_exit = True
+        await serve_task
@@ -0,0 +1,77 @@
+"""
+运行中重启（蓝绿切换）的回归测试
+
+网关运行在本地端口上，后端是一个stdio桩服务器。多个客户端各自保持一个会话，
+持续调用工具，调用之间有停顿，因此旧实例上经常没有进行中的请求。
+期间多次修改配置并重启服务器，要求没有失败的请求，
+已有会话在旧实例上继续工作，新会话使用新实例。
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import Client
+
+
+@pytest.mark.asyncio
+async def test_restart_under_steady_load_has_no_failed_requests(gateway):
+    manager, url, config = gateway
+    stop = asyncio.Event()
+    results = {"ok": 0, "errors": [], "versions": []}
+
+    async def agent():
+        # 每个Agent保持一个会话，调用之间的停顿使旧实例上经常没有进行中的请求
+        async with Client(url, timeout=30) as client:
+            versions = []
+            while not stop.is_set():
+                try:
+                    result = await client.call_tool("work", {"ms": 20})
+                    results["ok"] += 1
+                    versions.append(result.data)
+                except Exception as e:
+                    results["errors"].append(repr(e))
+                await asyncio.sleep(0.2)
+            results["versions"].append(versions)
+
+    agents = [asyncio.create_task(agent()) for _ in range(4)]
+    await asyncio.sleep(1.0)
+    assert await manager.restart_server("svc", config(1))
+    # 在第一次重启后的实例上再建立会话，第二次重启时两个旧实例同时排空
+    agents += [asyncio.create_task(agent()) for _ in range(2)]
+    await asyncio.sleep(1.5)
+    assert await manager.restart_server("svc", config(2))
+    await asyncio.sleep(1.5)
+    draining = list(manager.server_info["svc"].get("draining", ()))
+    assert len(draining) == 2
+
+    # 新会话使用最新的实例
+    async with Client(url, timeout=30) as client:
+        assert (await client.call_tool("work", {"ms": 0})).data == "2"
+
+    stop.set()
+    await asyncio.gather(*agents)
+
+    assert results["errors"] == []
+    assert results["ok"] > 0
+    # 已有会话在重启期间一直由建立它的实例处理
+    assert sorted(tuple(set(versions)) for versions in results["versions"]) == [("0",)] * 4 + [("1",)] * 2
+    # 旧会话全部关闭后，旧实例不必等到宽限期结束就完成排空
+    await asyncio.wait_for(asyncio.gather(*(instance["drain_task"] for instance in draining)), timeout=10)
+    assert manager.server_info["svc"].get("draining") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "gateway", [{"startup_seconds": 1.5, "lazy": True, "idle_timeout": 1}], indirect=True
+)
+async def test_idle_reaper_does_not_stop_a_restarting_server(gateway):
+    manager, url, config = gateway
+    info = manager.server_info["svc"]
+
+    # 新实例的启动时间超过 idle_timeout，重启期间空闲回收会多次检查该服务器
+    assert await manager.restart_server("svc", config(1))
+    assert info["status"] == "running"
+    assert not info["lifespan_task"].done()
+
+    async with Client(url, timeout=30) as client:
+        assert (await client.call_tool("work", {"ms": 0})).data == "1"
@@ -0,0 +1,42 @@
+"""
+并发隔离舱的测试
+
+SSE传输的消息POST入队后立即返回，工具调用在会话任务中执行，
+并发上限和排队上限应当同样作用于这些调用。
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport
+from fastmcp.exceptions import ToolError
+
+
+def _sse_client(url: str) -> Client:
+    return Client(SSETransport(url.replace("/mcp/", "/sse/")), timeout=30)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway", [{"max_concurrency": 1, "max_queue": 1}], indirect=True)
+async def test_sse_tool_calls_are_limited_by_the_bulkhead(gateway):
+    manager, url, _ = gateway
+    bulkhead = manager.server_info["svc"]["bulkhead"]
+
+    async with _sse_client(url) as first, _sse_client(url) as second, _sse_client(url) as third:
+        running = asyncio.create_task(first.call_tool("work", {"ms": 1000}))
+        await asyncio.sleep(0.3)
+        assert bulkhead.active == 1
+
+        # 第二个调用在队列中等待，第三个调用因队列已满被拒绝
+        queued = asyncio.create_task(second.call_tool("work", {"ms": 0}))
+        await asyncio.sleep(0.3)
+        assert bulkhead.queued == 1
+        with pytest.raises(ToolError, match="繁忙"):
+            await third.call_tool("work", {"ms": 0})
+
+        assert (await running).data == "0"
+        assert (await queued).data == "0"
+
+    assert bulkhead.active == 0
+    assert bulkhead.rejected == 1
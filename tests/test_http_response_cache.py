@@ -0,0 +1,150 @@
+"""上游HTTP响应缓存的测试"""
+
+import threading
+
+import httpx
+import pytest
+
+from app.services.http_response_cache import CachingTransport, HttpResponseCache
+
+
+class Upstream:
+    """记录收到的请求，按路径返回预设响应的上游"""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        respond = self.responses[(request.method, request.url.path)]
+        return respond(request) if callable(respond) else respond
+
+
+def _client(upstream: Upstream, cache: HttpResponseCache) -> httpx.AsyncClient:
+    transport = CachingTransport(httpx.MockTransport(upstream), cache)
+    return httpx.AsyncClient(base_url="http://api.test", transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_fresh_response_is_served_from_cache():
+    upstream = Upstream({("GET", "/items"): httpx.Response(
+        200, json={"items": [1]}, headers={"Cache-Control": "max-age=60"}
+    )})
+    cache = HttpResponseCache()
+    async with _client(upstream, cache) as client:
+        first = await client.get("/items")
+        second = await client.get("/items")
+
+    assert first.json() == second.json() == {"items": [1]}
+    assert len(upstream.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.bytes_saved == len(second.content)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_control", ["no-store", "private, max-age=60"])
+async def test_responses_marked_no_store_or_private_are_not_cached(cache_control):
+    upstream = Upstream({("GET", "/items"): httpx.Response(
+        200, json={}, headers={"Cache-Control": cache_control, "ETag": '"v1"'}
+    )})
+    cache = HttpResponseCache()
+    async with _client(upstream, cache) as client:
+        await client.get("/items")
+        await client.get("/items")
+
+    assert len(upstream.requests) == 2
+    assert cache.to_dict()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_etag_is_revalidated_and_304_reuses_the_cached_body():
+    def respond(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+        return httpx.Response(200, json={"v": 1}, headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+
+    upstream = Upstream({("GET", "/items"): respond})
+    cache = HttpResponseCache()
+    async with _client(upstream, cache) as client:
+        first = await client.get("/items")
+        second = await client.get("/items")
+
+    # no-cache 的响应每次使用前都向上游验证
+    assert [request.headers.get("if-none-match") for request in upstream.requests] == [None, '"v1"']
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"v": 1}
+    assert (cache.revalidated, cache.hits) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_successful_unsafe_request_invalidates_the_url():
+    upstream = Upstream({
+        ("GET", "/items"): httpx.Response(200, json={}, headers={"Cache-Control": "max-age=60"}),
+        ("POST", "/items"): httpx.Response(201, json={}),
+    })
+    cache = HttpResponseCache()
+    async with _client(upstream, cache) as client:
+        await client.get("/items")
+        await client.post("/items", json={"name": "x"})
+        await client.get("/items")
+
+    assert [request.method for request in upstream.requests] == ["GET", "POST", "GET"]
+    assert cache.invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_vary_header_must_match():
+    upstream = Upstream({("GET", "/items"): lambda request: httpx.Response(
+        200, text=request.headers.get("accept-language", ""),
+        headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"}
+    )})
+    cache = HttpResponseCache()
+    async with _client(upstream, cache) as client:
+        assert (await client.get("/items", headers={"Accept-Language": "en"})).text == "en"
+        assert (await client.get("/items", headers={"Accept-Language": "zh"})).text == "zh"
+        assert (await client.get("/items", headers={"Accept-Language": "zh"})).text == "zh"
+
+    assert len(upstream.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_a_new_cache_and_is_trimmed_oldest_first(tmp_path):
+    body = b"x" * 1000
+    upstream = Upstream({
+        ("GET", f"/items/{i}"): httpx.Response(200, content=body, headers={"Cache-Control": "max-age=60"})
+        for i in range(3)
+    })
+    cache = HttpResponseCache(disk_dir=str(tmp_path), disk_max_bytes=2500)
+    write_file = cache._write_file
+    writer_threads = []
+
+    def record_thread(name, data):
+        writer_threads.append(threading.current_thread())
+        write_file(name, data)
+
+    cache._write_file = record_thread
+    async with _client(upstream, cache) as client:
+        for i in range(3):
+            await client.get(f"/items/{i}")
+
+    # 文件写入不在事件循环线程中进行
+    assert len(writer_threads) == 3
+    assert threading.main_thread() not in writer_threads
+
+    # 第三个响应写入后超出上限，最早写入的响应被删除
+    files = {path.name: path.stat().st_size for path in tmp_path.iterdir()}
+    assert len(files) == 2
+    assert cache.disk_bytes == sum(files.values()) <= 2500
+
+    # 新的缓存实例（进程重启）从磁盘读取仍然新鲜的响应
+    restarted = HttpResponseCache(disk_dir=str(tmp_path), disk_max_bytes=2500)
+    assert restarted.disk_bytes == cache.disk_bytes
+    async with _client(upstream, restarted) as client:
+        assert (await client.get("/items/2")).content == body
+        await client.get("/items/0")
+
+    assert restarted.disk_hits == 1
+    assert [request.url.path for request in upstream.requests] == [
+        "/items/0", "/items/1", "/items/2", "/items/0"
+    ]
@@ -0,0 +1,80 @@
+"""
+Inspector 进程内会话的测试
+
+Inspector 通过 use_server 在进程内直接使用服务器的FastMCP实例：
+只在服务器管理器运行着实例的生命周期时建立客户端（不会由客户端自行启动后端），
+进行中的调用计入实例的进行中请求数，蓝绿重启时旧实例等待其完成后才关闭。
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.services.inspector_service import InspectorService
+from app.services.server_manager import ServerUnavailableError
+
+
+def _backend_pids(config) -> list:
+    pidfile = Path(config(0)["env"]["STUB_PIDFILE"])
+    return pidfile.read_text().split() if pidfile.exists() else []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway", [{"lazy": True, "start": False}], indirect=True)
+async def test_session_on_lazy_server_uses_the_managed_lifespan(gateway):
+    manager, _, config = gateway
+    info = manager.server_info["svc"]
+    inspector = InspectorService()
+    assert info["status"] == "idle"
+
+    session_id = await inspector.create_session("svc", manager)
+    result = await inspector.call_tool(session_id, "work", {"ms": 0})
+    assert result["data"] == "0"
+    assert info["status"] == "running"
+    assert not info["lifespan_task"].done()
+    assert len(_backend_pids(config)) == 1
+
+    await inspector.close_all_sessions()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway", [{"max_concurrency": 1}], indirect=True)
+async def test_no_client_is_opened_on_a_server_stopped_while_queued(gateway):
+    manager, _, config = gateway
+    inspector = InspectorService()
+
+    # 占用唯一的并发槽位，会话请求在隔离舱中排队，排队期间服务器被停止
+    async with manager.use_server("svc"):
+        queued = asyncio.create_task(inspector.create_session("svc", manager))
+        await asyncio.sleep(0.1)
+        await manager.stop_server("svc")
+
+    with pytest.raises(ServerUnavailableError):
+        await queued
+    # 排队的请求没有在已停止的实例上自行启动后端
+    await asyncio.sleep(1.0)
+    assert manager.server_info["svc"]["status"] == "stopped"
+    assert len(_backend_pids(config)) == 1
+
+
+@pytest.mark.asyncio
+async def test_restart_waits_for_in_flight_inspector_calls(gateway):
+    manager, _, config = gateway
+    inspector = InspectorService()
+    session_id = await inspector.create_session("svc", manager)
+
+    call = asyncio.create_task(inspector.call_tool(session_id, "work", {"ms": 5000}))
+    await asyncio.sleep(0.2)
+    assert await manager.restart_server("svc", config(1))
+    draining = list(manager.server_info["svc"].get("draining", ()))
+
+    # 旧实例在调用完成之前不会关闭，调用正常返回旧实例的结果
+    assert len(draining) == 1
+    assert not draining[0]["lifespan_task"].done()
+    assert (await call)["data"] == "0"
+    await asyncio.wait_for(draining[0]["drain_task"], timeout=10)
+
+    # 之后的调用切换到新实例
+    assert (await inspector.call_tool(session_id, "work", {"ms": 0}))["data"] == "1"
+    await inspector.close_all_sessions()
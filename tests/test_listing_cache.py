@@ -0,0 +1,32 @@
+"""上游列表缓存的测试"""
+
+import asyncio
+
+import pytest
+from fastmcp import Context, FastMCP
+
+from app.services.listing_cache import ListingCache
+from app.services.upstream_timeouts import TimeoutProxyClient
+
+
+@pytest.mark.asyncio
+async def test_list_changed_notification_invalidates_the_cache():
+    upstream = FastMCP("upstream")
+
+    @upstream.tool
+    async def change_tools(ctx: Context) -> str:
+        await ctx.send_tool_list_changed()
+        return "ok"
+
+    listings = ListingCache(ttl=60)
+    client = TimeoutProxyClient(upstream, message_handler=listings.message_handler())
+    tools = await listings.fetch("tools", client.new())
+    assert [tool.name for tool in tools] == ["change_tools"]
+
+    # 通过 new() 复制出的请求客户端共享同一个消息处理器
+    async with client.new() as request_client:
+        await request_client.call_tool("change_tools", {})
+        await asyncio.sleep(0.1)
+
+    assert listings.invalidations == 1
+    assert "tools" not in listings._entries
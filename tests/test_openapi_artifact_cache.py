@@ -0,0 +1,129 @@
+"""
+OpenAPI预编译产物的测试
+
+从产物创建服务器依赖 fastmcp 的内部结构（FastMCPOpenAPI 的字段、工具管理器、OpenAPITool 的路由），
+这里针对当前锁定的 fastmcp 版本验证产物往返后与 FastMCP.from_openapi 生成的工具一致。
+"""
+
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.server.openapi import MCPType, RouteMap
+
+from app.services.openapi_artifact_cache import OpenAPIArtifactCache, PrecompiledFastMCPOpenAPI
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "pets", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "listPets",
+                "summary": "List pets",
+                "tags": ["pets"],
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer", "maximum": 100}},
+                    {"name": "species", "in": "query", "schema": {"type": "string", "enum": ["cat", "dog"]}},
+                ],
+                "responses": {"200": {"description": "ok", "content": {"application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}
+                }}}},
+            },
+            "post": {
+                "operationId": "createPet",
+                "description": "Create a pet",
+                "requestBody": {"required": True, "content": {"application/json": {
+                    "schema": {"$ref": "#/components/schemas/NewPet"}
+                }}},
+                "responses": {"201": {"description": "created", "content": {"application/json": {
+                    "schema": {"$ref": "#/components/schemas/Pet"}
+                }}}},
+            },
+        },
+        "/pets/{petId}": {
+            "get": {
+                "operationId": "getPet",
+                "parameters": [
+                    {"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}},
+                    {"name": "X-Trace", "in": "header", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "ok", "content": {"application/json": {
+                    "schema": {"$ref": "#/components/schemas/Pet"}
+                }}}},
+            },
+            "delete": {
+                "operationId": "deletePet",
+                "parameters": [{"name": "petId", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "responses": {"204": {"description": "deleted"}},
+            },
+        },
+    },
+    "components": {"schemas": {
+        "NewPet": {"type": "object", "required": ["name"], "properties": {
+            "name": {"type": "string"}, "species": {"type": "string"}, "age": {"type": "integer", "minimum": 0},
+        }},
+        "Pet": {"allOf": [
+            {"$ref": "#/components/schemas/NewPet"},
+            {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}},
+        ]},
+    }},
+}
+
+# 与 mcp_factory 一致：按配置映射为工具，其余排除
+ROUTE_CONFIGS = [{"methods": ["GET", "POST"], "pattern": r"^/pets.*"}]
+
+
+def _route_maps():
+    return [
+        RouteMap(methods=config["methods"], pattern=config["pattern"], mcp_type=MCPType.TOOL)
+        for config in ROUTE_CONFIGS
+    ] + [RouteMap(mcp_type=MCPType.EXCLUDE)]
+
+
+def _http_client(requests: list) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((
+            request.method, str(request.url), request.headers.get("x-trace"), request.content.decode()
+        ))
+        pet = {"id": 1, "name": "tom"}
+        return httpx.Response(200, json=[pet] if request.method == "GET" and request.url.path == "/pets" else pet)
+    return httpx.AsyncClient(base_url="http://api.test", transport=httpx.MockTransport(handler))
+
+
+async def _list_tools(mcp) -> list:
+    async with Client(mcp) as client:
+        return sorted((tool.model_dump() for tool in await client.list_tools()), key=lambda t: t["name"])
+
+
+async def _call_tools(mcp) -> list:
+    async with Client(mcp) as client:
+        await client.call_tool("listPets", {"limit": 5, "species": "cat"})
+        await client.call_tool("createPet", {"name": "tom", "age": 2})
+        await client.call_tool("getPet", {"petId": 7, "X-Trace": "abc"})
+
+
+@pytest.mark.asyncio
+async def test_artifact_round_trip_matches_from_openapi(tmp_path):
+    cache = OpenAPIArtifactCache(str(tmp_path))
+    built_requests, loaded_requests = [], []
+
+    built = cache.build(SPEC, ROUTE_CONFIGS, client=_http_client(built_requests), route_maps=_route_maps(),
+                        name="pets")
+    loaded = cache.build(SPEC, ROUTE_CONFIGS, client=_http_client(loaded_requests), route_maps=_route_maps(),
+                         name="pets")
+    assert built.openapi_artifact == "miss"
+    assert loaded.openapi_artifact == "hit"
+    assert isinstance(loaded, PrecompiledFastMCPOpenAPI)
+
+    # 产物经过JSON序列化后工具列表与完整构建完全一致（DELETE 被路由映射排除）
+    built_tools = await _list_tools(built)
+    assert [tool["name"] for tool in built_tools] == ["createPet", "getPet", "listPets"]
+    assert json.loads(json.dumps(await _list_tools(loaded))) == json.loads(json.dumps(built_tools))
+
+    # 运行时按相同方式构造上游请求
+    await _call_tools(built)
+    await _call_tools(loaded)
+    assert len(built_requests) == 3
+    assert loaded_requests == built_requests
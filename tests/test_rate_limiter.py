@@ -0,0 +1,78 @@
+"""令牌桶限流器的测试"""
+
+import types
+
+import pytest
+
+from app.models.mcp_config import RateLimitConfig
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 monotonic 时钟"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_burst_then_refill_at_the_configured_rate(clock):
+    limiter = RateLimiter()
+    limit = [("key", RateLimitConfig(rate=2, burst=3))]
+
+    assert [limiter.acquire(limit) for _ in range(3)] == [0.0] * 3
+    # 桶已空，1个令牌需要 0.5 秒补充
+    assert limiter.acquire(limit) == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert limiter.acquire(limit) == 0.0
+    assert limiter.acquire(limit) == pytest.approx(0.5)
+
+    # 补充不超过桶容量
+    clock[0] += 100
+    assert [limiter.acquire(limit) for _ in range(3)] == [0.0] * 3
+    assert limiter.acquire(limit) > 0
+    assert limiter.get_stats()["allowed"] == 7
+
+
+def test_rejection_does_not_consume_tokens_from_other_buckets(clock):
+    limiter = RateLimiter()
+    server = ("server", RateLimitConfig(rate=1, burst=5))
+    key = ("key", RateLimitConfig(rate=1, burst=1))
+
+    assert limiter.acquire([server, key]) == 0.0
+    assert limiter.acquire([server, key]) > 0
+    assert limiter.acquire([server, key]) > 0
+    # 被拒绝的请求没有消耗服务器桶的令牌
+    assert [limiter.acquire([server]) for _ in range(4)] == [0.0] * 4
+    assert limiter.acquire([server]) > 0
+
+
+def test_idle_buckets_are_evicted_once_full(clock):
+    limiter = RateLimiter()
+    limit = RateLimitConfig(rate=1, burst=2)
+    limiter.acquire([("a", limit)])
+    limiter.acquire([("b", limit)])
+    limiter.acquire([("b", limit)])
+    assert limiter.get_stats()["buckets"] == 2
+
+    # a 在 1 秒后补满，b 需要 2 秒
+    clock[0] += 1.5
+    limiter.acquire([("c", limit)])
+    assert set(limiter._buckets) == {"b", "c"}
+
+    clock[0] += 10
+    limiter.acquire([("d", limit)])
+    assert set(limiter._buckets) == {"d"}
+
+
+def test_bucket_count_is_capped(clock):
+    limiter = RateLimiter(max_buckets=3)
+    limit = RateLimitConfig(rate=0.01, burst=1)
+    for index in range(10):
+        limiter.acquire([(index, limit), (f"{index}-server", limit)])
+        assert len(limiter._buckets) <= 3
+
+    # 保留最近访问的桶
+    assert list(limiter._buckets) == ["8-server", 9, "9-server"]
@@ -0,0 +1,24 @@
+"""STDIO副本池的测试"""
+
+import pytest
+from fastmcp import Client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gateway", [{"replicas": 2, "cache": {"tools": ["work"], "ttl": 60}}], indirect=True)
+async def test_replica_requests_count_only_calls_sent_to_the_replica(gateway):
+    manager, url, _ = gateway
+    pool = manager.server_info["svc"]["mcp"].replica_pool
+
+    async with Client(url, timeout=30) as client:
+        for _ in range(3):
+            await client.list_tools()
+        # 相同参数的后两次调用命中结果缓存，不发往副本
+        for _ in range(3):
+            assert (await client.call_tool("work", {"ms": 0})).data == "0"
+        await client.call_tool("work", {"ms": 1})
+
+    stats = pool.get_stats()
+    assert len(stats) == 2
+    assert sum(replica["requests"] for replica in stats) == 2
+    assert all(replica["in_flight"] == 0 for replica in stats)
@@ -0,0 +1,107 @@
+"""工具结果缓存的测试"""
+
+import types
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.tools.tool import ToolResult
+
+from app.services import result_cache
+from app.services.result_cache import ResultCacheMiddleware, ToolResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 monotonic 时钟"""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _result(text: str) -> ToolResult:
+    return ToolResult(content=text)
+
+
+def _put(cache: ToolResultCache, arguments: dict, text: str = "x") -> str:
+    key = cache.make_key("search", arguments)
+    cache.put("search", key, _result(text))
+    return key
+
+
+def test_key_ignores_argument_order():
+    assert ToolResultCache.make_key("search", {"q": "a", "limit": 5}) == \
+        ToolResultCache.make_key("search", {"limit": 5, "q": "a"})
+    assert ToolResultCache.make_key("search", {"q": "a"}) != ToolResultCache.make_key("search", {"q": "b"})
+    assert ToolResultCache.make_key("search", None) == ToolResultCache.make_key("search", {})
+
+
+def test_lru_eviction_by_entry_count():
+    cache = ToolResultCache(["search"], max_entries=2)
+    first = _put(cache, {"q": 1})
+    second = _put(cache, {"q": 2})
+    # 访问第一个结果后，第二个成为最久未使用的结果
+    assert cache.get("search", first) is not None
+    _put(cache, {"q": 3})
+
+    assert cache.get("search", second) is None
+    assert cache.get("search", first) is not None
+    assert cache.to_dict()["entries"] == 2
+
+
+def test_lru_eviction_by_total_bytes():
+    size = ToolResultCache._result_size(_result("x" * 100))
+    cache = ToolResultCache(["search"], max_bytes=size * 2)
+    first = _put(cache, {"q": 1}, "x" * 100)
+    second = _put(cache, {"q": 2}, "x" * 100)
+    third = _put(cache, {"q": 3}, "x" * 100)
+
+    assert cache.get("search", first) is None
+    assert cache.get("search", second) is not None
+    assert cache.get("search", third) is not None
+    assert cache.bytes == size * 2
+
+    # 超过总字节数上限的单个结果不缓存，也不淘汰已有结果
+    _put(cache, {"q": 4}, "x" * 1000)
+    assert cache.bytes == size * 2
+    assert cache.to_dict()["tools"]["search"]["entries"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ToolResultCache(["search"], ttl=10)
+    key = _put(cache, {"q": 1})
+
+    clock[0] += 9.9
+    assert cache.get("search", key) is not None
+    clock[0] += 0.2
+    assert cache.get("search", key) is None
+    assert cache.bytes == 0
+    stats = cache.to_dict()["tools"]["search"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_middleware_serves_repeated_calls_from_cache():
+    calls = []
+    server = FastMCP("upstream")
+
+    @server.tool
+    def search(q: str, limit: int = 10) -> str:
+        calls.append((q, limit))
+        return f"{q}:{limit}"
+
+    @server.tool
+    def echo(text: str) -> str:
+        calls.append(text)
+        return text
+
+    cache = ToolResultCache(["search"])
+    server.add_middleware(ResultCacheMiddleware(cache))
+    async with Client(server) as client:
+        assert (await client.call_tool("search", {"q": "a", "limit": 5})).data == "a:5"
+        assert (await client.call_tool("search", {"limit": 5, "q": "a"})).data == "a:5"
+        await client.call_tool("echo", {"text": "t"})
+        await client.call_tool("echo", {"text": "t"})
+
+    # 未列入配置的工具不缓存
+    assert calls == [("a", 5), "t", "t"]
+    assert cache.to_dict()["tools"]["search"]["hits"] == 1
@@ -0,0 +1,81 @@
+"""安全服务（认证快照）的测试"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.services.config_service import ConfigFileError, ConfigService
+from app.services.security_service import SecurityService
+
+KEY = "sk-" + "a" * 40
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(settings, "mcpcat_config_path", str(path))
+    monkeypatch.setattr(ConfigService, "_change_listeners", [])
+    monkeypatch.setattr(ConfigService, "_known_mtime", None)
+    return path
+
+
+@pytest.fixture
+def host_timezone(monkeypatch):
+    def set_timezone(name: str) -> None:
+        monkeypatch.setenv("TZ", name)
+        time.tzset()
+
+    yield set_timezone
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _config(*keys: str) -> dict:
+    return {"mcpServers": {}, "security": {"api_keys": [
+        {"key": key, "name": f"key-{index}", "permission": "read"} for index, key in enumerate(keys)
+    ]}}
+
+
+def test_first_snapshot_fails_on_an_unparsable_config(config_file):
+    config_file.write_text('{"security": {"api_keys": [')
+
+    with pytest.raises(ConfigFileError):
+        SecurityService().get_snapshot()
+    # 损坏的配置文件保持原样，不会被默认配置覆盖
+    assert config_file.read_text() == '{"security": {"api_keys": ['
+
+
+def test_watcher_keeps_the_last_good_snapshot(config_file):
+    config_file.write_text(json.dumps(_config(KEY)))
+    service = SecurityService()
+    assert service.verify_api_key(KEY) is not None
+    ConfigService._known_mtime = ConfigService.get_config_mtime()
+
+    config_file.write_text('{"mcpServers": ')
+    os.utime(config_file, ns=(0, ConfigService._known_mtime + 1))
+    assert ConfigService.check_for_external_change() is False
+    assert service.verify_api_key(KEY) is not None
+
+    config_file.write_text(json.dumps(_config()))
+    assert ConfigService.check_for_external_change() is True
+    assert service.verify_api_key(KEY) is None
+
+
+@pytest.mark.parametrize("tz_name, offset, valid", [
+    # 主机位于UTC-12：按本地时间解读会把已过期的Key延后12小时
+    ("Etc/GMT+12", timedelta(hours=-1), False),
+    # 主机位于UTC+12：按本地时间解读会让未过期的Key提前失效
+    ("Etc/GMT-12", timedelta(hours=1), True),
+])
+def test_naive_expires_at_is_read_as_utc(config_file, host_timezone, tz_name, offset, valid):
+    host_timezone(tz_name)
+    config = _config(KEY)
+    expires_at = datetime.now(timezone.utc).replace(tzinfo=None) + offset
+    config["security"]["api_keys"][0]["expires_at"] = expires_at.isoformat()
+    config_file.write_text(json.dumps(config))
+
+    assert (SecurityService().verify_api_key(KEY) is not None) is valid
@@ -0,0 +1,63 @@
+"""上游请求超时的测试"""
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+from mcp import McpError
+
+from app.services.upstream_timeouts import REQUEST_TIMEOUT, TimeoutProxyClient, UpstreamTimeouts
+
+
+def _upstream(cancelled: list) -> FastMCP:
+    upstream = FastMCP("upstream")
+
+    @upstream.tool
+    async def slow(ms: float) -> str:
+        try:
+            await asyncio.sleep(ms / 1000)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+        return "slow"
+
+    @upstream.tool
+    async def steady(ms: float) -> str:
+        try:
+            await asyncio.sleep(ms / 1000)
+        except asyncio.CancelledError:
+            cancelled.append("steady")
+            raise
+        return "steady"
+
+    return upstream
+
+
+@pytest.mark.asyncio
+async def test_timeout_cancels_only_the_request_that_timed_out():
+    cancelled = []
+    timeouts = UpstreamTimeouts()
+    client = TimeoutProxyClient(_upstream(cancelled), timeouts=timeouts)
+
+    async def call_slow_after_yield():
+        # 请求发出前挂起，期间其他协程在同一会话上先占用了下一个请求ID
+        await asyncio.sleep(0.05)
+        return await Client.call_tool_mcp(client, "slow", {"ms": 5000})
+
+    async with client:
+        slow = asyncio.create_task(client._send_with_timeout(
+            "tools/call", "工具 'slow' 调用", 0.3, call_slow_after_yield, tool="slow"
+        ))
+        await asyncio.sleep(0)
+        steady = [asyncio.create_task(client.call_tool_mcp("steady", {"ms": 800})) for _ in range(3)]
+
+        with pytest.raises(McpError) as excinfo:
+            await slow
+        assert excinfo.value.error.code == REQUEST_TIMEOUT
+
+        results = await asyncio.gather(*steady)
+        assert [result.content[0].text for result in results] == ["steady"] * 3
+        await asyncio.sleep(0.1)
+
+    assert cancelled == ["slow"]
+    assert timeouts.by_tool == {"slow": 1}